@@ -0,0 +1,75 @@
+# benchmarks/bench_logging.py
+"""
+Measures the cost of a disabled ``logger.debug(...)`` call, shaped like the view-layer debug events.
+
+Compares the previous structlog setup (stdlib BoundLogger, level only enforced by the
+stdlib logger after the whole processor chain has run) with configure_structlog's
+level-filtering bound logger.
+
+Usage:
+    python -m benchmarks.bench_logging [--calls 200000]
+"""
+import argparse
+import logging
+import timeit
+
+import structlog
+
+from utils.structlog_config import configure_structlog, rename_level_to_severity
+
+
+def configure_unfiltered():
+    structlog.configure(
+        processors=[
+            structlog.stdlib.add_log_level,
+            rename_level_to_severity,
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.ExceptionPrettyPrinter(),
+            structlog.processors.JSONRenderer(),
+        ],
+        context_class=dict,
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+
+
+def disabled_debug_cost(calls):
+    bench_logger = structlog.get_logger('bench_logging')
+
+    def call():
+        bench_logger.debug(
+            method='POST',
+            request_id='5f0c1f7e-9d4b-4c3a-8a57-0d7f3b9a2e11',
+            endpoint="create_user",
+            event="create_user_attempt",
+            message="Create user endpoint accessed."
+        )
+
+    call()  # Resolve the lazy proxy before timing
+    return min(timeit.repeat(call, number=calls, repeat=5)) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200000)
+    args = parser.parse_args()
+
+    stdlib_logger = logging.getLogger('bench_logging')
+    stdlib_logger.addHandler(logging.NullHandler())
+    stdlib_logger.setLevel(logging.INFO)
+    stdlib_logger.propagate = False
+
+    configure_unfiltered()
+    before = disabled_debug_cost(args.calls)
+    structlog.reset_defaults()
+    configure_structlog('INFO')
+    after = disabled_debug_cost(args.calls)
+
+    print(f"disabled debug call, unfiltered chain:  {before * 1e9:8.0f} ns")
+    print(f"disabled debug call, level-filtered:    {after * 1e9:8.0f} ns")
+    print(f"speedup: {before / after:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
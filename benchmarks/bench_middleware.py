@@ -0,0 +1,124 @@
+# benchmarks/bench_middleware.py
+"""
+Measures per-request middleware overhead, per middleware and for the whole stack.
+
+Per middleware, the stack is grown one middleware at a time around a view stub
+and each step's added time per call is reported (auth and messages need the
+session middleware in front of them, so they cannot run alone). The full-stack
+numbers run the real handler (URL resolution and the view included) for an
+authenticated GET /v1/user/self under the default profile, the ``api`` profile
+(MIDDLEWARE_PROFILE=api: session, auth and messages middleware skip /v1/) and with
+no middleware at all.
+
+Usage:
+    python -m benchmarks.bench_middleware [--calls 20000] [--path /v1/user/self]
+"""
+import argparse
+import base64
+import time
+
+from benchmarks.common import setup_django, summarize, print_table
+from benchmarks.loadtest import seed_user
+
+USERNAME = 'bench@example.com'
+PASSWORD = 'password123'
+
+
+def time_calls(call, make_request, calls, repeat=5):
+    """
+    Returns the best per-call time in seconds over ``repeat`` runs of ``calls`` calls.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        requests = [make_request() for _ in range(calls)]
+        started = time.perf_counter()
+        for request in requests:
+            call(request)
+        best = min(best, (time.perf_counter() - started) / calls)
+    return best
+
+
+def marginal_costs(middleware_paths, make_request, calls):
+    """
+    Returns the added per-call cost of each middleware, in stack order.
+
+    Auth and messages depend on the session middleware before them, so rather
+    than running each alone the chain is grown one middleware at a time around a
+    view stub and each step is compared with the previous one.
+    """
+    from django.http import HttpResponse
+    from django.utils.module_loading import import_string
+
+    def view(request):
+        return HttpResponse(b'')
+
+    previous = time_calls(view, make_request, calls)
+    rows = []
+    for depth, dotted_path in enumerate(middleware_paths, start=1):
+        handler = view
+        for path in reversed(middleware_paths[:depth]):
+            handler = import_string(path)(handler)
+        elapsed = time_calls(handler, make_request, calls)
+        rows.append((dotted_path, elapsed - previous))
+        previous = elapsed
+    return rows
+
+
+def stack_latencies(middleware, make_request, calls):
+    from django.core.handlers.base import BaseHandler
+    from django.test import override_settings
+
+    with override_settings(MIDDLEWARE=middleware):
+        handler = BaseHandler()
+        handler.load_middleware()
+        for _ in range(100):
+            handler.get_response(make_request())
+        samples = []
+        for _ in range(calls):
+            request = make_request()
+            started = time.perf_counter()
+            handler.get_response(request)
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=20000)
+    parser.add_argument('--path', default='/v1/user/self')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.test import RequestFactory
+
+    seed_user(USERNAME, PASSWORD)
+    authorization = 'Basic ' + base64.b64encode(f'{USERNAME}:{PASSWORD}'.encode('utf-8')).decode('utf-8')
+    factory = RequestFactory()
+
+    def make_request():
+        return factory.get(args.path, HTTP_AUTHORIZATION=authorization)
+
+    # Both profiles regardless of MIDDLEWARE_PROFILE in the environment
+    originals = {replacement: name for name, replacement in settings.API_MIDDLEWARE_REPLACEMENTS.items()}
+    full = [originals.get(name, name) for name in settings.MIDDLEWARE]
+    api = [settings.API_MIDDLEWARE_REPLACEMENTS.get(name, name) for name in full]
+
+    for name, middleware in (('full', full), ('api', api)):
+        print(f"added cost per call, GET {args.path}, MIDDLEWARE_PROFILE={name} (microseconds)")
+        for dotted_path, cost in marginal_costs(middleware, make_request, args.calls):
+            print(f"  {dotted_path:<60} {cost * 1e6:8.2f}")
+        print()
+
+    profiles = [('full', full), ('api', api), ('none', [])]
+    summaries = {name: summarize(stack_latencies(middleware, make_request, args.calls))
+                 for name, middleware in profiles}
+    print(f"full stack, GET {args.path}")
+    print_table([(f"MIDDLEWARE_PROFILE={name}", summary) for name, summary in summaries.items()])
+    saved = summaries['full']['mean_ms'] - summaries['api']['mean_ms']
+    print(f"\napi profile saves {saved * 1000:.1f}us per request "
+          f"({saved / summaries['full']['mean_ms'] * 100:.1f}% of the full-stack mean)")
+
+
+if __name__ == '__main__':
+    main()
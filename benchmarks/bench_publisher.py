@@ -0,0 +1,67 @@
+# benchmarks/bench_publisher.py
+"""
+Compares signup latency with the old per-message, blocking publisher against the shared, batching publisher.
+
+Usage:
+    python -m benchmarks.bench_publisher [--requests 50] [--setup-latency 0.05] [--publish-latency 0.03]
+"""
+import argparse
+import builtins
+import json
+import time
+import uuid
+
+from benchmarks.common import setup_django, summarize, print_table
+from benchmarks.fakes import FakePublisherClient
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--setup-latency', type=float, default=0.05)
+    parser.add_argument('--publish-latency', type=float, default=0.03)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.test import Client
+    from utils.msg_publisher import PubSubMessagePublisher
+
+    class PerMessagePublisher(PubSubMessagePublisher):
+        # Previous behaviour: a new client per message and a blocking wait for the result.
+        def send_message(self, topic_name, message, **attributes):
+            client = FakePublisherClient(args.setup_latency, args.publish_latency)
+            future = client.publish(client.topic_path(self.project_id, topic_name),
+                                    data=json.dumps(message).encode('utf-8'), **attributes)
+            future.result()
+            return future
+
+    publishers = {
+        'per-message client, blocking': PerMessagePublisher('bench'),
+        'shared client, non-blocking': PubSubMessagePublisher(
+            'bench', client=FakePublisherClient(args.setup_latency, args.publish_latency)),
+    }
+
+    client = Client()
+    rows = []
+    for name, publisher in publishers.items():
+        builtins.msg_publisher = publisher
+        samples = []
+        for _ in range(args.requests):
+            body = json.dumps({
+                'username': f'{uuid.uuid4().hex}@example.com',
+                'password': 'password123',
+                'first_name': 'Bench',
+                'last_name': 'User',
+            })
+            started = time.perf_counter()
+            response = client.post('/v1/user', data=body, content_type='application/json')
+            samples.append(time.perf_counter() - started)
+            assert response.status_code == 201, response.status_code
+        rows.append((f'POST /v1/user ({name})', summarize(samples)))
+
+    print_table(rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+# benchmarks/bench_rate_limit.py
+"""
+Measures the rate limiter's per-request overhead and the CPU it saves under a password-guessing replay.
+
+Overhead: ``RateLimiter.check`` for admitted requests, single threaded and from
+several threads with distinct client addresses, with the default 16 shards and
+with a single shard for comparison.
+
+Replay: ``--attempts`` wrong-password Basic auth requests for one username go
+through ``get_user_from_credentials`` with the limiter disabled and with the
+configured limits; process CPU time (bcrypt pool threads included) and the
+outcome counts are reported for each.
+
+Usage:
+    python -m benchmarks.bench_rate_limit [--calls 200000] [--threads 8] [--attempts 200]
+"""
+import argparse
+import base64
+import threading
+import time
+from collections import Counter
+
+from benchmarks.common import setup_django
+from benchmarks.loadtest import seed_user
+
+USERNAME = 'bench@example.com'
+PASSWORD = 'password123'
+
+
+def check_overhead(limiter, requests, calls, threads):
+    """
+    Returns the mean wall time per ``check`` call across ``threads`` threads.
+    """
+    per_thread = calls // threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(request):
+        barrier.wait()
+        for _ in range(per_thread):
+            limiter.check(request, USERNAME)
+
+    workers = [threading.Thread(target=worker, args=(requests[i % len(requests)],)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return (time.perf_counter() - started) / (per_thread * threads)
+
+
+def replay_attack(limiter, make_request, attempts):
+    """
+    Sends ``attempts`` wrong-password requests and returns (CPU seconds, status counts).
+    """
+    from unittest import mock
+
+    from myapp.rate_limit import RateLimited
+    from myapp.views import get_user_from_credentials
+
+    statuses = Counter()
+    with mock.patch('myapp.views.rate_limiter', limiter):
+        started = time.process_time()
+        for _ in range(attempts):
+            try:
+                statuses[get_user_from_credentials(make_request())[2]] += 1
+            except RateLimited:
+                statuses[429] += 1
+        return time.process_time() - started, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--attempts', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.test import RequestFactory
+
+    from myapp.rate_limit import RateLimiter, TokenBucket
+
+    seed_user(USERNAME, PASSWORD)
+    factory = RequestFactory()
+    requests = [factory.get('/v1/user/self', REMOTE_ADDR=f'10.0.0.{i}') for i in range(1, 65)]
+    for request in requests:
+        request.request_id = 'bench'
+
+    def admitting_limiter(shards):
+        return RateLimiter(TokenBucket(1e9, 10 ** 9, shards=shards), TokenBucket(1e9, 10 ** 9, shards=shards))
+
+    print("RateLimiter.check overhead per admitted request")
+    for shards in (16, 1):
+        single = check_overhead(admitting_limiter(shards), requests, args.calls, 1)
+        threaded = check_overhead(admitting_limiter(shards), requests, args.calls, args.threads)
+        print(f"  shards={shards:<3} 1 thread: {single * 1e6:6.2f}us   "
+              f"{args.threads} threads: {threaded * 1e6:6.2f}us (wall time / call)")
+
+    authorization = 'Basic ' + base64.b64encode(f'{USERNAME}:wrong-password'.encode('utf-8')).decode('utf-8')
+
+    def make_request():
+        request = factory.get('/v1/user/self', HTTP_AUTHORIZATION=authorization, REMOTE_ADDR='203.0.113.7')
+        request.request_id = 'bench'
+        return request
+
+    configured = RateLimiter(
+        TokenBucket(settings.RATE_LIMIT_CLIENT_RATE, settings.RATE_LIMIT_CLIENT_BURST),
+        TokenBucket(settings.RATE_LIMIT_USERNAME_RATE, settings.RATE_LIMIT_USERNAME_BURST),
+    )
+    print(f"\nreplaying {args.attempts} wrong-password requests for {USERNAME}")
+    results = {}
+    for name, limiter in (('disabled', RateLimiter(None, None, enabled=False)), ('enabled', configured)):
+        cpu, statuses = replay_attack(limiter, make_request, args.attempts)
+        results[name] = cpu
+        print(f"  limiter {name:<9} cpu={cpu:7.3f}s  statuses={dict(sorted(statuses.items()))}")
+    print(f"\nCPU saved by the limiter: {results['disabled'] - results['enabled']:.3f}s "
+          f"({(1 - results['enabled'] / results['disabled']) * 100:.1f}%)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/bench_verification_lookup.py
+"""
+Times the verify_user lookup against a large UserVerification table, before and after the
+0003_verification_indexes migration.
+
+Loads ``--rows`` verification rows with the schema at 0002 (no index on verification_code,
+no foreign key), times the previous two-query lookup, applies 0003 and times the indexed
+single-query lookup. Also reports how long 0003 took on that table.
+
+Usage:
+    python -m benchmarks.bench_verification_lookup [--rows 1000000] [--users 1000] [--lookups 100]
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import print_table, setup_django, summarize
+
+BATCH_SIZE = 10000
+
+
+def populate(rows, users):
+    from django.utils import timezone
+    from myapp.models import User, UserVerification
+
+    UserVerification.objects.all().delete()
+    User.objects.filter(username__startswith='bench-verify-').delete()
+    user_ids = [
+        user.id for user in User.objects.bulk_create(
+            User(username=f'bench-verify-{i}@example.com', first_name='Bench', last_name='User', password='!')
+            for i in range(users)
+        )
+    ]
+    expires_at = timezone.now() + timezone.timedelta(days=1)
+    for start in range(0, rows, BATCH_SIZE):
+        UserVerification.objects.bulk_create(
+            UserVerification(user_id=user_ids[i % users], verification_code=f'bench-{i:010d}', expires_at=expires_at)
+            for i in range(start, min(start + BATCH_SIZE, rows))
+        )
+
+
+def time_lookups(codes, lookup):
+    samples = []
+    for code in codes:
+        started = time.perf_counter()
+        lookup(code)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def lookup_before(code):
+    from myapp.models import User, UserVerification
+
+    verification = UserVerification.objects.get(verification_code=code)
+    return User.objects.filter(id=verification.user_id).first()
+
+
+def lookup_after(code):
+    from myapp.models import UserVerification
+
+    return UserVerification.objects.select_related('user').get(verification_code=code).user
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--lookups', type=int, default=100)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.management import call_command
+
+    call_command('migrate', 'myapp', '0002', verbosity=0)
+    started = time.perf_counter()
+    populate(args.rows, args.users)
+    print(f"loaded {args.rows} verification rows in {time.perf_counter() - started:.1f}s")
+
+    codes = [f'bench-{random.randrange(args.rows):010d}' for _ in range(args.lookups)]
+    before = time_lookups(codes, lookup_before)
+
+    started = time.perf_counter()
+    call_command('migrate', 'myapp', '0003', verbosity=0)
+    print(f"0003_verification_indexes applied in {time.perf_counter() - started:.1f}s")
+
+    after = time_lookups(codes, lookup_after)
+    print_table([
+        ('before: scan + separate user query', before),
+        ('after: unique index + join', after),
+    ])
+
+
+if __name__ == '__main__':
+    main()
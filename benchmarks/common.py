@@ -0,0 +1,44 @@
+# benchmarks/common.py
+import os
+import statistics
+
+from webapp import bootstrap
+
+
+def setup_django():
+    """
+    Runs the usual process bootstrap, configures Django with the benchmark settings and prepares the database.
+    """
+    bootstrap.initialize()
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command('migrate', verbosity=0)
+
+
+def summarize(samples):
+    """
+    Returns count, mean and p50/p95/p99 (in milliseconds) for a list of durations in seconds.
+    """
+    millis = sorted(sample * 1000 for sample in samples)
+    if len(millis) > 1:
+        cuts = statistics.quantiles(millis, n=100, method='inclusive')
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = millis[0] if millis else 0.0
+    return {
+        'count': len(millis),
+        'mean_ms': statistics.fmean(millis) if millis else 0.0,
+        'p50_ms': p50,
+        'p95_ms': p95,
+        'p99_ms': p99,
+    }
+
+
+def print_table(rows):
+    for name, summary in rows:
+        print(f"{name:<40} n={summary['count']:<6} mean={summary['mean_ms']:8.2f}ms "
+              f"p50={summary['p50_ms']:8.2f}ms p95={summary['p95_ms']:8.2f}ms p99={summary['p99_ms']:8.2f}ms")
@@ -0,0 +1,64 @@
+# benchmarks/compare.py
+"""
+Compares two benchmarks.suite result files and flags regressions.
+
+A scenario regresses when requests/sec drops, or p95 latency rises, by more than
+``--threshold`` percent. Exits with status 1 if any scenario regressed, so it can
+gate a CI job.
+
+Usage:
+    python -m benchmarks.compare before.json after.json [--threshold 10]
+"""
+import argparse
+import json
+import sys
+
+
+def change(before, after):
+    return (after - before) / before * 100 if before else 0.0
+
+
+def compare(baseline, candidate, threshold):
+    """
+    Returns one row per scenario present in both reports, plus whether any regressed.
+    """
+    rows = []
+    regressed = False
+    for name, base in baseline['scenarios'].items():
+        new = candidate['scenarios'].get(name)
+        if new is None:
+            continue
+        rps_change = change(base['requests_per_sec'], new['requests_per_sec'])
+        p95_change = change(base['p95_ms'], new['p95_ms'])
+        is_regression = rps_change < -threshold or p95_change > threshold
+        regressed = regressed or is_regression
+        rows.append((name, base, new, rps_change, p95_change, is_regression))
+    return rows, regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=10.0, help="Allowed change in percent.")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(f"baseline  {baseline['meta'].get('commit')}  {baseline['meta'].get('timestamp')}")
+    print(f"candidate {candidate['meta'].get('commit')}  {candidate['meta'].get('timestamp')}")
+    rows, regressed = compare(baseline, candidate, args.threshold)
+    for name, base, new, rps_change, p95_change, is_regression in rows:
+        print(f"{name:<12} req/s {base['requests_per_sec']:9.1f} -> {new['requests_per_sec']:9.1f} "
+              f"({rps_change:+6.1f}%)  p50 {base['p50_ms']:7.2f} -> {new['p50_ms']:7.2f}ms  "
+              f"p95 {base['p95_ms']:7.2f} -> {new['p95_ms']:7.2f}ms ({p95_change:+6.1f}%)  "
+              f"p99 {base['p99_ms']:7.2f} -> {new['p99_ms']:7.2f}ms"
+              f"{'  REGRESSION' if is_regression else ''}")
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == '__main__':
+    main()
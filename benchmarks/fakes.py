@@ -0,0 +1,38 @@
+# benchmarks/fakes.py
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+
+
+class FakePublisherClient:
+    """
+    Stand-in for ``pubsub_v1.PublisherClient`` that simulates channel setup and publish round-trip latency.
+
+    Args:
+        setup_latency (float): Seconds spent in the constructor, standing in for gRPC channel setup.
+        publish_latency (float): Seconds before a published message's future resolves.
+    """
+
+    def __init__(self, setup_latency=0.0, publish_latency=0.0, batch_settings=None):
+        time.sleep(setup_latency)
+        self.publish_latency = publish_latency
+        self.batch_settings = batch_settings
+        self.published = 0
+        self._ids = itertools.count()
+
+    def topic_path(self, project_id, topic_name):
+        return f"projects/{project_id}/topics/{topic_name}"
+
+    def publish(self, topic_path, data, **attributes):
+        self.published += 1
+        future = Future()
+        message_id = str(next(self._ids))
+        if self.publish_latency:
+            threading.Timer(self.publish_latency, future.set_result, args=(message_id,)).start()
+        else:
+            future.set_result(message_id)
+        return future
+
+    def stop(self):
+        pass
@@ -0,0 +1,127 @@
+# benchmarks/loadtest.py
+"""
+Closed-loop HTTP load generator for a running server.
+
+Each of ``--concurrency`` threads keeps one keep-alive connection open and
+issues requests back to back for ``--duration`` seconds. Reports latency
+percentiles, requests/sec and requests/sec per server core.
+
+Usage:
+    python -m benchmarks.loadtest --path /ping --concurrency 32 --duration 30 --server-cores 2
+    python -m benchmarks.loadtest --path /v1/user/self --basic-auth bench@example.com:password123 --seed-user
+"""
+import argparse
+import base64
+import http.client
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from benchmarks.common import summarize
+
+
+def run_load(base_url, method, path, headers, body, concurrency, duration):
+    """
+    Drives ``method path`` at the given concurrency for ``duration`` seconds.
+
+    Returns:
+        tuple: (list of latencies in seconds, dict of status code counts, elapsed seconds)
+    """
+    return run_requests(base_url, lambda worker, seq: (method, path, headers, body), concurrency, duration)
+
+
+def run_requests(base_url, make_request, concurrency, duration):
+    """
+    Like ``run_load``, but asks ``make_request(worker, seq)`` for each request's
+    ``(method, path, headers, body)`` so requests can differ (e.g. unique signups).
+    """
+    target = urlsplit(base_url)
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def worker(index):
+        conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+        local_latencies = []
+        local_statuses = {}
+        seq = 0
+        while time.monotonic() < stop_at:
+            method, path, headers, body = make_request(index, seq)
+            seq += 1
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+                status = 'error'
+            local_latencies.append(time.perf_counter() - started)
+            local_statuses[status] = local_statuses.get(status, 0) + 1
+        conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, statuses, time.monotonic() - started
+
+
+def seed_user(username, password):
+    """
+    Creates (or resets) a verified user directly in the database the server uses.
+    """
+    from benchmarks.common import setup_django
+    setup_django()
+    from myapp.models import User
+
+    user = User.objects.filter(username=username).first() or User(username=username, first_name='Bench',
+                                                                  last_name='User')
+    user.set_password(password)
+    user.is_verified = True
+    user.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--method', default='GET')
+    parser.add_argument('--path', default='/ping')
+    parser.add_argument('--body', default=None)
+    parser.add_argument('--basic-auth', default=None, help="username:password")
+    parser.add_argument('--seed-user', action='store_true', help="Create the --basic-auth user before the run.")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--server-cores', type=int, default=os.cpu_count(),
+                        help="Cores available to the server, for the requests/sec per core figure.")
+    args = parser.parse_args()
+
+    headers = {'Connection': 'keep-alive'}
+    if args.body is not None:
+        headers['Content-Type'] = 'application/json'
+    if args.basic_auth:
+        headers['Authorization'] = 'Basic ' + base64.b64encode(args.basic_auth.encode('utf-8')).decode('utf-8')
+        if args.seed_user:
+            seed_user(*args.basic_auth.split(':', 1))
+
+    latencies, statuses, elapsed = run_load(args.url, args.method, args.path, headers, args.body,
+                                            args.concurrency, args.duration)
+    summary = summarize(latencies)
+    rps = len(latencies) / elapsed if elapsed else 0.0
+    print(f"{args.method} {args.path} concurrency={args.concurrency} duration={elapsed:.1f}s statuses={statuses}")
+    print(f"requests/sec={rps:.1f} requests/sec/core={rps / args.server_cores:.1f} "
+          f"p50={summary['p50_ms']:.2f}ms p95={summary['p95_ms']:.2f}ms p99={summary['p99_ms']:.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+# benchmarks/settings.py
+import builtins
+import os
+import tempfile
+
+from benchmarks.fakes import FakePublisherClient
+from utils.msg_publisher import PubSubMessagePublisher
+from webapp.settings import *  # noqa: F401,F403
+
+BENCH_DIR = os.getenv('BENCH_DIR', os.path.join(tempfile.gettempdir(), 'webapp-bench'))
+os.makedirs(BENCH_DIR, exist_ok=True)
+
+# Benchmarks default to a throwaway SQLite database; set BENCH_DATABASE=mysql to use the configured MySQL.
+if os.getenv('BENCH_DATABASE', 'sqlite') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(BENCH_DIR, 'bench.sqlite3'),
+        }
+    }
+
+# Load generators hit the API from a single address; keep the limiter in the path without throttling them.
+RATE_LIMIT_CLIENT_RATE = float(os.getenv('RATE_LIMIT_CLIENT_RATE', 1e6))
+RATE_LIMIT_CLIENT_BURST = int(os.getenv('RATE_LIMIT_CLIENT_BURST', 1000000))
+
+LOGGING['handlers']['file']['filename'] = os.path.join(BENCH_DIR, 'bench.log')  # noqa: F405
+
+# Anything published while benchmarking goes to an in-process fake, never to a real project.
+builtins.msg_publisher = PubSubMessagePublisher(
+    'bench', client=FakePublisherClient(publish_latency=float(os.getenv('BENCH_PUBLISH_LATENCY', 0)))
+)
@@ -0,0 +1,223 @@
+# benchmarks/suite.py
+"""
+Reproducible HTTP benchmark suite for the API endpoints.
+
+Seeds a verified user and a pool of verification codes in the benchmark database
+(SQLite under BENCH_DIR by default, BENCH_DATABASE=mysql for the configured MySQL),
+optionally starts gunicorn against benchmarks.settings (Pub/Sub replaced by an
+in-process fake), then drives each scenario in turn at ``--concurrency`` for
+``--duration`` seconds. Prints p50/p95/p99 latency and requests/sec and writes
+everything, with the git commit, to a JSON file for benchmarks.compare.
+
+Scenarios: ping, healthz, create_user, get_user, put_user, verify.
+
+Usage:
+    python -m benchmarks.suite --start-server --workers 2 --output before.json
+    python -m benchmarks.suite --url http://127.0.0.1:8000 --scenarios ping get_user --concurrency 32
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import base64
+import http.client
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from benchmarks.common import setup_django, summarize
+from benchmarks.loadtest import run_requests
+
+SCENARIOS = ('ping', 'healthz', 'create_user', 'get_user', 'put_user', 'verify')
+BENCH_USERNAME = 'bench@example.com'
+BENCH_PASSWORD = 'password123'
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def seed(run_id, verify_codes):
+    """
+    Creates the Basic auth user and ``verify_codes`` unused verification codes for this run.
+    """
+    from django.utils import timezone as django_timezone
+    from myapp.models import User, UserVerification
+
+    user = User.objects.filter(username=BENCH_USERNAME).first() or User(
+        username=BENCH_USERNAME, first_name='Bench', last_name='User')
+    user.set_password(BENCH_PASSWORD)
+    user.is_verified = True
+    user.save()
+
+    expires_at = django_timezone.now() + django_timezone.timedelta(days=1)
+    codes = [f'bench-{run_id}-{i}' for i in range(verify_codes)]
+    for start in range(0, len(codes), 5000):
+        UserVerification.objects.bulk_create(
+            UserVerification(user=user, verification_code=code, expires_at=expires_at)
+            for code in codes[start:start + 5000]
+        )
+    return codes
+
+
+def request_factories(run_id, codes):
+    """
+    Returns ``make_request(worker, seq)`` callables per scenario.
+    """
+    auth = 'Basic ' + base64.b64encode(f'{BENCH_USERNAME}:{BENCH_PASSWORD}'.encode('utf-8')).decode('utf-8')
+    json_headers = {'Connection': 'keep-alive', 'Content-Type': 'application/json'}
+    auth_headers = {'Connection': 'keep-alive', 'Authorization': auth}
+    plain_headers = {'Connection': 'keep-alive'}
+    # Each verification request consumes a fresh code; once they run out the 400 path is measured.
+    next_code = itertools.count()
+    # Shared across the warmup and measured runs, which both restart ``seq`` at zero.
+    next_username = itertools.count()
+
+    def create_user(worker, seq):
+        body = json.dumps({'username': f'bench-{run_id}-{next(next_username)}@example.com', 'password': BENCH_PASSWORD,
+                           'first_name': 'Bench', 'last_name': 'User'})
+        return 'POST', '/v1/user', json_headers, body
+
+    def put_user(worker, seq):
+        return 'PUT', '/v1/user/self', {**auth_headers, **json_headers}, json.dumps({'first_name': f'Bench{seq}'})
+
+    def verify(worker, seq):
+        code = codes[next(next_code) % len(codes)]
+        return 'GET', f'/v1/verify?code=x/{code}', plain_headers, None
+
+    return {
+        'ping': lambda worker, seq: ('GET', '/ping', plain_headers, None),
+        'healthz': lambda worker, seq: ('GET', '/healthz', plain_headers, None),
+        'create_user': create_user,
+        'get_user': lambda worker, seq: ('GET', '/v1/user/self', auth_headers, None),
+        'put_user': put_user,
+        'verify': verify,
+    }
+
+
+def start_server(port, workers, asgi):
+    """
+    Starts gunicorn on ``port`` with the benchmark settings and waits until /ping answers.
+    """
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': 'benchmarks.settings',
+        'APP_PORT': str(port),
+        'GUNICORN_WORKERS': str(workers),
+        'GUNICORN_LOG_LEVEL': 'warning',
+    }
+    app = 'webapp.wsgi:application'
+    if asgi:
+        env['GUNICORN_WORKER_CLASS'] = 'uvicorn.workers.UvicornWorker'
+        app = 'webapp.asgi:application'
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', os.path.join(REPO_DIR, 'webapp', 'gunicorn.conf.py'), app],
+        cwd=REPO_DIR, env=env,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {server.returncode}")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/ping')
+            if conn.getresponse().status == 200:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError("gunicorn did not start within 60s")
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_DIR,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, dirty
+
+
+def run_suite(base_url, scenarios, factories, concurrency, duration, warmup, server_cores):
+    results = {}
+    for name in scenarios:
+        if warmup:
+            run_requests(base_url, factories[name], concurrency, warmup)
+        latencies, statuses, elapsed = run_requests(base_url, factories[name], concurrency, duration)
+        rps = len(latencies) / elapsed if elapsed else 0.0
+        results[name] = {
+            **summarize(latencies),
+            'requests_per_sec': rps,
+            'requests_per_sec_per_core': rps / server_cores,
+            'statuses': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        }
+        summary = results[name]
+        print(f"{name:<12} req/s={rps:9.1f} p50={summary['p50_ms']:8.2f}ms p95={summary['p95_ms']:8.2f}ms "
+              f"p99={summary['p99_ms']:8.2f}ms statuses={summary['statuses']}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default=None, help="Benchmark an already running server instead of starting one.")
+    parser.add_argument('--start-server', action='store_true', help="Start gunicorn with benchmarks.settings.")
+    parser.add_argument('--asgi', action='store_true', help="With --start-server, serve webapp.asgi via uvicorn.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--warmup', type=float, default=2, help="Seconds of unrecorded load before each scenario.")
+    parser.add_argument('--verify-codes', type=int, default=20000)
+    parser.add_argument('--server-cores', type=int, default=os.cpu_count())
+    parser.add_argument('--output', default=None, help="JSON results path (default: BENCH_DIR/bench-<commit>.json).")
+    args = parser.parse_args()
+    if not args.url and not args.start_server:
+        parser.error("pass --url for a running server or --start-server")
+
+    setup_django()
+    from django.conf import settings
+
+    run_id = uuid.uuid4().hex[:8]
+    codes = seed(run_id, args.verify_codes if 'verify' in args.scenarios else 0)
+    factories = request_factories(run_id, codes)
+
+    server = start_server(args.port, args.workers, args.asgi) if args.start_server else None
+    base_url = args.url or f'http://127.0.0.1:{args.port}'
+    try:
+        results = run_suite(base_url, args.scenarios, factories, args.concurrency, args.duration, args.warmup,
+                            args.server_cores)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    commit, dirty = git_revision()
+    report = {
+        'meta': {
+            'commit': commit,
+            'dirty': dirty,
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'database': settings.DATABASES['default']['ENGINE'],
+            'server': ('gunicorn-asgi' if args.asgi else 'gunicorn-wsgi') if server else urlsplit(base_url).netloc,
+            'workers': args.workers if server else None,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'server_cores': args.server_cores,
+        },
+        'scenarios': results,
+    }
+    output = args.output or os.path.join(settings.BENCH_DIR, f"bench-{(commit or 'unknown')[:10]}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
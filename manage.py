@@ -1,22 +1,10 @@
 #!/usr/bin/env python
 import os
 import sys
-import structlog
-import builtins
-from dotenv import load_dotenv
 
-from utils.msg_publisher import PubSubMessagePublisher
+from webapp import bootstrap
 
-# Load .env file
-dot_env_path = os.path.join(os.path.dirname(__file__), 'config', '.env')
-load_dotenv(dot_env_path)
-
-builtins.logger = structlog.get_logger(__name__)
-
-if os.getenv('PROJECT_ID'):
-    builtins.msg_publisher = PubSubMessagePublisher(os.getenv('PROJECT_ID'))
-else:
-    logger.error("Failed to create publisher as project id is missing.")
+bootstrap.initialize()
 
 if __name__ == "__main__":
     logger.info("Initializing application.")
@@ -4,3 +4,21 @@ from django.apps import AppConfig
 class MyappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'myapp'
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_save
+        from utils import json_codec
+        from utils.metrics import install_query_metrics_hook
+        from utils.request_profile import install_query_accounting_hook
+        from .db_health import install_query_error_hook
+        from .known_usernames import record_new_user
+        from .models import User
+
+        json_codec.configure(settings.JSON_CODEC)
+
+        connection_created.connect(install_query_error_hook, dispatch_uid='myapp.db_health')
+        connection_created.connect(install_query_metrics_hook, dispatch_uid='utils.metrics')
+        connection_created.connect(install_query_accounting_hook, dispatch_uid='utils.request_profile')
+        post_save.connect(record_new_user, sender=User, dispatch_uid='myapp.known_usernames')
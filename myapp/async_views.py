@@ -0,0 +1,373 @@
+# myapp/async_views.py
+"""
+Async variants of the user endpoints, routed by ``webapp.urls_async`` under the ASGI entry point.
+
+They mirror the views in ``myapp.views`` but await the ORM and the bcrypt pool
+instead of holding a thread while MySQL or bcrypt work is in flight.
+"""
+import json
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponseNotAllowed, HttpResponseBadRequest, HttpResponse, StreamingHttpResponse
+
+from utils import json_codec
+from utils.json_codec import JsonResponse
+
+from .credential_cache import credential_cache
+from .exports import CONTENT_TYPES as EXPORT_CONTENT_TYPES, astream_export
+from .hashing import HashingUnavailable, acheck_password, amake_password
+from .known_usernames import known_usernames
+from .models import OutboxMessage, User, UserVerification
+from .profile_cache import profile_cache
+from .fast_serializers import CreateUserSerializer, UpdateUserSerializer
+from .rate_limit import RateLimited, rate_limiter
+from .views import (authorization_result, export_format, hashing_unavailable_response, internal_request_error,
+                    parse_basic_auth, parse_lookup_request, rate_limited_response, redact_password,
+                    unexpected_error_response, user_already_exists_response, user_lookup_queryset,
+                    user_lookup_response, user_profile, verification_email_message, verification_failure_response)
+
+
+def method_not_allowed(request, allowed):
+    logger.error(
+        event="method_not_allowed",
+        message=f"Method '{request.method}' not allowed for endpoint '{request.path}'.",
+        method=request.method,
+        request_id=request.request_id,
+        path=request.path,
+        user_agent=request.headers.get('User-Agent')
+    )
+    return HttpResponseNotAllowed(allowed)
+
+
+def save_new_user(serializer, encoded_password):
+    # The outbox row commits (or rolls back) together with the user
+    with transaction.atomic():
+        user = serializer.save(encoded_password=encoded_password)
+        OutboxMessage.objects.enqueue("verify_email", verification_email_message(user), f"verify_email:{user.id}")
+    return user
+
+
+async def aexisting_user_response(request, user):
+    if user.is_verified:
+        return user_already_exists_response(request, user.username)
+    await OutboxMessage.objects.aenqueue("verify_email", verification_email_message(user),
+                                         f"verify_email:{user.id}:{uuid.uuid4().hex}")
+    return JsonResponse({
+        'error': 'User with this username already exists. Please verify your email to activate your account.'},
+        status=400)
+
+
+async def create_user(request):
+    try:
+        logger.debug(
+            method=request.method,
+            request_id=request.request_id,
+            endpoint="create_user",
+            event="create_user_attempt",
+            message="Create user endpoint accessed."
+        )
+        if request.method != 'POST':
+            return method_not_allowed(request, ['POST'])
+
+        try:
+            request_data = json_codec.loads(request.body)
+        except json.JSONDecodeError as e:
+            logger.error(
+                method=request.method,
+                request_id=request.request_id,
+                endpoint="create_user",
+                event="json_decode_error",
+                message="Error decoding JSON in create_user.",
+                error=str(e)
+            )
+            return HttpResponseBadRequest(status=400)
+
+        username = request_data.get('username')
+        user = None
+        if known_usernames.might_exist(username):
+            user = await User.objects.filter(username=username).afirst()
+        if user:
+            return await aexisting_user_response(request, user)
+
+        # Uniqueness was checked above, so validation needs no query; a concurrent signup fails the insert instead
+        serializer = CreateUserSerializer(data=request_data, validate_unique=False)
+        if not serializer.is_valid():
+            logger.error(
+                method=request.method,
+                request_id=request.request_id,
+                endpoint="create_user",
+                event="serializer_errors",
+                message="Serializer errors in create_user.",
+                errors=serializer.errors,
+                request_data=redact_password(request_data)
+            )
+            return HttpResponseBadRequest(status=400)
+
+        encoded_password = await amake_password(serializer.validated_data['password'])
+        try:
+            user = await sync_to_async(save_new_user)(serializer, encoded_password)
+        except IntegrityError:
+            # Taken after the check (or known_usernames had not seen it yet); answer as the check would have
+            user = await User.objects.filter(username=username).afirst()
+            if user is None:
+                return user_already_exists_response(request, username)
+            return await aexisting_user_response(request, user)
+        logger.info(
+            method=request.method,
+            request_id=request.request_id,
+            endpoint="create_user",
+            event="user_created",
+            message="User created successfully.",
+            username=user.username,
+        )
+        return JsonResponse(
+            {'message': 'User created successfully. Please verify your email to activate your account.',
+             'data': serializer.data}, status=201)
+    except HashingUnavailable as e:
+        return hashing_unavailable_response(request, "create_user", e)
+    except Exception as e:
+        return unexpected_error_response(request, "create_user", "create_user_error", "create user", e)
+
+
+async def auser_profile(user):
+    """
+    Awaitable ``user_profile``; a shared profile cache backend is a network call, so it runs off the event loop.
+    """
+    if profile_cache.backend:
+        return await sync_to_async(user_profile)(user)
+    return user_profile(user)
+
+
+async def aget_user_from_credentials(request):
+    credentials = parse_basic_auth(request)
+    if credentials is None:
+        return None, "Invalid Request, Need Authorization header", 401
+    username, password = credentials
+    await rate_limiter.acheck(request, username)
+    if not known_usernames.might_exist(username):
+        await rate_limiter.arecord_failure(username)
+        return authorization_result(request, username, None, False)
+
+    try:
+        user = await User.objects.aget(username=username)
+    except User.DoesNotExist:
+        known_usernames.remember_missing(username)
+        await rate_limiter.arecord_failure(username)
+        return authorization_result(request, username, None, False)
+
+    if credential_cache.is_verified(username, password, user):
+        password_valid = True
+    else:
+        password_valid = await acheck_password(password, user.password)
+        if password_valid:
+            credential_cache.remember(username, password, user)
+        else:
+            await rate_limiter.arecord_failure(username)
+    return authorization_result(request, username, user, password_valid)
+
+
+async def user_info(request):
+    try:
+        logger.debug(
+            method=request.method,
+            request_id=request.request_id,
+            endpoint="user_info",
+            event="get_user_info_accessed",
+            message="Get user info endpoint accessed."
+        )
+        if request.method not in ('GET', 'PUT'):
+            return method_not_allowed(request, ['GET', 'PUT'])
+
+        user, msg, resp_status = await aget_user_from_credentials(request)
+        if not user:
+            return JsonResponse({'error': msg}, status=resp_status)
+
+        if request.method == 'GET':
+            if request.body or request.GET:
+                logger.error(
+                    method=request.method,
+                    request_id=request.request_id,
+                    endpoint="user_info",
+                    event="bad_request_body" if request.body else "bad_query_parameter",
+                    message="Bad request received for get user info endpoint."
+                )
+                return HttpResponseBadRequest(status=400)
+            data, cache_hit = await auser_profile(user)
+            logger.info(
+                method=request.method,
+                request_id=request.request_id,
+                endpoint="user_info",
+                user_name=user.username,
+                event="success event ",
+                message="user data fetched successfully.",
+                profile_cache_hit=cache_hit
+            )
+            return JsonResponse(data, status=200)
+
+        if request.GET:
+            logger.error(
+                method=request.method,
+                request_id=request.request_id,
+                endpoint="user_info",
+                event="bad_query_parameter",
+                message="Bad query parameter received for update user info endpoint."
+            )
+            return HttpResponseBadRequest(status=400)
+        request_data = json_codec.loads(request.body)
+
+        unexpected_keys = set(request_data.keys()) - {'first_name', 'last_name', 'password'}
+        if unexpected_keys:
+            logger.warn(
+                method=request.method,
+                request_id=request.request_id,
+                endpoint="user_info",
+                event="unexpected_keys",
+                message=f"Failed to update to user info for user: {user.username}",
+            )
+            return HttpResponseBadRequest(status=400)
+
+        serializer = UpdateUserSerializer(user, data=request_data)
+        if not serializer.is_valid():
+            logger.error(
+                method=request.method,
+                request_id=request.request_id,
+                endpoint="user_info",
+                event="serializer_errors",
+                message=f"Failed to update to user info for user: {user.username}",
+                errors=serializer.errors
+            )
+            return HttpResponseBadRequest(status=400)
+
+        encoded_password = None
+        if serializer.validated_data.get('password'):
+            encoded_password = await amake_password(serializer.validated_data['password'])
+        await sync_to_async(serializer.save)(encoded_password=encoded_password)
+        logger.info(
+            method=request.method,
+            request_id=request.request_id,
+            endpoint="user_info",
+            user_name=user.username,
+            event="success event ",
+            message="user data updated successfully."
+        )
+        return HttpResponse(status=204)
+    except HashingUnavailable as e:
+        return hashing_unavailable_response(request, "user_info", e)
+    except RateLimited as e:
+        return rate_limited_response(request, "user_info", e)
+    except Exception as e:
+        return unexpected_error_response(request, "user_info", "error_processing_user_info", "user info", e)
+
+
+async def verify_user(request):
+    try:
+        logger.debug(
+            method=request.method,
+            request_id=request.request_id,
+            endpoint="verify_user",
+            event="verify_user_accessed",
+            message="Verify user endpoint accessed."
+        )
+        verification_code = request.GET.get('code')
+        if not verification_code:
+            logger.error(
+                method=request.method,
+                request_id=request.request_id,
+                endpoint="verify_user",
+                event="verification_code_missing",
+                message="Verification code is missing."
+            )
+            return JsonResponse({'error': 'Verification code is missing'}, status=400)
+
+        try:
+            verification_code = verification_code.split('/')[1]
+        except IndexError as e:
+            logger.error(
+                method=request.method,
+                request_id=request.request_id,
+                endpoint="verify_user",
+                event="invalid_verification_code",
+                message="Invalid verification code.",
+                error=str(e)
+            )
+            return JsonResponse({'error': 'Invalid verification code'}, status=404)
+
+        if not await UserVerification.objects.aconsume(verification_code):
+            verification = await UserVerification.objects.filter(verification_code=verification_code).values(
+                'is_used', 'expires_at').afirst()
+            return verification_failure_response(request, verification)
+
+        logger.info(
+            method=request.method,
+            request_id=request.request_id,
+            endpoint="verify_user",
+            event="user_verified",
+            message="User verified successfully."
+        )
+
+        return JsonResponse({'success': 'User verified successfully'})
+    except Exception as e:
+        logger.error(
+            method=request.method,
+            request_id=request.request_id,
+            endpoint="verify_user",
+            event="error_processing_verification",
+            message="An error occurred while processing user verification.",
+            error=str(e)
+        )
+        return JsonResponse({'error': 'An error occurred while processing verification. Please try again later.'},
+                            status=500)
+
+
+async def export_users(request):
+    error = internal_request_error(request, "export_users", ['GET'])
+    if error is not None:
+        return error
+    requested_format = export_format(request)
+    if requested_format is None:
+        return HttpResponseBadRequest(status=400)
+    logger.info(
+        method=request.method,
+        request_id=request.request_id,
+        endpoint="export_users",
+        event="export_started",
+        message="User export started.",
+        format=requested_format
+    )
+    response = StreamingHttpResponse(astream_export(requested_format, settings.EXPORT_CHUNK_SIZE),
+                                     content_type=EXPORT_CONTENT_TYPES[requested_format])
+    response['Content-Disposition'] = f'attachment; filename="users.{requested_format}"'
+    return response
+
+
+async def lookup_users(request):
+    error = internal_request_error(request, "lookup_users", ['POST'])
+    if error is not None:
+        return error
+    try:
+        ids, usernames = parse_lookup_request(request)
+    except ValueError as e:
+        logger.warn(
+            method=request.method,
+            request_id=request.request_id,
+            endpoint="lookup_users",
+            event="bad_request_body",
+            message="Bad request body received for user lookup endpoint.",
+            error=str(e)
+        )
+        return JsonResponse({'error': str(e)}, status=400)
+    queryset = user_lookup_queryset(ids, usernames)
+    users = [user async for user in queryset] if queryset is not None else []
+    logger.info(
+        method=request.method,
+        request_id=request.request_id,
+        endpoint="lookup_users",
+        event="users_looked_up",
+        message="Batch user lookup served.",
+        requested=len(ids) + len(usernames),
+        found=len(users)
+    )
+    return user_lookup_response(users, ids, usernames)
@@ -0,0 +1,95 @@
+# myapp/credential_cache.py
+import hashlib
+import hmac
+import secrets
+import threading
+
+from cachetools import TTLCache
+from django.conf import settings
+
+from utils.metrics import CREDENTIAL_CACHE_REQUESTS
+
+
+class VerifiedCredentialCache:
+    """
+    Bounded, TTL-evicting cache of successful Basic auth verifications.
+
+    Entries are keyed by an HMAC of the (username, password) pair using a key
+    generated at process start, so plaintext passwords are never retained. Each
+    entry remembers the password hash it was verified against; a hit is only
+    honoured while the user's stored hash is unchanged. Lookups are counted in
+    ``credential_cache_requests_total`` by result.
+
+    Attributes:
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that fell through to bcrypt.
+    """
+
+    def __init__(self, maxsize, ttl):
+        """
+        Initializes the cache.
+
+        Args:
+            maxsize (int): Maximum number of remembered credentials.
+            ttl (int): Seconds a verification stays valid.
+        """
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._key = secrets.token_bytes(32)
+        self.hits = 0
+        self.misses = 0
+
+    def _digest(self, username, password):
+        message = username.encode('utf-8') + b'\x00' + password.encode('utf-8')
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def is_verified(self, username, password, user):
+        """
+        Returns True if the credentials were recently verified against the user's current password hash.
+
+        Args:
+            username (str): The username from the Authorization header.
+            password (str): The password from the Authorization header.
+            user (User): The user loaded for ``username``.
+        """
+        digest = self._digest(username, password)
+        with self._lock:
+            entry = self._cache.get(digest)
+            if entry is not None and entry == (user.pk, user.password):
+                self.hits += 1
+                CREDENTIAL_CACHE_REQUESTS.labels('hit').inc()
+                return True
+            self.misses += 1
+            CREDENTIAL_CACHE_REQUESTS.labels('miss').inc()
+            return False
+
+    def remember(self, username, password, user):
+        """
+        Records a successful bcrypt verification of the credentials for the user.
+        """
+        digest = self._digest(username, password)
+        with self._lock:
+            self._cache[digest] = (user.pk, user.password)
+
+    def invalidate_user(self, user):
+        """
+        Drops every cached verification for the given user.
+        """
+        with self._lock:
+            stale = [digest for digest, (pk, _) in self._cache.items() if pk == user.pk]
+            for digest in stale:
+                self._cache.pop(digest, None)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._cache)}
+
+
+credential_cache = VerifiedCredentialCache(
+    maxsize=settings.CREDENTIAL_CACHE_SIZE,
+    ttl=settings.CREDENTIAL_CACHE_TTL,
+)
@@ -0,0 +1,124 @@
+# myapp/db_health.py
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, InterfaceError, OperationalError
+
+
+class DatabaseHealthProbe:
+    """
+    Keeps a cached view of database liveness so requests do not each pay a ``SELECT 1``.
+
+    A background thread re-checks the database every ``interval`` seconds, or
+    every ``failure_interval`` seconds while it is down. Connection-level errors
+    raised by real queries trigger an immediate re-check. With ``interval`` set
+    to 0 no thread is started and every call to ``is_healthy`` checks inline.
+
+    Attributes:
+        healthy (bool): Result of the last check, or None before the first one.
+        last_error (str): Error from the last failed check.
+        checked_at (float): ``time.monotonic()`` of the last check.
+    """
+
+    def __init__(self, interval, failure_interval):
+        """
+        Args:
+            interval (float): Seconds between checks while the database is up.
+            failure_interval (float): Seconds between checks while the database is down.
+        """
+        self.interval = interval
+        self.failure_interval = failure_interval
+        self.healthy = None
+        self.last_error = None
+        self.checked_at = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+    def is_healthy(self):
+        """
+        Returns the cached liveness state, checking inline only before the first probe has run.
+        """
+        healthy = self.cached_state()
+        if healthy is None:
+            return self.check()
+        return healthy
+
+    def cached_state(self):
+        """
+        Returns the cached state, or None when the caller has to run ``check`` itself.
+        """
+        if self.interval <= 0:
+            return None
+        return self.healthy
+
+    def check(self):
+        """
+        Runs ``SELECT 1`` on the calling thread's connection and records the result.
+        """
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except Exception as e:
+            self.last_error = str(e)
+            self.healthy = False
+        else:
+            self.last_error = None
+            self.healthy = True
+        self.checked_at = time.monotonic()
+        return self.healthy
+
+    def report_error(self, error):
+        """
+        Records a connection-level error seen by a real query and asks for an immediate re-check.
+        """
+        self.last_error = str(error)
+        if self._thread is None:
+            self.healthy = None
+        self._wake.set()
+
+    def start(self):
+        """
+        Starts the background probe thread, once per process.
+        """
+        if self.interval <= 0:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='db-health-probe', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self.check()
+            # Keep the probe's own connection subject to CONN_MAX_AGE like any request thread.
+            connection.close_if_unusable_or_obsolete()
+            self._wake.wait(self.interval if self.healthy else self.failure_interval)
+            self._wake.clear()
+
+
+db_probe = DatabaseHealthProbe(
+    interval=settings.DB_HEALTH_CHECK_INTERVAL,
+    failure_interval=settings.DB_HEALTH_CHECK_FAILURE_INTERVAL,
+)
+
+
+def report_query_errors(execute, sql, params, many, context):
+    """
+    Execute wrapper that feeds connection-level query failures to the health probe.
+    """
+    try:
+        return execute(sql, params, many, context)
+    except (OperationalError, InterfaceError) as e:
+        db_probe.report_error(e)
+        raise
+
+
+def install_query_error_hook(sender, connection, **kwargs):
+    """
+    ``connection_created`` receiver that installs ``report_query_errors`` on each new connection.
+    """
+    if report_query_errors not in connection.execute_wrappers:
+        connection.execute_wrappers.append(report_query_errors)
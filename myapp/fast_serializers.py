@@ -0,0 +1,241 @@
+# myapp/fast_serializers.py
+"""
+Hand-written serializers for the fixed User request and response shapes.
+
+They replace the DRF serializers in ``myapp.serializers`` on the request path with
+the same ``is_valid``/``errors``/``validated_data``/``save``/``data`` interface,
+byte-identical output and the same error messages and codes, but without building
+ModelSerializer fields on every instantiation. Field rules are compiled once at
+import from the same DRF and model definitions. ``myapp.serializers`` stays the
+reference implementation they are tested against.
+"""
+from collections.abc import Mapping
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import EmailValidator, ProhibitNullCharactersValidator
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.fields import get_error_detail
+from rest_framework.settings import api_settings
+
+from .models import User
+from .serializers import create_user, update_user
+
+DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+_missing = object()
+
+
+class _SkipField(Exception):
+    pass
+
+
+class _FieldError(Exception):
+    def __init__(self, details):
+        self.details = details
+
+
+class StringField:
+    """
+    Precompiled validation rules of a DRF ``CharField``: required, blank, null, type,
+    whitespace trimming, max length, null characters, plus optional uniqueness and email checks.
+    """
+
+    def __init__(self, name, required=True, max_length=None, unique=False, email=False):
+        self.name = name
+        self.required = required
+        self.max_length = max_length
+        field = serializers.EmailField(max_length=max_length) if email else serializers.CharField(max_length=max_length)
+        self.messages = field.error_messages
+        self.validators = [ProhibitNullCharactersValidator()]
+        if email:
+            self.validators.append(EmailValidator(message=self.messages['invalid']))
+        self.unique_message = None
+        if unique:
+            model_field = User._meta.get_field(name)
+            self.unique_message = model_field.error_messages['unique'] % {
+                'model_name': User._meta.verbose_name,
+                'field_label': model_field.verbose_name,
+            }
+
+    def fail(self, key, **kwargs):
+        raise _FieldError([ErrorDetail(str(self.messages[key]).format(**kwargs), code=key)])
+
+    def validate(self, data, instance, validate_unique=True):
+        """
+        Returns the cleaned value for ``data``, in the order DRF's ``CharField.run_validation`` checks it.
+
+        With ``validate_unique`` False the uniqueness query is skipped and left to the database constraint.
+
+        Raises:
+            _SkipField: If the field is optional and absent.
+            _FieldError: If the value is invalid.
+        """
+        if data is _missing:
+            if self.required:
+                self.fail('required')
+            raise _SkipField()
+        if data == '' or str(data).strip() == '':
+            self.fail('blank')
+        if data is None:
+            self.fail('null')
+        if isinstance(data, bool) or not isinstance(data, (str, int, float)):
+            self.fail('invalid')
+        value = str(data).strip()
+
+        # Like DRF's run_validators: every validator runs and all their errors are reported
+        errors = []
+        if self.unique_message is not None and validate_unique:
+            queryset = User._default_manager.filter(**{self.name: value})
+            if instance is not None:
+                queryset = queryset.exclude(pk=instance.pk)
+            if queryset.exists():
+                errors.append(ErrorDetail(self.unique_message, code='unique'))
+        if self.max_length is not None and len(value) > self.max_length:
+            errors.append(ErrorDetail(str(self.messages['max_length']).format(max_length=self.max_length),
+                                      code='max_length'))
+        for validator in self.validators:
+            try:
+                validator(value)
+            except DjangoValidationError as e:
+                errors.extend(get_error_detail(e))
+        if errors:
+            raise _FieldError(errors)
+        return value
+
+
+def format_datetime(value):
+    """
+    Formats ``value`` like DRF's ``DateTimeField(format=DATETIME_FORMAT)`` under ``USE_TZ``.
+    """
+    if not value:
+        return None
+    current = timezone.get_current_timezone()
+    if timezone.is_aware(value):
+        value = value.astimezone(current)
+    else:
+        value = timezone.make_aware(value, current)
+    return value.strftime(DATETIME_FORMAT)
+
+
+def user_representation(user):
+    """
+    Returns the profile dict ``UserSerializer(user).data`` would, with the same key order.
+    """
+    return {
+        'id': None if user.id is None else str(user.id),
+        'first_name': None if user.first_name is None else str(user.first_name),
+        'last_name': None if user.last_name is None else str(user.last_name),
+        'username': None if user.username is None else str(user.username),
+        'account_created': format_datetime(user.account_created),
+        'account_updated': format_datetime(user.account_updated),
+    }
+
+
+class FastSerializer:
+    """
+    Minimal stand-in for a DRF serializer over a fixed tuple of ``StringField`` rules.
+
+    Subclasses set ``fields`` and implement ``create``/``update``. Pass
+    ``validate_unique=False`` when the caller has already looked the value up
+    and will handle the database's ``IntegrityError`` instead.
+    """
+    fields = ()
+    write_only_fields = ()
+    invalid_message = serializers.Serializer.default_error_messages['invalid']
+
+    def __init__(self, instance=None, data=_missing, validate_unique=True):
+        self.instance = instance
+        self.initial_data = data
+        self.validate_unique = validate_unique
+
+    def is_valid(self, raise_exception=False):
+        self._errors = {}
+        self._validated_data = {}
+        data = self.initial_data
+        if data is None:
+            self._errors = {api_settings.NON_FIELD_ERRORS_KEY: [ErrorDetail('No data provided', code='null')]}
+        elif not isinstance(data, Mapping):
+            message = str(self.invalid_message).format(datatype=type(data).__name__)
+            self._errors = {api_settings.NON_FIELD_ERRORS_KEY: [ErrorDetail(message, code='invalid')]}
+        else:
+            validated = {}
+            for field in self.fields:
+                try:
+                    validated[field.name] = field.validate(data.get(field.name, _missing), self.instance,
+                                                           self.validate_unique)
+                except _SkipField:
+                    pass
+                except _FieldError as e:
+                    self._errors[field.name] = e.details
+            if not self._errors:
+                self._validated_data = validated
+        if self._errors and raise_exception:
+            raise serializers.ValidationError(self._errors)
+        return not self._errors
+
+    @property
+    def errors(self):
+        return self._errors
+
+    @property
+    def validated_data(self):
+        return self._validated_data
+
+    def save(self, **kwargs):
+        validated_data = {**self.validated_data, **kwargs}
+        if self.instance is not None:
+            self.instance = self.update(self.instance, validated_data)
+        else:
+            self.instance = self.create(validated_data)
+        return self.instance
+
+    @property
+    def data(self):
+        if self.instance is not None:
+            return self.to_representation(self.instance)
+        return {field.name: value for field, value in
+                ((field, self.validated_data.get(field.name, _missing)) for field in self.fields)
+                if value is not _missing and field.name not in self.write_only_fields}
+
+    def to_representation(self, instance):
+        return user_representation(instance)
+
+    def create(self, validated_data):
+        raise NotImplementedError('`create()` must be implemented.')
+
+    def update(self, instance, validated_data):
+        raise NotImplementedError('`update()` must be implemented.')
+
+
+class UserSerializer(FastSerializer):
+    pass
+
+
+class CreateUserSerializer(FastSerializer):
+    fields = (
+        StringField('first_name', max_length=100),
+        StringField('last_name', max_length=100),
+        StringField('username', max_length=254, unique=True, email=True),
+        StringField('password'),
+    )
+    write_only_fields = ('password',)
+
+    def create(self, validated_data):
+        return create_user(validated_data)
+
+
+class UpdateUserSerializer(FastSerializer):
+    fields = (
+        StringField('first_name', required=False, max_length=100),
+        StringField('last_name', required=False, max_length=100),
+        StringField('password', required=False, max_length=128),
+    )
+
+    def update(self, instance, validated_data):
+        return update_user(instance, validated_data)
+
+    def to_representation(self, instance):
+        return {field.name: None if getattr(instance, field.name) is None else str(getattr(instance, field.name))
+                for field in self.fields}
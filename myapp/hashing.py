@@ -0,0 +1,200 @@
+# myapp/hashing.py
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+from utils import request_profile
+from utils.metrics import PASSWORD_HASH_LATENCY, PASSWORD_HASH_QUEUE_WAIT, PASSWORD_HASH_REJECTED
+
+
+class HashingUnavailable(Exception):
+    """
+    Raised when a password hash cannot be admitted to, or completed by, the hashing pool.
+    """
+
+
+class _Timing:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total': self.total,
+            'avg': self.total / self.count if self.count else 0.0,
+            'max': self.max,
+        }
+
+
+class HashingExecutor:
+    """
+    Bounded worker pool for bcrypt hashing and verification.
+
+    At most ``max_workers`` hashes run at once and at most ``queue_depth`` more
+    may wait; anything beyond that is rejected immediately with
+    ``HashingUnavailable`` instead of piling up behind the pool. Time spent
+    waiting for a thread is exported as ``password_hash_queue_wait_seconds``
+    and rejections as ``password_hash_rejected_total``; the hash itself is timed
+    by ``password_hash_duration_seconds``.
+
+    Attributes:
+        rejected (int): Number of submissions refused because the pool was full.
+    """
+
+    def __init__(self, max_workers, queue_depth, timeout):
+        """
+        Initializes the executor. Worker threads are started on first use.
+
+        Args:
+            max_workers (int): Number of hashing threads.
+            queue_depth (int): Number of hashes allowed to wait for a free thread.
+            timeout (float): Seconds a caller waits for its hash before giving up.
+        """
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_workers + queue_depth)
+        self._queue_wait = _Timing()
+        self._hash_time = _Timing()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # Worker threads do not survive a fork; start a fresh pool in the child.
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.queue_depth)
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix='hashing')
+        return self._executor
+
+    def submit(self, fn, *args):
+        """
+        Schedules ``fn(*args)`` on the pool and returns its future.
+
+        Raises:
+            HashingUnavailable: If the pool and its queue are full.
+        """
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            PASSWORD_HASH_REJECTED.inc()
+            raise HashingUnavailable('Password hashing queue is full.')
+
+        enqueued_at = time.monotonic()
+
+        def task():
+            started_at = time.monotonic()
+            PASSWORD_HASH_QUEUE_WAIT.observe(started_at - enqueued_at)
+            try:
+                return fn(*args)
+            finally:
+                finished_at = time.monotonic()
+                with self._lock:
+                    self._queue_wait.add(started_at - enqueued_at)
+                    self._hash_time.add(finished_at - started_at)
+
+        try:
+            future = self._get_executor().submit(task)
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future
+
+    def run(self, fn, *args):
+        """
+        Runs ``fn(*args)`` on the pool and waits for the result.
+
+        Raises:
+            HashingUnavailable: If the pool is full or the hash does not finish within the timeout.
+        """
+        future = self.submit(fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HashingUnavailable('Timed out waiting for password hashing.')
+
+    async def arun(self, fn, *args):
+        """
+        Awaitable variant of ``run`` that does not block the event loop while the hash runs.
+        """
+        future = asyncio.wrap_future(self.submit(fn, *args))
+        try:
+            return await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise HashingUnavailable('Timed out waiting for password hashing.')
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'queue_depth': self.queue_depth,
+                'rejected': self.rejected,
+                'queue_wait_seconds': self._queue_wait.as_dict(),
+                'hash_seconds': self._hash_time.as_dict(),
+            }
+
+
+hashing_executor = HashingExecutor(
+    max_workers=settings.HASHING_POOL_SIZE,
+    queue_depth=settings.HASHING_QUEUE_DEPTH,
+    timeout=settings.HASHING_TIMEOUT,
+)
+
+
+def _timed_make_password(password):
+    with PASSWORD_HASH_LATENCY.labels('make').time():
+        return hashers.make_password(password)
+
+
+def _timed_check_password(password, encoded):
+    with PASSWORD_HASH_LATENCY.labels('check').time():
+        return hashers.check_password(password, encoded)
+
+
+def make_password(password):
+    """
+    Hashes ``password`` with the configured hasher on the hashing pool.
+    """
+    with request_profile.timed('bcrypt_seconds'):
+        return hashing_executor.run(_timed_make_password, password)
+
+
+def check_password(password, encoded):
+    """
+    Verifies ``password`` against ``encoded`` on the hashing pool.
+    """
+    with request_profile.timed('bcrypt_seconds'):
+        return hashing_executor.run(_timed_check_password, password, encoded)
+
+
+async def amake_password(password):
+    with request_profile.timed('bcrypt_seconds'):
+        return await hashing_executor.arun(_timed_make_password, password)
+
+
+async def acheck_password(password, encoded):
+    with request_profile.timed('bcrypt_seconds'):
+        return await hashing_executor.arun(_timed_check_password, password, encoded)
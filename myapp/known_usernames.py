@@ -0,0 +1,265 @@
+# myapp/known_usernames.py
+import hashlib
+import math
+import threading
+import time
+import unicodedata
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+
+def username_key(username):
+    """
+    Folds a username the way MySQL's case- and accent-insensitive collation compares it.
+
+    Keys are only ever used to answer "definitely absent", so folding more than the
+    database does is safe while folding less would turn existing users away.
+    """
+    decomposed = unicodedata.normalize('NFKD', username)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold().rstrip(' ')
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic set: ``item in filter`` is False only for items never added.
+
+    Sized for ``capacity`` items at roughly ``error_rate`` false positives; past
+    that the false-positive rate climbs but there are still no false negatives.
+
+    Attributes:
+        count (int): Distinct items added (items colliding with earlier ones are not counted).
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        new = False
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not self._bits[position >> 3] & mask:
+                self._bits[position >> 3] |= mask
+                new = True
+        # Re-adding an item (refreshes overlap) does not count towards capacity
+        if new:
+            self.count += 1
+
+    def __contains__(self, item):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class KnownUsernames:
+    """
+    Answers "does this username definitely not exist?" without touching the database.
+
+    A Bloom filter of every username is loaded by a background thread on first
+    use and then refreshed every ``refresh_interval`` seconds with the accounts
+    created since the last refresh (an ``account_created`` watermark, re-reading
+    ``overlap`` seconds to catch late commits). Accounts created in this process
+    are added immediately. A short-TTL negative cache remembers names the
+    database just confirmed missing, which covers Bloom false positives and the
+    time before the first load. Until the filter is loaded every name may exist.
+
+    Accounts created by another process are unknown here for up to
+    ``refresh_interval`` seconds (``negative_ttl`` if the name was just looked up),
+    so keep both short. With ``refresh_interval`` set to 0 no filter is kept.
+
+    Attributes:
+        skipped (int): Lookups answered "absent" without a query.
+    """
+
+    def __init__(self, capacity, error_rate, refresh_interval, negative_size, negative_ttl, overlap=60):
+        """
+        Args:
+            capacity (int): Usernames the filter is sized for; it is rebuilt at twice the size when exceeded.
+            error_rate (float): Target false-positive rate.
+            refresh_interval (float): Seconds between incremental refreshes; 0 disables the filter.
+            negative_size (int): Maximum number of remembered missing names.
+            negative_ttl (float): Seconds a missing name is remembered; 0 disables the negative cache.
+            overlap (float): Seconds re-read before the watermark on each refresh.
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.overlap = overlap
+        self.skipped = 0
+        self._filter = None
+        self._building = None
+        self._watermark = None
+        self._missing = TTLCache(maxsize=negative_size, ttl=negative_ttl) if negative_ttl > 0 else None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def loaded(self):
+        return self._filter is not None
+
+    def might_exist(self, username):
+        """
+        Returns False only if ``username`` certainly has no account.
+        """
+        if not isinstance(username, str):
+            return True
+        if self._thread is None:
+            self.start()
+        key = username_key(username)
+        if self._missing is not None:
+            with self._lock:
+                missing = key in self._missing
+            if missing:
+                self.skipped += 1
+                return False
+        bloom = self._filter
+        if bloom is not None and key not in bloom:
+            self.skipped += 1
+            return False
+        return True
+
+    def remember_missing(self, username):
+        """
+        Records that the database has no account for ``username``.
+        """
+        if self._missing is not None and isinstance(username, str):
+            with self._lock:
+                self._missing[username_key(username)] = True
+
+    def add(self, username):
+        """
+        Records a new account.
+        """
+        key = username_key(username)
+        with self._lock:
+            if self._missing is not None:
+                self._missing.pop(key, None)
+            for bloom in (self._filter, self._building):
+                if bloom is not None:
+                    bloom.add(key)
+
+    def load(self):
+        """
+        Builds a fresh filter from every username in the database and swaps it in.
+        """
+        from .models import User
+
+        watermark = timezone.now()
+        capacity = self.capacity
+        while True:
+            count = User.objects.count()
+            if count <= capacity:
+                break
+            capacity *= 2
+        bloom = BloomFilter(capacity, self.error_rate)
+        with self._lock:
+            self._building = bloom
+        try:
+            self._add_all(bloom, User.objects.values_list('username', flat=True).iterator(chunk_size=10000))
+        finally:
+            with self._lock:
+                self._building = None
+        with self._lock:
+            self._filter = bloom
+            self._watermark = watermark
+            self.capacity = capacity
+
+    def refresh(self):
+        """
+        Adds the accounts created since the last load or refresh.
+        """
+        from .models import User
+
+        bloom = self._filter
+        if bloom is None or bloom.count > bloom.capacity:
+            return self.load()
+        watermark = timezone.now()
+        since = self._watermark - timezone.timedelta(seconds=self.overlap)
+        self._add_all(bloom, User.objects.filter(account_created__gte=since).values_list('username', flat=True))
+        self._watermark = watermark
+
+    def _add_all(self, bloom, usernames, batch_size=1000):
+        """
+        Adds ``usernames`` to ``bloom`` a batch at a time under the lock.
+
+        ``BloomFilter.add`` read-modify-writes whole bytes, so unlocked writes racing
+        ``add`` from a request thread could drop each other's bits: a false negative.
+        """
+        keys = []
+        for username in usernames:
+            keys.append(username_key(username))
+            if len(keys) >= batch_size:
+                self._add_keys(bloom, keys)
+                keys = []
+        self._add_keys(bloom, keys)
+
+    def _add_keys(self, bloom, keys):
+        with self._lock:
+            for key in keys:
+                bloom.add(key)
+
+    def start(self):
+        """
+        Starts the background load/refresh thread, once per process.
+        """
+        if self.refresh_interval <= 0:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='known-usernames', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                # Until a load succeeds every name may exist, so lookups fall back to the database
+                logger.warn(event="known_usernames_refresh_failed", message="Refreshing known usernames failed.",
+                            error=str(e))
+            connection.close_if_unusable_or_obsolete()
+            time.sleep(self.refresh_interval)
+
+    def clear(self):
+        with self._lock:
+            self._filter = None
+            self._watermark = None
+            if self._missing is not None:
+                self._missing.clear()
+
+    def stats(self):
+        bloom = self._filter
+        return {
+            'loaded': bloom is not None,
+            'size': bloom.count if bloom is not None else 0,
+            'capacity': bloom.capacity if bloom is not None else self.capacity,
+            'missing': len(self._missing) if self._missing is not None else 0,
+            'skipped': self.skipped,
+        }
+
+
+def record_new_user(sender, instance, created, **kwargs):
+    """
+    ``post_save`` receiver adding new accounts to ``known_usernames``.
+    """
+    if created:
+        known_usernames.add(instance.username)
+
+
+known_usernames = KnownUsernames(
+    capacity=settings.KNOWN_USERNAMES_CAPACITY,
+    error_rate=settings.KNOWN_USERNAMES_ERROR_RATE,
+    refresh_interval=settings.KNOWN_USERNAMES_REFRESH_INTERVAL,
+    negative_size=settings.KNOWN_USERNAMES_NEGATIVE_SIZE,
+    negative_ttl=settings.KNOWN_USERNAMES_NEGATIVE_TTL,
+)
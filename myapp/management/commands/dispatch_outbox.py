@@ -0,0 +1,128 @@
+# myapp/management/commands/dispatch_outbox.py
+import builtins
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from prometheus_client import start_http_server
+
+from myapp.models import OutboxMessage
+from utils import metrics
+
+# Seconds a claimed batch stays leased beyond the publish timeout
+LEASE_MARGIN = 30
+
+
+class Command(BaseCommand):
+    help = "Publishes pending outbox messages to Pub/Sub in batches, retrying failures with exponential backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help="Messages claimed per batch.")
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Seconds to sleep when the outbox is empty.")
+        parser.add_argument('--max-attempts', type=int, default=10,
+                            help="Attempts before a message is left for manual inspection.")
+        parser.add_argument('--base-backoff', type=float, default=2.0, help="Backoff after the first failure, in seconds.")
+        parser.add_argument('--max-backoff', type=float, default=300.0, help="Upper bound on the backoff, in seconds.")
+        parser.add_argument('--publish-timeout', type=float, default=30.0,
+                            help="Seconds to wait for Pub/Sub to acknowledge a batch.")
+        parser.add_argument('--once', action='store_true', help="Drain the outbox once and exit.")
+        parser.add_argument('--metrics-port', type=int, default=0,
+                            help="Serve Prometheus metrics (publish latency, DB queries) on this port; 0 disables.")
+
+    def handle(self, *args, **options):
+        publisher = getattr(builtins, 'msg_publisher', None)
+        if publisher is None:
+            raise CommandError("No Pub/Sub publisher configured; set PROJECT_ID.")
+
+        if options['metrics_port']:
+            start_http_server(options['metrics_port'], registry=metrics.registry())
+        logger.info(event="outbox_dispatcher_started", message="Outbox dispatcher started.")
+        while True:
+            dispatched = self.dispatch_batch(publisher, options)
+            if dispatched:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
+
+    def dispatch_batch(self, publisher, options):
+        """
+        Claims one batch of due messages, publishes them and records the outcome.
+
+        Returns:
+            int: Number of messages claimed.
+        """
+        batch = self.claim(options)
+        if not batch:
+            return 0
+
+        # Published outside any transaction, so no row locks are held while waiting on Pub/Sub
+        futures = []
+        for message in batch:
+            try:
+                future = publisher.send_message(message.topic, message.payload, dedup_key=message.dedup_key)
+            except Exception as e:
+                future = e
+            futures.append((message, future))
+
+        now = timezone.now()
+        deadline = time.monotonic() + options['publish_timeout']
+        failed = 0
+        for message, future in futures:
+            try:
+                if isinstance(future, Exception):
+                    raise future
+                future.result(timeout=max(0.0, deadline - time.monotonic()))
+                message.dispatched_at = now
+                message.last_error = ''
+            except Exception as e:
+                failed += 1
+                message.attempts += 1
+                message.available_at = now + timedelta(seconds=self.backoff(message.attempts, options))
+                message.last_error = str(e)
+        with transaction.atomic():
+            OutboxMessage.objects.bulk_update(batch, ['dispatched_at', 'attempts', 'available_at', 'last_error'])
+
+        logger.info(
+            event="outbox_batch_dispatched",
+            message="Outbox batch dispatched.",
+            claimed=len(batch),
+            failed=failed
+        )
+        # A batch where everything failed is not progress; back off instead of spinning.
+        return len(batch) - failed
+
+    @staticmethod
+    def claim(options):
+        """
+        Leases a batch of due messages to this dispatcher in a short transaction.
+
+        Claimed rows get ``available_at`` pushed past the publish timeout, so other
+        dispatchers skip them while they are published; if this dispatcher dies
+        before recording the outcome they become due again once the lease expires.
+
+        Returns:
+            list: The claimed messages.
+        """
+        lease_until = timezone.now() + timedelta(seconds=options['publish_timeout'] + LEASE_MARGIN)
+        with transaction.atomic():
+            # skip_locked lets several dispatchers claim concurrently without waiting on each other's rows
+            batch = list(
+                OutboxMessage.objects.pending(options['max_attempts'])
+                .select_for_update(skip_locked=True)[:options['batch_size']]
+            )
+            if batch:
+                OutboxMessage.objects.filter(pk__in=[message.pk for message in batch]).update(
+                    available_at=lease_until)
+        for message in batch:
+            message.available_at = lease_until
+        return batch
+
+    @staticmethod
+    def backoff(attempts, options):
+        delay = min(options['max_backoff'], options['base_backoff'] * 2 ** (attempts - 1))
+        return random.uniform(delay / 2, delay)
@@ -0,0 +1,213 @@
+# myapp/management/commands/import_users.py
+import csv
+import io
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from django.contrib.auth import hashers
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from myapp.fast_serializers import CreateUserSerializer
+from myapp.known_usernames import known_usernames, username_key
+from myapp.models import OutboxMessage, User
+from myapp.views import verification_email_message
+
+
+def hash_passwords(passwords):
+    """
+    Hashes a slice of passwords with the configured hasher; runs in the import's worker processes.
+    """
+    return [hashers.make_password(password) for password in passwords]
+
+
+class Command(BaseCommand):
+    help = ("Imports users from a CSV or JSON Lines file (columns/keys: username, password, first_name, "
+            "last_name), hashing passwords on a process pool and inserting in chunks with their "
+            "verification emails queued in the outbox.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or - for standard input.")
+        parser.add_argument('--format', choices=('csv', 'jsonl'), default=None,
+                            help="Input format; defaults to the file extension (.csv or .jsonl).")
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Rows hashed and inserted together.")
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                            help="Hashing processes; 0 hashes in this process.")
+        parser.add_argument('--no-verification-email', action='store_true',
+                            help="Do not queue verify_email messages for the imported accounts.")
+
+    def handle(self, *args, **options):
+        input_format = options['format'] or self.detect_format(options['path'])
+        self.stats = {'read': 0, 'created': 0, 'invalid': 0, 'existing': 0}
+        self.started = time.perf_counter()
+        pool = ProcessPoolExecutor(max_workers=options['processes']) if options['processes'] > 0 else None
+        try:
+            with self.open_input(options['path']) as stream:
+                self.run(self.read_rows(stream, input_format), pool, options)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        elapsed = time.perf_counter() - self.started
+        logger.info(event="users_imported", message="User import finished.", seconds=round(elapsed, 3),
+                    rows_per_second=round(self.stats['read'] / elapsed, 1) if elapsed else None, **self.stats)
+        self.report(final=True)
+
+    @staticmethod
+    def detect_format(path):
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.csv':
+            return 'csv'
+        if extension in ('.jsonl', '.ndjson'):
+            return 'jsonl'
+        raise CommandError("Cannot tell the input format from the file name; pass --format.")
+
+    @staticmethod
+    def open_input(path):
+        if path == '-':
+            return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+        return open(path, encoding='utf-8', newline='')
+
+    def read_rows(self, stream, input_format):
+        """
+        Yields (line number, row dict) one row at a time, so memory does not grow with the file.
+        """
+        if input_format == 'csv':
+            reader = csv.DictReader(stream)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                self.reject(line_number, {'json': [str(e)]})
+                continue
+            yield line_number, row
+
+    def run(self, rows, pool, options):
+        """
+        Validates rows into chunks and pipelines them: while one chunk is inserted the next is being hashed.
+        """
+        in_flight = deque()
+        chunk = []
+        for line_number, row in rows:
+            self.stats['read'] += 1
+            serializer = CreateUserSerializer(data=row, validate_unique=False)
+            if not serializer.is_valid():
+                self.reject(line_number, serializer.errors)
+                continue
+            data = dict(serializer.validated_data)
+            data['username'] = User.objects.normalize_email(data['username'])
+            chunk.append(data)
+            if len(chunk) >= options['chunk_size']:
+                in_flight.append(self.start_hashing(chunk, pool, options))
+                chunk = []
+                # At most one chunk hashes while another is inserted
+                while len(in_flight) > 1:
+                    self.insert(*in_flight.popleft(), options)
+        if chunk:
+            in_flight.append(self.start_hashing(chunk, pool, options))
+        while in_flight:
+            self.insert(*in_flight.popleft(), options)
+
+    def start_hashing(self, chunk, pool, options):
+        """
+        Drops rows whose username is already taken and submits the rest's passwords for hashing.
+
+        Returns:
+            tuple: (rows, futures whose results concatenate to the rows' password hashes)
+        """
+        # Names are compared the way the column's case-insensitive collation compares them
+        unique = {}
+        for data in chunk:
+            unique.setdefault(username_key(data['username']), data)
+        existing = self.taken_keys(data['username'] for data in unique.values())
+        rows = [data for key, data in unique.items() if key not in existing]
+        self.stats['existing'] += len(chunk) - len(rows)
+        passwords = [data['password'] for data in rows]
+        if pool is None:
+            future = Future()
+            future.set_result(hash_passwords(passwords))
+            return rows, [future]
+        step = max(1, math.ceil(len(passwords) / options['processes']))
+        return rows, [pool.submit(hash_passwords, passwords[start:start + step])
+                      for start in range(0, len(passwords), step)]
+
+    def insert(self, rows, futures, options):
+        hashes = [encoded for future in futures for encoded in future.result()]
+        users = [
+            User(username=data['username'], first_name=data['first_name'], last_name=data['last_name'],
+                 password=encoded)
+            for data, encoded in zip(rows, hashes)
+        ]
+        try:
+            created = self.insert_users(users, options)
+        except IntegrityError:
+            # Someone signed up with one of these names after the chunk was checked; drop them and retry
+            taken = self.taken_keys(user.username for user in users)
+            remaining = [user for user in users if username_key(user.username) not in taken]
+            try:
+                created = self.insert_users(remaining, options)
+            except IntegrityError:
+                created = self.insert_separately(remaining, options)
+        self.stats['created'] += len(created)
+        self.stats['existing'] += len(users) - len(created)
+        for user in created:
+            known_usernames.add(user.username)
+        self.report()
+
+    @staticmethod
+    def taken_keys(usernames):
+        """
+        Returns the ``username_key`` of every account matching one of ``usernames``.
+        """
+        return {username_key(username) for username in
+                User.objects.filter(username__in=list(usernames)).values_list('username', flat=True)}
+
+    def insert_separately(self, users, options):
+        """
+        Inserts ``users`` one at a time, skipping any the database still reports as duplicates.
+
+        Last resort when the batch conflicts again after dropping the taken names, e.g. a
+        unique index whose collation the ``username__in`` lookup does not share.
+        """
+        created = []
+        for user in users:
+            try:
+                created.extend(self.insert_users([user], options))
+            except IntegrityError:
+                pass
+        return created
+
+    @staticmethod
+    def insert_users(users, options):
+        # The outbox rows commit (or roll back) together with the users
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            if not options['no_verification_email']:
+                OutboxMessage.objects.bulk_create(
+                    OutboxMessage(topic="verify_email", payload=verification_email_message(user),
+                                  dedup_key=f"verify_email:{user.id}")
+                    for user in users
+                )
+        return users
+
+    def reject(self, line_number, errors):
+        self.stats['invalid'] += 1
+        self.stderr.write(f"line {line_number}: {json.dumps(errors)}")
+
+    def report(self, final=False):
+        elapsed = time.perf_counter() - self.started
+        rate = self.stats['read'] / elapsed if elapsed else 0.0
+        self.stdout.write(
+            f"{'done' if final else 'progress'}: read={self.stats['read']} created={self.stats['created']} "
+            f"existing={self.stats['existing']} invalid={self.stats['invalid']} "
+            f"elapsed={elapsed:.1f}s rows/sec={rate:.1f}"
+        )
@@ -0,0 +1,92 @@
+# myapp/management/commands/sweep_expired.py
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from myapp.models import OutboxMessage, User, UserVerification
+
+
+class Command(BaseCommand):
+    help = ("Deletes expired or used verifications, long-unverified accounts and old outbox messages in small "
+            "batches, sleeping between batches so the hot tables are never locked for long.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows deleted per statement.")
+        parser.add_argument('--batch-sleep', type=float, default=0.1, help="Seconds to sleep between batches.")
+        parser.add_argument('--verification-grace', type=float, default=60.0,
+                            help="Minutes past expiry a verification is kept, so re-clicks still get "
+                                 "'expired' instead of 'invalid'.")
+        parser.add_argument('--unverified-days', type=float, default=7.0,
+                            help="Age in days after which an unverified account is purged.")
+        parser.add_argument('--outbox-retention-days', type=float, default=7.0,
+                            help="Days a dispatched outbox message, or one that ran out of attempts, is kept.")
+        parser.add_argument('--outbox-max-attempts', type=int, default=10,
+                            help="Attempts after which the dispatcher gives up on a message; match its --max-attempts.")
+        parser.add_argument('--interval', type=float, default=3600.0, help="Seconds between sweeps.")
+        parser.add_argument('--once', action='store_true', help="Run one sweep and exit.")
+
+    def handle(self, *args, **options):
+        logger.info(event="sweeper_started", message="Expiry sweeper started.")
+        while True:
+            self.sweep(options)
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+
+    def sweep(self, options):
+        now = timezone.now()
+        verification_cutoff = now - timedelta(minutes=options['verification_grace'])
+        user_cutoff = now - timedelta(days=options['unverified_days'])
+        outbox_cutoff = now - timedelta(days=options['outbox_retention_days'])
+
+        # One pass per is_used value keeps each pass a range scan on verification_expiry_idx
+        verifications = sum(
+            self.delete_in_batches(
+                UserVerification.objects.filter(is_used=is_used, expires_at__lt=verification_cutoff), options
+            )
+            for is_used in (False, True)
+        )
+        # Deleting a user cascades to its remaining verification rows
+        users = self.delete_in_batches(
+            User.objects.filter(is_verified=False, account_created__lt=user_cutoff), options
+        )
+        # Both passes are range scans on outbox_pending_idx (dispatched_at, available_at); a dead message's
+        # available_at is when its last attempt failed, plus backoff
+        outbox = self.delete_in_batches(
+            OutboxMessage.objects.filter(dispatched_at__lt=outbox_cutoff), options
+        ) + self.delete_in_batches(
+            OutboxMessage.objects.filter(dispatched_at__isnull=True, available_at__lt=outbox_cutoff,
+                                         attempts__gte=options['outbox_max_attempts']), options
+        )
+        logger.info(
+            event="sweep_completed",
+            message="Expired verifications, unverified users and old outbox messages swept.",
+            verifications_deleted=verifications,
+            users_deleted=users,
+            outbox_deleted=outbox
+        )
+
+    @staticmethod
+    def delete_in_batches(queryset, options):
+        """
+        Deletes the rows matching ``queryset`` a batch of primary keys at a time.
+
+        Each batch is its own short transaction; the filter is re-applied on delete
+        so a row that changed since it was selected (e.g. a user who just verified)
+        is left alone.
+
+        Returns:
+            int: Number of rows deleted from the queryset's table.
+        """
+        deleted = 0
+        while True:
+            pks = list(queryset.values_list('pk', flat=True)[:options['batch_size']])
+            if not pks:
+                return deleted
+            _, per_model = queryset.filter(pk__in=pks).delete()
+            deleted += per_model.get(queryset.model._meta.label, 0)
+            if len(pks) < options['batch_size']:
+                return deleted
+            time.sleep(options['batch_sleep'])
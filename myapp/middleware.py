@@ -1,14 +1,82 @@
 # myapp/middleware.py
+import cProfile
+import hmac
+import os
+import random
+import threading
+import time
 import uuid
-from django.db import connection, DatabaseError
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
 from django.http import HttpResponseServerError, HttpResponse
 
+from utils import request_profile
+from utils.metrics import REQUEST_LATENCY, REQUESTS
+
+from .db_health import db_probe
+
+
+class HybridMiddleware:
+    """
+    Base for middleware that runs natively in both sync (WSGI) and async (ASGI) stacks.
+
+    Django only adapts between sync and async when a middleware cannot handle
+    the mode of its neighbours, so supporting both avoids a thread hop per request.
+    """
+    sync_capable = True
+    async_capable = True
 
-class RequestIDMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process(request)
+
+    def process(self, request):
+        raise NotImplementedError
+
+    async def __acall__(self, request):
+        raise NotImplementedError
+
+
+class MetricsMiddleware(HybridMiddleware):
+    """
+    Records request count by view, method and status, and latency by view.
+
+    Installed first so the timing covers the rest of the middleware stack.
+    Requests that never reach URL resolution (e.g. a 503 from the database
+    check) are labelled ``unresolved``; the catch-all 404 route is ``unmatched``.
+    """
+
+    def process(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self.observe(request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, response, started)
+        return response
+
+    @staticmethod
+    def observe(request, response, started):
+        match = getattr(request, 'resolver_match', None)
+        view = 'unresolved' if match is None else (match.url_name or 'unmatched')
+        REQUEST_LATENCY.labels(view).observe(time.perf_counter() - started)
+        REQUESTS.labels(view, request.method, str(response.status_code)).inc()
+
+
+class RequestIDMiddleware(HybridMiddleware):
+    def process(self, request):
         # Generate a unique request ID
         request.request_id = str(uuid.uuid4())
 
@@ -17,52 +85,207 @@ class RequestIDMiddleware:
 
         return response
 
+    async def __acall__(self, request):
+        request.request_id = str(uuid.uuid4())
+        return await self.get_response(request)
+
+
+class ProfilingMiddleware(HybridMiddleware):
+    """
+    Opt-in, sampled per-request profiling.
+
+    A sampled request logs a ``request_profile`` line with its request ID, wall
+    time, CPU time and the DB, bcrypt and Pub/Sub time accounted by
+    ``utils.request_profile``. Requests are sampled at ``PROFILING_SAMPLE_RATE``,
+    or on demand when ``PROFILING_HEADER`` carries ``PROFILING_TOKEN``. With
+    ``PROFILING_DUMP_DIR`` set, sampled sync requests also run under cProfile and
+    the pstats file is kept when the request took at least ``PROFILING_SLOW_MS``
+    (always, when triggered by the header). Only one request per process is
+    under cProfile at a time; others are still accounted.
+    """
 
-class CustomHeadersMiddleware:
     def __init__(self, get_response):
-        self.get_response = get_response
+        super().__init__(get_response)
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.header = settings.PROFILING_HEADER
+        self.token = settings.PROFILING_TOKEN
+        self.dump_dir = settings.PROFILING_DUMP_DIR
+        self.slow_seconds = settings.PROFILING_SLOW_MS / 1000
+        self.enabled = self.sample_rate > 0 or bool(self.token)
+        self._cprofile_lock = threading.Lock()
+        if self.dump_dir:
+            os.makedirs(self.dump_dir, exist_ok=True)
 
-    def __call__(self, request):
-        response = self.get_response(request)
+    def triggered(self, request):
+        """
+        Returns whether the request asked to be profiled with a valid token.
+        """
+        value = request.headers.get(self.header) if self.token else None
+        return value is not None and hmac.compare_digest(value.encode('utf-8'), self.token.encode('utf-8'))
+
+    def process(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+        triggered = self.triggered(request)
+        if not triggered and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        profiler = None
+        if self.dump_dir and self._cprofile_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+        profile, token = request_profile.begin()
+        request.profile = profile
+        started, cpu_started = time.perf_counter(), time.thread_time()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+            wall = time.perf_counter() - started
+            dump_path = None
+            if profiler is not None and (triggered or wall >= self.slow_seconds):
+                dump_path = self.dump(profiler, request)
+            self.log(request, response, profile, wall, time.thread_time() - cpu_started, triggered, dump_path)
+            return response
+        finally:
+            request_profile.end(token)
+            if profiler is not None:
+                self._cprofile_lock.release()
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        triggered = self.triggered(request)
+        if not triggered and random.random() >= self.sample_rate:
+            return await self.get_response(request)
+
+        # cProfile and thread CPU time would also count other requests sharing the event loop
+        profile, token = request_profile.begin()
+        request.profile = profile
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+            self.log(request, response, profile, time.perf_counter() - started, None, triggered, None)
+            return response
+        finally:
+            request_profile.end(token)
+
+    def dump(self, profiler, request):
+        path = os.path.join(self.dump_dir, f"{time.strftime('%Y%m%dT%H%M%S')}-{request.request_id}.pstats")
+        profiler.dump_stats(path)
+        return path
+
+    @staticmethod
+    def log(request, response, profile, wall, cpu, triggered, dump_path):
+        match = getattr(request, 'resolver_match', None)
+        logger.info(
+            event="request_profile",
+            message="Request profile.",
+            request_id=request.request_id,
+            method=request.method,
+            path=request.path,
+            endpoint=match.url_name if match is not None else None,
+            status=response.status_code,
+            wall_ms=round(wall * 1000, 3),
+            cpu_ms=round(cpu * 1000, 3) if cpu is not None else None,
+            triggered=triggered,
+            pstats=dump_path,
+            **profile.as_dict()
+        )
+
+
+class CustomHeadersMiddleware(HybridMiddleware):
+    def process(self, request):
+        return self.add_headers(self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.add_headers(await self.get_response(request))
+
+    @staticmethod
+    def add_headers(response):
         response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
         response['Pragma'] = 'no-cache'
         response['X-Content-Type-Options'] = 'nosniff'
         return response
 
 
-class DatabaseCheckMiddleware:
+class DatabaseCheckMiddleware(HybridMiddleware):
+    # Metrics stay scrapeable while the database is down
+    exempt_paths = ('/metrics',)
+
     def __init__(self, get_response):
-        self.get_response = get_response
+        super().__init__(get_response)
+        # Liveness is probed out of band; requests only read the cached state
+        db_probe.start()
 
-    def __call__(self, request):
-        try:
-            # Check database connection before processing the request
-            cursor = connection.cursor()
-            cursor.execute("SELECT 1")
-        except DatabaseError as db_error:
-            logger.error(
-                event="database_error",
-                message="Database connection error occurred.",
-                exception=str(db_error),
-                method=request.method,
-                request_id=request.request_id,
-                path=request.path,
-                user_agent=request.headers.get('User-Agent')
-            )
-            return HttpResponse(status=503)
-        except Exception as e:
-            logger.error(
-                event="unexpected_error",
-                message="An unexpected error occurred. Try again after some time.",
-                exception=str(e),
-                method=request.method,
-                request_id=request.request_id,
-                path=request.path,
-                user_agent=request.headers.get('User-Agent')
-            )
-            return HttpResponse(status=503)
+    def process(self, request):
+        if request.path_info not in self.exempt_paths and not db_probe.is_healthy():
+            return self.unavailable(request)
 
         # Proceed with processing the request
         response = self.get_response(request)
 
         return response
+
+    async def __acall__(self, request):
+        if request.path_info in self.exempt_paths:
+            return await self.get_response(request)
+        healthy = db_probe.cached_state()
+        if healthy is None:
+            # No cached state yet; the inline check touches the database, so run it off the event loop
+            healthy = await sync_to_async(db_probe.check)()
+        if not healthy:
+            return self.unavailable(request)
+        return await self.get_response(request)
+
+    @staticmethod
+    def unavailable(request):
+        logger.error(
+            event="database_error",
+            message="Database connection error occurred.",
+            exception=db_probe.last_error,
+            method=request.method,
+            request_id=request.request_id,
+            path=request.path,
+            user_agent=request.headers.get('User-Agent')
+        )
+        return HttpResponse(status=503)
+
+
+class ApiExemptMixin:
+    """
+    Skips a ``MiddlewareMixin`` based middleware for API requests.
+
+    The ``/v1/`` endpoints authenticate every request with Basic auth and never
+    touch sessions, ``request.user`` or messages, so the session lookup, lazy
+    user and message storage are pure overhead there. The admin keeps the full
+    behaviour, and the subclasses still satisfy its middleware system checks.
+    """
+    exempt_prefixes = ('/v1/',)
+
+    def process_request(self, request):
+        if request.path_info.startswith(self.exempt_prefixes):
+            return None
+        return super().process_request(request)
+
+    def process_response(self, request, response):
+        if request.path_info.startswith(self.exempt_prefixes):
+            return response
+        return super().process_response(request, response)
+
+
+class ApiExemptSessionMiddleware(ApiExemptMixin, SessionMiddleware):
+    pass
+
+
+class ApiExemptAuthenticationMiddleware(ApiExemptMixin, AuthenticationMiddleware):
+    # AuthenticationMiddleware has no process_response
+    def process_response(self, request, response):
+        return response
+
+
+class ApiExemptMessageMiddleware(ApiExemptMixin, MessageMiddleware):
+    pass
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.9 on 2026-10-18 12:52
+
+from django.db import migrations, models
+import myapp.models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='User',
+            fields=[
+                ('last_login', models.DateTimeField(blank=True, null=True, verbose_name='last login')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('username', models.EmailField(max_length=254, unique=True, verbose_name='email')),
+                ('first_name', models.CharField(max_length=100)),
+                ('last_name', models.CharField(max_length=100)),
+                ('password', models.CharField(max_length=128)),
+                ('account_created', models.DateTimeField(auto_now_add=True)),
+                ('account_updated', models.DateTimeField(auto_now=True)),
+                ('is_verified', models.BooleanField(default=False)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='UserVerification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.UUIDField(default=uuid.uuid4)),
+                ('verification_code', models.CharField(max_length=255)),
+                ('sent_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(default=myapp.models.default_expires_at)),
+                ('is_used', models.BooleanField(default=False)),
+            ],
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.9 on 2026-10-18 13:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+def delete_orphans_and_duplicate_codes(apps, schema_editor):
+    """
+    Removes the rows the new constraints would reject: verifications whose user was
+    deleted, and all but the newest row of each duplicated verification code.
+    """
+    User = apps.get_model('myapp', 'User')
+    UserVerification = apps.get_model('myapp', 'UserVerification')
+    db_alias = schema_editor.connection.alias
+    verifications = UserVerification.objects.using(db_alias)
+    verifications.exclude(user_id__in=User.objects.using(db_alias).values('id')).delete()
+    duplicates = (verifications.order_by().values('verification_code')
+                  .annotate(newest=models.Max('id'), rows=models.Count('id')).filter(rows__gt=1))
+    for duplicate in duplicates.iterator():
+        verifications.filter(verification_code=duplicate['verification_code']).exclude(
+            id=duplicate['newest']).delete()
+
+
+class Migration(migrations.Migration):
+    """
+    Turns ``UserVerification.user_id`` into a foreign key without touching the stored
+    ``user_id`` values, and indexes the verification lookup path. Rows that would
+    violate the new foreign key or unique code are deleted first, so the constraints
+    cannot fail halfway through a deploy.
+    """
+
+    dependencies = [
+        ('myapp', '0002_outboxmessage'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_orphans_and_duplicate_codes, migrations.RunPython.noop),
+        # Pin the column name first so the rename below is a state-only change
+        migrations.AlterField(
+            model_name='userverification',
+            name='user_id',
+            field=models.UUIDField(db_column='user_id', default=uuid.uuid4),
+        ),
+        migrations.RenameField(
+            model_name='userverification',
+            old_name='user_id',
+            new_name='user',
+        ),
+        migrations.AlterField(
+            model_name='userverification',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='verifications',
+                                    to='myapp.user'),
+        ),
+        migrations.AlterField(
+            model_name='userverification',
+            name='verification_code',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='userverification',
+            index=models.Index(fields=['is_used', 'expires_at'], name='verification_expiry_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-18 12:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0003_verification_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_verified', 'account_created'], name='user_unverified_idx'),
+        ),
+    ]
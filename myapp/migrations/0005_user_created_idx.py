@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-18 13:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0004_user_unverified_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['account_created', 'id'], name='user_created_idx'),
+        ),
+    ]
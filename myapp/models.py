@@ -1,20 +1,27 @@
 # models.py
 import uuid
-from django.db import models
+from asgiref.sync import sync_to_async
+from django.db import models, transaction
 from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 
+from .hashing import make_password, check_password
+
 
 class CustomUserManager(BaseUserManager):
-    def create_user(self, username, password=None, **extra_fields):
+    def create_user(self, username, password=None, encoded_password=None, **extra_fields):
         """
         Create and return a regular user with an email and password.
+
+        Pass ``encoded_password`` instead of ``password`` when the hash was already computed.
         """
         if not username:
             raise ValueError('The Username field must be set')
         username = self.normalize_email(username)
         user = self.model(username=username, **extra_fields)
-        if password:
+        if encoded_password:
+            user.password = encoded_password
+        elif password:
             user.set_password(password)
         user.save(using=self._db)
         return user
@@ -45,17 +52,110 @@ class User(AbstractBaseUser):
 
     objects = CustomUserManager()
 
+    class Meta:
+        indexes = [
+            # Range scans by the sweep_expired command over stale unverified accounts
+            models.Index(fields=['is_verified', 'account_created'], name='user_unverified_idx'),
+            # Incremental refreshes of known_usernames read accounts created since a watermark
+            models.Index(fields=['account_created', 'id'], name='user_created_idx'),
+        ]
+
+    def set_password(self, raw_password):
+        # Hash on the bounded bcrypt pool instead of the request thread
+        self.password = make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        return check_password(raw_password, self.password)
+
     def __str__(self):
         return self.username
 
 
+def default_expires_at():
+    # Evaluated per row; a module-level expression would freeze the expiry at import time
+    return timezone.now() + timezone.timedelta(minutes=2)
+
+
+class UserVerificationManager(models.Manager):
+    def consume(self, verification_code):
+        """
+        Marks an unused, unexpired verification as used and verifies its user, in one transaction.
+
+        The conditional UPDATE means only one of several concurrent clicks on the
+        same link can succeed.
+
+        Returns:
+            bool: True if the code was consumed, False if it is unknown, expired or already used.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            consumed = self.filter(verification_code=verification_code, is_used=False,
+                                   expires_at__gt=now).update(is_used=True)
+            if consumed:
+                # update() skips auto_now, so account_updated is set explicitly
+                User.objects.filter(
+                    id__in=models.Subquery(self.filter(verification_code=verification_code).values('user_id'))
+                ).update(is_verified=True, account_updated=now)
+        return bool(consumed)
+
+    async def aconsume(self, verification_code):
+        return await sync_to_async(self.consume)(verification_code)
+
+
 class UserVerification(models.Model):
-    user_id = models.UUIDField(default=uuid.uuid4)
-    verification_code = models.CharField(max_length=255)
+    # Keeps the existing user_id column, now constrained and indexed as a foreign key
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='verifications')
+    verification_code = models.CharField(max_length=255, unique=True)
     sent_at = models.DateTimeField(auto_now_add=True)
-    expires_at = models.DateTimeField(default=timezone.now() + timezone.timedelta(minutes=2))  # Expires in 2 minutes
+    expires_at = models.DateTimeField(default=default_expires_at)  # Expires in 2 minutes
     is_used = models.BooleanField(default=False)
 
+    objects = UserVerificationManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_used', 'expires_at'], name='verification_expiry_idx'),
+        ]
 
     def __str__(self):
         return f"Verification for user {self.user_id}"
+
+
+class OutboxMessageManager(models.Manager):
+    def enqueue(self, topic, payload, dedup_key):
+        """
+        Records a message to be published to ``topic`` by the outbox dispatcher.
+
+        Call inside the transaction that writes the data the message describes.
+        """
+        return self.create(topic=topic, payload=payload, dedup_key=dedup_key)
+
+    async def aenqueue(self, topic, payload, dedup_key):
+        return await self.acreate(topic=topic, payload=payload, dedup_key=dedup_key)
+
+    def pending(self, max_attempts):
+        return self.filter(dispatched_at__isnull=True, available_at__lte=timezone.now(),
+                           attempts__lt=max_attempts).order_by('available_at', 'id')
+
+
+class OutboxMessage(models.Model):
+    topic = models.CharField(max_length=255)
+    payload = models.JSONField()
+    # Sent as a message attribute so consumers can drop redelivered duplicates
+    dedup_key = models.CharField(max_length=255, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+
+    objects = OutboxMessageManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['dispatched_at', 'available_at'], name='outbox_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"Outbox message {self.dedup_key} for topic {self.topic}"
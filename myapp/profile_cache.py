@@ -0,0 +1,110 @@
+# myapp/profile_cache.py
+import threading
+
+from cachetools import LRUCache
+from django.conf import settings
+from django.core.cache import caches
+
+from utils.metrics import PROFILE_CACHE_REQUESTS
+
+
+class UserProfileCache:
+    """
+    Read-through cache of serialized user profiles, keyed by user id.
+
+    Entries live in a process-local LRU and, when ``backend`` names a Django
+    cache, are also shared through it so other workers can reuse them. Each
+    entry carries the ``account_updated`` it was built from and is only served
+    while it matches the user row loaded during authentication, so any write
+    that bumps ``account_updated`` (an update, a verification) retires it even
+    in processes that never saw the write. Lookups are counted in
+    ``profile_cache_requests_total`` by result, from which the hit ratio is scraped.
+
+    Attributes:
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that had to serialize the user.
+    """
+
+    key_prefix = 'user_profile:'
+
+    def __init__(self, maxsize, backend=None, timeout=300):
+        """
+        Initializes the cache.
+
+        Args:
+            maxsize (int): Maximum number of profiles kept in the local LRU.
+            backend (str): Alias of the Django cache to share entries through, or None for local only.
+            timeout (int): Seconds an entry lives in the shared cache.
+        """
+        self._cache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.backend = backend
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, user_id):
+        return f'{self.key_prefix}{user_id}'
+
+    def get(self, user):
+        """
+        Returns the cached profile for ``user`` if it is still current, otherwise None.
+
+        Args:
+            user (User): The user loaded for the request.
+        """
+        with self._lock:
+            entry = self._cache.get(user.pk)
+        if entry is None and self.backend:
+            entry = caches[self.backend].get(self._key(user.pk))
+            if entry is not None:
+                with self._lock:
+                    self._cache[user.pk] = entry
+        with self._lock:
+            if entry is not None and entry[0] == user.account_updated:
+                self.hits += 1
+                PROFILE_CACHE_REQUESTS.labels('hit').inc()
+                return entry[1]
+            self.misses += 1
+            PROFILE_CACHE_REQUESTS.labels('miss').inc()
+            return None
+
+    def set(self, user, data):
+        """
+        Stores the serialized profile built from ``user``.
+        """
+        entry = (user.account_updated, dict(data))
+        with self._lock:
+            self._cache[user.pk] = entry
+        if self.backend:
+            caches[self.backend].set(self._key(user.pk), entry, self.timeout)
+
+    def invalidate(self, user_id):
+        """
+        Drops the cached profile for the given user id.
+        """
+        with self._lock:
+            self._cache.pop(user_id, None)
+        if self.backend:
+            caches[self.backend].delete(self._key(user_id))
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'size': len(self._cache),
+            }
+
+
+profile_cache = UserProfileCache(
+    maxsize=settings.PROFILE_CACHE_SIZE,
+    backend=settings.PROFILE_CACHE_BACKEND,
+    timeout=settings.PROFILE_CACHE_TIMEOUT,
+)
@@ -0,0 +1,250 @@
+# myapp/rate_limit.py
+import math
+import threading
+import time
+import zlib
+
+from asgiref.sync import sync_to_async
+from cachetools import LRUCache
+from django.conf import settings
+from django.core.cache import caches
+
+from utils.metrics import RATE_LIMITED
+
+from .known_usernames import username_key
+
+
+class RateLimited(Exception):
+    """
+    Raised when a request exceeds a rate limit.
+
+    Attributes:
+        scope (str): Which limit was hit ('client' or 'username').
+        retry_after (int): Whole seconds until the request would be admitted.
+    """
+
+    def __init__(self, scope, retry_after):
+        super().__init__(f'Rate limit exceeded for {scope}.')
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Process-local token buckets, one per key, sharded to keep lock contention low.
+
+    Each key holds up to ``burst`` tokens and regains ``rate`` tokens per second.
+    Keys hash to one of ``shards`` independently locked LRU maps, so concurrent
+    requests for different clients rarely wait on each other and idle keys are
+    evicted once a shard is full.
+    """
+
+    def __init__(self, rate, burst, max_keys=100000, shards=16):
+        """
+        Initializes the buckets.
+
+        Args:
+            rate (float): Tokens regained per second.
+            burst (int): Bucket capacity.
+            max_keys (int): Keys remembered across all shards.
+            shards (int): Number of independently locked shards.
+        """
+        self.rate = rate
+        self.burst = burst
+        self._shards = [(threading.Lock(), LRUCache(maxsize=max(1, max_keys // shards))) for _ in range(shards)]
+
+    def _shard(self, key):
+        return self._shards[zlib.crc32(key.encode('utf-8')) % len(self._shards)]
+
+    def _refill(self, buckets, key, now):
+        tokens, updated = buckets.get(key, (self.burst, now))
+        return min(self.burst, tokens + (now - updated) * self.rate)
+
+    def _wait(self, tokens, cost):
+        return (cost - tokens) / self.rate if self.rate else math.inf
+
+    def acquire(self, key, cost=1):
+        """
+        Takes ``cost`` tokens from the key's bucket if it has them.
+
+        Returns:
+            float: 0 if admitted, otherwise seconds until enough tokens are available.
+        """
+        lock, buckets = self._shard(key)
+        now = time.monotonic()
+        with lock:
+            tokens = self._refill(buckets, key, now)
+            if tokens >= cost:
+                buckets[key] = (tokens - cost, now)
+                return 0.0
+            buckets[key] = (tokens, now)
+        return self._wait(tokens, cost)
+
+    def peek(self, key, cost=1):
+        """
+        Like ``acquire`` but leaves the bucket untouched.
+        """
+        lock, buckets = self._shard(key)
+        now = time.monotonic()
+        with lock:
+            tokens = self._refill(buckets, key, now)
+        return 0.0 if tokens >= cost else self._wait(tokens, cost)
+
+    def clear(self):
+        for lock, buckets in self._shards:
+            with lock:
+                buckets.clear()
+
+
+class CacheTokenBucket:
+    """
+    Buckets shared between workers and instances through a Django cache.
+
+    Approximates a token bucket with a fixed window of ``burst / rate`` seconds
+    admitting ``burst`` requests, counted with ``add`` and ``incr`` so that
+    concurrent workers never lose updates on backends where those are atomic
+    (Redis, Memcached).
+    """
+
+    key_prefix = 'rate_limit:'
+
+    def __init__(self, rate, burst, backend, name):
+        """
+        Initializes the buckets.
+
+        Args:
+            rate (float): Sustained requests per second.
+            burst (int): Requests admitted per window.
+            backend (str): Alias of the Django cache holding the counters.
+            name (str): Distinguishes this limit's keys from other limits in the cache.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.window = max(1, math.ceil(burst / rate)) if rate else 3600
+        self.backend = backend
+        self.name = name
+
+    def _key(self, key, now):
+        return f'{self.key_prefix}{self.name}:{key}:{int(now // self.window)}'
+
+    def _wait(self, now):
+        return self.window - now % self.window
+
+    def acquire(self, key, cost=1):
+        cache = caches[self.backend]
+        now = time.time()
+        cache_key = self._key(key, now)
+        if cache.add(cache_key, cost, timeout=self.window + 1):
+            count = cost
+        else:
+            try:
+                count = cache.incr(cache_key, cost)
+            except ValueError:
+                # Expired between add and incr
+                cache.add(cache_key, cost, timeout=self.window + 1)
+                count = cost
+        return 0.0 if count <= self.burst else self._wait(now)
+
+    def peek(self, key, cost=1):
+        now = time.time()
+        count = caches[self.backend].get(self._key(key, now), 0)
+        return 0.0 if count + cost <= self.burst else self._wait(now)
+
+    def clear(self):
+        # Windows expire on their own
+        pass
+
+
+class RateLimiter:
+    """
+    Basic auth rate limits, checked before any database or bcrypt work.
+
+    Every authenticated request takes a token from its client's bucket. Failed
+    authentications additionally take a token from the username's bucket, and a
+    username whose bucket is empty is refused up front, so password guessing
+    against one account is throttled even when spread over many addresses.
+    Username buckets are keyed by ``username_key``, so case and accent variants
+    that the database resolves to the same account share one budget.
+    """
+
+    def __init__(self, client_bucket, username_bucket, proxy_count=0, enabled=True):
+        """
+        Initializes the limiter.
+
+        Args:
+            client_bucket (TokenBucket | CacheTokenBucket): Buckets keyed by client address.
+            username_bucket (TokenBucket | CacheTokenBucket): Buckets keyed by username, charged on failures.
+            proxy_count (int): Trusted proxies appending to X-Forwarded-For; 0 uses REMOTE_ADDR.
+            enabled (bool): When False every request is admitted.
+        """
+        self.client_bucket = client_bucket
+        self.username_bucket = username_bucket
+        self.proxy_count = proxy_count
+        self.enabled = enabled
+        self.shared = isinstance(client_bucket, CacheTokenBucket)
+
+    def client_address(self, request):
+        """
+        Returns the client address, taken ``proxy_count`` hops from the right of X-Forwarded-For.
+        """
+        if self.proxy_count:
+            forwarded = [hop.strip() for hop in request.headers.get('X-Forwarded-For', '').split(',') if hop.strip()]
+            if len(forwarded) >= self.proxy_count:
+                return forwarded[-self.proxy_count]
+        return request.META.get('REMOTE_ADDR', '')
+
+    def check(self, request, username):
+        """
+        Admits an authentication attempt or raises.
+
+        Raises:
+            RateLimited: If the client or the username is over its limit.
+        """
+        if not self.enabled:
+            return
+        wait = self.client_bucket.acquire(self.client_address(request))
+        if wait:
+            self._reject('client', wait)
+        wait = self.username_bucket.peek(username_key(username))
+        if wait:
+            self._reject('username', wait)
+
+    def record_failure(self, username):
+        """
+        Charges a failed authentication against the username.
+        """
+        if self.enabled:
+            self.username_bucket.acquire(username_key(username))
+
+    async def acheck(self, request, username):
+        if self.shared:
+            return await sync_to_async(self.check)(request, username)
+        return self.check(request, username)
+
+    async def arecord_failure(self, username):
+        if self.shared:
+            return await sync_to_async(self.record_failure)(username)
+        return self.record_failure(username)
+
+    def clear(self):
+        self.client_bucket.clear()
+        self.username_bucket.clear()
+
+    @staticmethod
+    def _reject(scope, wait):
+        RATE_LIMITED.labels(scope).inc()
+        raise RateLimited(scope, max(1, math.ceil(wait)) if wait != math.inf else 3600)
+
+
+def build_bucket(rate, burst, name):
+    if settings.RATE_LIMIT_BACKEND:
+        return CacheTokenBucket(rate, burst, settings.RATE_LIMIT_BACKEND, name)
+    return TokenBucket(rate, burst, max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+
+rate_limiter = RateLimiter(
+    client_bucket=build_bucket(settings.RATE_LIMIT_CLIENT_RATE, settings.RATE_LIMIT_CLIENT_BURST, 'client'),
+    username_bucket=build_bucket(settings.RATE_LIMIT_USERNAME_RATE, settings.RATE_LIMIT_USERNAME_BURST, 'username'),
+    proxy_count=settings.RATE_LIMIT_PROXY_COUNT,
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
@@ -1,5 +1,43 @@
 from rest_framework import serializers
+from .credential_cache import credential_cache
 from .models import User
+from .profile_cache import profile_cache
+
+UPDATE_USER_FIELDS = ('first_name', 'last_name', 'password')
+
+
+def update_user(instance, validated_data):
+    """
+    Applies a validated profile update, shared by ``UpdateUserSerializer`` and its fast counterpart.
+
+    ``encoded_password`` may be passed instead of ``password`` when the hash was already computed.
+    """
+    for field_name in UPDATE_USER_FIELDS:
+        if field_name in validated_data:
+            setattr(instance, field_name, validated_data[field_name])
+
+    password = validated_data.get('password')
+    encoded_password = validated_data.get('encoded_password')
+    if encoded_password:
+        # Hashed by the caller, e.g. the async views hash off the event loop
+        instance.password = encoded_password
+        credential_cache.invalidate_user(instance)
+    elif password:
+        instance.set_password(password)
+        credential_cache.invalidate_user(instance)
+    instance.save()
+    profile_cache.invalidate(instance.pk)
+    return instance
+
+
+def create_user(validated_data):
+    """
+    Creates a user from validated signup data, shared by ``CreateUserSerializer`` and its fast counterpart.
+    """
+    validated_data = dict(validated_data)
+    password = validated_data.pop('password')
+    encoded_password = validated_data.pop('encoded_password', None)
+    return User.objects.create_user(password=password, encoded_password=encoded_password, **validated_data)
 
 
 class BaseUserSerializer(serializers.ModelSerializer):
@@ -35,16 +73,7 @@ class UpdateUserSerializer(serializers.ModelSerializer):
                 self.fields.pop(field_name)
 
     def update(self, instance, validated_data):
-        for field_name in self.fields.keys():
-            if field_name in validated_data:
-                setattr(instance, field_name, validated_data[field_name])
-
-        password = validated_data.get('password')
-        if password:
-            instance.set_password(password)
-        instance.save()
-        return instance
-
+        return update_user(instance, validated_data)
 
 
 class CreateUserSerializer(BaseUserSerializer):
@@ -55,6 +84,4 @@ class CreateUserSerializer(BaseUserSerializer):
     password = serializers.CharField(write_only=True)
 
     def create(self, validated_data):
-        password = validated_data.pop('password')
-        user = User.objects.create_user(password=password, **validated_data)
-        return user
+        return create_user(validated_data)
@@ -0,0 +1,132 @@
+# tests/integration/test_async_views.py
+import json
+from base64 import b64encode
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.db import OperationalError
+from django.http import HttpResponse
+from django.test import TestCase, AsyncClient, RequestFactory, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from myapp.middleware import CustomHeadersMiddleware, RequestIDMiddleware
+from myapp.models import OutboxMessage, User, UserVerification
+from myapp.profile_cache import UserProfileCache
+from myapp.rate_limit import rate_limiter
+from myapp.views import user_profile
+
+
+@override_settings(ROOT_URLCONF='webapp.urls_async')
+class AsyncUserEndpointsTest(TestCase):
+    user_data = {
+        'username': 'test@example.com',
+        'password': 'password123',
+        'first_name': 'first',
+        'last_name': 'last'
+    }
+
+    def setUp(self):
+        self.client = AsyncClient()
+        # Limiter state is process-wide; start each test with full buckets
+        rate_limiter.clear()
+
+    def auth_header(self, password='password123'):
+        return 'Basic ' + b64encode(f"{self.user_data['username']}:{password}".encode('utf-8')).decode('utf-8')
+
+    async def create_verified_user(self):
+        response = await self.client.post(reverse('create_user'), data=json.dumps(self.user_data),
+                                          content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        await User.objects.filter(username=self.user_data['username']).aupdate(is_verified=True)
+
+    async def test_create_user(self):
+        response = await self.client.post(reverse('create_user'), data=json.dumps(self.user_data),
+                                          content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        user = await User.objects.aget(username=self.user_data['username'])
+        self.assertTrue(await sync_to_async(user.check_password)('password123'))
+        self.assertEqual(await OutboxMessage.objects.acount(), 1)
+
+    async def test_create_user_invalid_data(self):
+        response = await self.client.post(reverse('create_user'), data=json.dumps({'password': 'password123'}),
+                                          content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    async def test_user_info_get_and_put(self):
+        await self.create_verified_user()
+        response = await self.client.get(reverse('user_info'), AUTHORIZATION=self.auth_header())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['username'], self.user_data['username'])
+
+        response = await self.client.put(reverse('user_info'), data=json.dumps({'first_name': 'John',
+                                                                               'password': 'newpassword'}),
+                                         content_type='application/json', AUTHORIZATION=self.auth_header())
+        self.assertEqual(response.status_code, 204)
+
+        response = await self.client.get(reverse('user_info'), AUTHORIZATION=self.auth_header())
+        self.assertEqual(response.status_code, 401)
+        response = await self.client.get(reverse('user_info'), AUTHORIZATION=self.auth_header('newpassword'))
+        self.assertEqual(response.json()['first_name'], 'John')
+
+    async def test_user_info_without_credentials(self):
+        response = await self.client.get(reverse('user_info'))
+        self.assertEqual(response.status_code, 401)
+
+    async def test_verify_user(self):
+        await self.client.post(reverse('create_user'), data=json.dumps(self.user_data),
+                               content_type='application/json')
+        user = await User.objects.aget(username=self.user_data['username'])
+        await UserVerification.objects.acreate(user_id=user.id, verification_code='code123',
+                                               expires_at=timezone.now() + timezone.timedelta(minutes=2))
+        response = await self.client.get(reverse('verify_user'), {'code': 'x/code123'})
+        self.assertEqual(response.status_code, 200)
+        await user.arefresh_from_db()
+        self.assertTrue(user.is_verified)
+
+        response = await self.client.get(reverse('verify_user'), {'code': 'x/code123'})
+        self.assertEqual(response.status_code, 400)
+
+
+    async def test_create_user_unseen_unverified_duplicate_resends_email(self):
+        response = await self.client.post(reverse('create_user'), data=json.dumps(self.user_data),
+                                          content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        with mock.patch('myapp.async_views.known_usernames.might_exist', return_value=False):
+            response = await self.client.post(reverse('create_user'), data=json.dumps(self.user_data),
+                                              content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Please verify your email', response.json()['error'])
+        self.assertEqual(await OutboxMessage.objects.acount(), 2)
+
+    async def test_missing_table_maps_to_500_like_the_sync_views(self):
+        error = OperationalError("(1146, \"Table 'webApp.myapp_user' doesn't exist\")")
+        with mock.patch('myapp.async_views.known_usernames.might_exist', return_value=True), \
+                mock.patch('myapp.async_views.User.objects.filter', side_effect=error):
+            response = await self.client.post(reverse('create_user'), data=json.dumps(self.user_data),
+                                              content_type='application/json')
+        self.assertEqual(response.status_code, 500)
+        with mock.patch('myapp.async_views.User.objects.aget', side_effect=error):
+            response = await self.client.get(reverse('user_info'), AUTHORIZATION=self.auth_header())
+        self.assertEqual(response.status_code, 500)
+
+    async def test_shared_profile_cache_is_read_off_the_event_loop(self):
+        await self.create_verified_user()
+        cache = UserProfileCache(maxsize=10, backend='default')
+        with mock.patch('myapp.views.profile_cache', cache), mock.patch('myapp.async_views.profile_cache', cache), \
+                mock.patch('myapp.async_views.sync_to_async', wraps=sync_to_async) as wrapped:
+            response = await self.client.get(reverse('user_info'), AUTHORIZATION=self.auth_header())
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(mock.call(user_profile), wrapped.call_args_list)
+
+
+class AsyncMiddlewareTest(TestCase):
+    async def test_middleware_runs_natively_async(self):
+        async def view(request):
+            return HttpResponse()
+
+        middleware = RequestIDMiddleware(CustomHeadersMiddleware(view))
+        request = RequestFactory().get('/')
+        response = await middleware(request)
+        self.assertTrue(request.request_id)
+        self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
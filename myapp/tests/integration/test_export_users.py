@@ -0,0 +1,88 @@
+# tests/integration/test_export_users.py
+import csv
+import io
+import json
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from myapp.exports import iter_users
+from myapp.models import User
+
+
+class ExportTestMixin:
+    def create_users(self):
+        now = timezone.now()
+        # Three users share a timestamp so paging has to break ties on id
+        created = [now, now, now, now + timezone.timedelta(seconds=1), now - timezone.timedelta(seconds=1)]
+        User.objects.bulk_create([
+            User(username=f'user{i}@example.com', first_name='Test', last_name=str(i), password='secret',
+                 is_verified=i % 2 == 0)
+            for i in range(len(created))
+        ])
+        for i, account_created in enumerate(created):
+            User.objects.filter(username=f'user{i}@example.com').update(account_created=account_created)
+        return list(User.objects.order_by('account_created', 'id').values_list('username', flat=True))
+
+
+@override_settings(ROOT_URLCONF='webapp.urls')
+class ExportUsersTest(ExportTestMixin, TestCase):
+    def test_keyset_pages_cover_every_user_once(self):
+        expected = self.create_users()
+        with CaptureQueriesContext(connection) as queries:
+            exported = [user.username for user in iter_users(chunk_size=2)]
+        self.assertEqual(exported, expected)
+        self.assertEqual(len(queries.captured_queries), 3)
+        self.assertFalse(any('OFFSET' in query['sql'] for query in queries.captured_queries))
+
+    def test_command_writes_jsonl(self):
+        expected = self.create_users()
+        stdout = io.StringIO()
+        call_command('export_users', '--chunk-size', '2', stdout=stdout)
+        records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([record['username'] for record in records], expected)
+        self.assertEqual(set(records[0]), {'id', 'first_name', 'last_name', 'username', 'account_created',
+                                           'account_updated', 'is_verified'})
+
+    def test_endpoint_requires_configured_service_token(self):
+        client = Client()
+        self.assertEqual(client.get(reverse('export_users')).status_code, 404)
+        with override_settings(INTERNAL_SERVICE_TOKENS=['secret-token']):
+            self.assertEqual(client.get(reverse('export_users')).status_code, 401)
+            response = client.get(reverse('export_users'), HTTP_AUTHORIZATION='Bearer wrong')
+            self.assertEqual(response.status_code, 401)
+            response = client.post(reverse('export_users'), HTTP_AUTHORIZATION='Bearer secret-token')
+            self.assertEqual(response.status_code, 405)
+
+    @override_settings(INTERNAL_SERVICE_TOKENS=['other', 'secret-token'], EXPORT_CHUNK_SIZE=2)
+    def test_endpoint_streams_csv(self):
+        expected = self.create_users()
+        response = Client().get(reverse('export_users'), {'format': 'csv'}, HTTP_AUTHORIZATION='Bearer secret-token')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode('utf-8'))))
+        self.assertEqual([row['username'] for row in rows], expected)
+        self.assertNotIn('password', rows[0])
+
+    @override_settings(INTERNAL_SERVICE_TOKENS=['secret-token'])
+    def test_endpoint_rejects_unknown_format(self):
+        response = Client().get(reverse('export_users'), {'format': 'xml'}, HTTP_AUTHORIZATION='Bearer secret-token')
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(ROOT_URLCONF='webapp.urls_async', INTERNAL_SERVICE_TOKENS=['secret-token'], EXPORT_CHUNK_SIZE=2)
+class AsyncExportUsersTest(ExportTestMixin, TestCase):
+    async def test_endpoint_streams_jsonl(self):
+        from asgiref.sync import sync_to_async
+
+        expected = await sync_to_async(self.create_users)()
+        response = await AsyncClient().get(reverse('export_users'), AUTHORIZATION='Bearer secret-token')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        body = b''.join([block async for block in response.streaming_content])
+        self.assertEqual([json.loads(line)['username'] for line in body.splitlines()], expected)
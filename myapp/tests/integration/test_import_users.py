@@ -0,0 +1,102 @@
+# tests/integration/test_import_users.py
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from myapp.hashing import check_password
+from myapp.known_usernames import known_usernames
+from myapp.models import OutboxMessage, User
+
+
+class ImportUsersCommandTest(TestCase):
+    def write(self, name, content):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def run_import(self, path, *args):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command('import_users', path, '--processes', '0', '--chunk-size', '2', *args, stdout=stdout,
+                     stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_imports_csv_and_queues_verification_emails(self):
+        User.objects.create_user(username='existing@example.com', encoded_password='!', first_name='E',
+                                 last_name='U')
+        path = self.write('users.csv', (
+            "username,password,first_name,last_name\n"
+            "one@example.com,password123,One,User\n"
+            "existing@example.com,password123,Existing,User\n"
+            "not-an-email,password123,Bad,User\n"
+            "two@EXAMPLE.com,secret456,Two,User\n"
+            "one@example.com,password123,Again,User\n"
+        ))
+        stdout, stderr = self.run_import(path)
+
+        self.assertIn('done: read=5 created=2 existing=2 invalid=1', stdout)
+        self.assertIn('rows/sec=', stdout)
+        self.assertIn('line 4: {"username": ["Enter a valid email address."]}', stderr)
+        two = User.objects.get(username='two@example.com')
+        self.assertTrue(check_password('secret456', two.password))
+        self.assertFalse(two.is_verified)
+        self.assertEqual(User.objects.get(username='one@example.com').first_name, 'One')
+        self.assertEqual(
+            sorted(OutboxMessage.objects.values_list('dedup_key', flat=True)),
+            sorted(f'verify_email:{user.id}' for user in User.objects.exclude(username='existing@example.com'))
+        )
+        self.assertEqual(OutboxMessage.objects.get(dedup_key=f'verify_email:{two.id}').payload['username'],
+                         'two@example.com')
+        self.assertTrue(known_usernames.might_exist('two@example.com'))
+
+    def test_imports_jsonl_on_a_process_pool(self):
+        lines = [json.dumps({'username': f'user{i}@example.com', 'password': 'password123', 'first_name': 'U',
+                             'last_name': str(i)}) for i in range(3)]
+        path = self.write('users.jsonl', '\n'.join(lines[:2] + ['{broken', ''] + lines[2:]) + '\n')
+        stdout = io.StringIO()
+        call_command('import_users', path, '--processes', '2', '--no-verification-email', stdout=stdout,
+                     stderr=io.StringIO())
+
+        self.assertEqual(User.objects.count(), 3)
+        self.assertTrue(check_password('password123', User.objects.get(username='user2@example.com').password))
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def case_insensitive_usernames(self):
+        # MySQL's username collation ignores case; give SQLite's test table the same unique constraint
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('CREATE UNIQUE INDEX test_username_nocase ON myapp_user (username COLLATE NOCASE)')
+
+    def test_case_variants_in_one_chunk_are_duplicates(self):
+        self.case_insensitive_usernames()
+        path = self.write('users.csv', (
+            "username,password,first_name,last_name\n"
+            "One@example.com,password123,One,User\n"
+            "one@example.com,password123,Again,User\n"
+        ))
+        stdout, _ = self.run_import(path)
+
+        self.assertIn('done: read=2 created=1 existing=1 invalid=0', stdout)
+        self.assertEqual(list(User.objects.values_list('username', 'first_name')), [('One@example.com', 'One')])
+
+    def test_existing_account_differing_in_case_counts_as_existing(self):
+        self.case_insensitive_usernames()
+        User.objects.create_user(username='One@example.com', encoded_password='!', first_name='E', last_name='U')
+        path = self.write('users.csv', (
+            "username,password,first_name,last_name\n"
+            "one@example.com,password123,One,User\n"
+            "two@example.com,password123,Two,User\n"
+        ))
+        stdout, _ = self.run_import(path)
+
+        self.assertIn('done: read=2 created=1 existing=1 invalid=0', stdout)
+        self.assertEqual(sorted(User.objects.values_list('username', flat=True)),
+                         ['One@example.com', 'two@example.com'])
+        self.assertEqual(OutboxMessage.objects.count(), 1)
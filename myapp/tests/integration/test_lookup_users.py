@@ -0,0 +1,81 @@
+# tests/integration/test_lookup_users.py
+import json
+from unittest import mock
+
+from django.db import connection
+from django.test import AsyncClient, Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from myapp.models import User
+
+AUTH = 'Bearer secret-token'
+
+
+class LookupTestMixin:
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f'user{i}@example.com', encoded_password='!', first_name='Test',
+                                     last_name=str(i))
+            for i in range(3)
+        ]
+
+
+@override_settings(ROOT_URLCONF='webapp.urls', INTERNAL_SERVICE_TOKENS=['secret-token'], USER_LOOKUP_MAX_ITEMS=6)
+class LookupUsersEndpointTest(LookupTestMixin, TestCase):
+    def lookup(self, body, **extra):
+        return Client().post(reverse('lookup_users'), data=json.dumps(body), content_type='application/json',
+                             HTTP_AUTHORIZATION=AUTH, **extra)
+
+    def test_resolves_ids_and_usernames_in_one_query(self):
+        first, second, third = self.users
+        body = {
+            'ids': [str(second.id), str(first.id).upper(), 'not-a-uuid'],
+            'usernames': ['user2@example.com', 'user0@example.com', 'nobody@example.com'],
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.lookup(body)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len([q for q in queries.captured_queries if 'myapp_user' in q['sql']]), 1)
+        data = json.loads(response.content)
+        self.assertEqual([record['username'] for record in data['users']],
+                         ['user1@example.com', 'user0@example.com', 'user2@example.com'])
+        self.assertEqual(set(data['users'][0]), {'id', 'first_name', 'last_name', 'username', 'account_created',
+                                                 'account_updated'})
+        self.assertEqual(data['not_found'], {'ids': ['not-a-uuid'], 'usernames': ['nobody@example.com']})
+
+    def test_does_not_trust_known_usernames(self):
+        # An account created on another instance that this process's filter has not seen yet
+        with mock.patch('myapp.known_usernames.known_usernames.might_exist', return_value=False):
+            response = self.lookup({'usernames': ['user1@example.com']})
+        self.assertEqual([record['username'] for record in json.loads(response.content)['users']],
+                         ['user1@example.com'])
+
+    def test_rejects_too_many_items(self):
+        response = self.lookup({'usernames': [f'user{i}@example.com' for i in range(7)]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('At most 6', json.loads(response.content)['error'])
+
+    def test_rejects_malformed_body(self):
+        for body in ({'ids': 'abc'}, {'ids': [1]}, ['user0@example.com'], {'emails': []}):
+            self.assertEqual(self.lookup(body).status_code, 400)
+
+    def test_requires_service_token(self):
+        response = Client().post(reverse('lookup_users'), data='{}', content_type='application/json',
+                                 HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(Client().get(reverse('lookup_users'), HTTP_AUTHORIZATION=AUTH).status_code, 405)
+        with override_settings(INTERNAL_SERVICE_TOKENS=[]):
+            self.assertEqual(self.lookup({'ids': []}).status_code, 404)
+
+
+@override_settings(ROOT_URLCONF='webapp.urls_async', INTERNAL_SERVICE_TOKENS=['secret-token'])
+class AsyncLookupUsersEndpointTest(LookupTestMixin, TestCase):
+    async def test_resolves_usernames(self):
+        response = await AsyncClient().post(reverse('lookup_users'),
+                                            data=json.dumps({'usernames': ['user1@example.com', 'x@example.com']}),
+                                            content_type='application/json', AUTHORIZATION=AUTH)
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual([record['last_name'] for record in data['users']], ['1'])
+        self.assertEqual(data['not_found'], {'ids': [], 'usernames': ['x@example.com']})
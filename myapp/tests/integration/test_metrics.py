@@ -0,0 +1,114 @@
+# tests/integration/test_metrics.py
+import threading
+from concurrent.futures import Future
+from unittest import mock
+
+from django.test import TestCase, Client
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from myapp.credential_cache import VerifiedCredentialCache
+from myapp.db_health import DatabaseHealthProbe
+from myapp.hashing import HashingExecutor, HashingUnavailable, check_password, make_password
+from myapp.models import User
+from utils.connection_pool import ConnectionPool, PoolTimeout
+from utils.msg_publisher import PubSubMessagePublisher
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class MetricsEndpointTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+
+    def test_counts_requests_by_view_and_status(self):
+        before = sample('http_requests_total', view='ping', method='GET', status='200')
+        latency_before = sample('http_request_duration_seconds_count', view='ping')
+        self.client.get(reverse('ping'))
+        self.client.get(reverse('ping'))
+        self.client.post(reverse('ping'))
+        self.assertEqual(sample('http_requests_total', view='ping', method='GET', status='200') - before, 2)
+        self.assertEqual(sample('http_request_duration_seconds_count', view='ping') - latency_before, 3)
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'http_requests_total{method="GET",status="200",view="ping"}', response.content)
+
+    def test_unknown_path_is_unmatched(self):
+        before = sample('http_requests_total', view='unmatched', method='GET', status='404')
+        self.client.get('/no/such/path')
+        self.assertEqual(sample('http_requests_total', view='unmatched', method='GET', status='404') - before, 1)
+
+    def test_metrics_served_while_database_is_down(self):
+        probe = DatabaseHealthProbe(interval=0, failure_interval=0)
+        with mock.patch('myapp.middleware.db_probe', probe), mock.patch.object(probe, 'check', return_value=False):
+            self.assertEqual(self.client.get(reverse('ping')).status_code, 503)
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+    def test_records_db_queries(self):
+        before = sample('db_queries_total', alias='default')
+        User.objects.count()
+        User.objects.filter(username='test@example.com').exists()
+        self.assertEqual(sample('db_queries_total', alias='default') - before, 2)
+
+    def test_records_bcrypt_time(self):
+        make_before = sample('password_hash_duration_seconds_count', operation='make')
+        check_before = sample('password_hash_duration_seconds_count', operation='check')
+        self.assertTrue(check_password('password123', make_password('password123')))
+        self.assertEqual(sample('password_hash_duration_seconds_count', operation='make') - make_before, 1)
+        self.assertEqual(sample('password_hash_duration_seconds_count', operation='check') - check_before, 1)
+
+    def test_records_publish_latency(self):
+        client = mock.Mock()
+        client.topic_path.side_effect = lambda project, topic: f'projects/{project}/topics/{topic}'
+        future = Future()
+        client.publish.return_value = future
+        publisher = PubSubMessagePublisher('test-project', client=client)
+        before = sample('pubsub_publish_duration_seconds_count', topic='verify_email', outcome='success')
+        publisher.send_message('verify_email', {'username': 'test@example.com'})
+        future.set_result('1')
+        self.assertEqual(
+            sample('pubsub_publish_duration_seconds_count', topic='verify_email', outcome='success') - before, 1
+        )
+
+    def test_records_hashing_queue_wait_and_rejections(self):
+        executor = HashingExecutor(max_workers=1, queue_depth=0, timeout=5)
+        waits_before = sample('password_hash_queue_wait_seconds_count')
+        rejected_before = sample('password_hash_rejected_total')
+        release = threading.Event()
+        running = executor.submit(release.wait)
+        with self.assertRaises(HashingUnavailable):
+            executor.submit(release.wait)
+        release.set()
+        running.result()
+        self.assertEqual(sample('password_hash_queue_wait_seconds_count') - waits_before, 1)
+        self.assertEqual(sample('password_hash_rejected_total') - rejected_before, 1)
+
+    def test_records_credential_cache_hits_and_misses(self):
+        cache = VerifiedCredentialCache(maxsize=10, ttl=60)
+        user = User(username='test@example.com', password='encoded')
+        hits, misses = sample('credential_cache_requests_total', result='hit'), \
+            sample('credential_cache_requests_total', result='miss')
+        cache.is_verified('test@example.com', 'password123', user)
+        cache.remember('test@example.com', 'password123', user)
+        cache.is_verified('test@example.com', 'password123', user)
+        self.assertEqual(sample('credential_cache_requests_total', result='hit') - hits, 1)
+        self.assertEqual(sample('credential_cache_requests_total', result='miss') - misses, 1)
+
+    def test_records_connection_pool_events(self):
+        pool = ConnectionPool(connect=mock.Mock, max_size=1, max_lifetime=60, idle_timeout=30, timeout=0.01,
+                              alias='metrics-test')
+
+        def events(outcome):
+            return sample('db_pool_connections_total', alias='metrics-test', outcome=outcome)
+
+        conn = pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        pool.release(conn)
+        pool.release(pool.acquire(), discard=True)
+        self.assertEqual([events(outcome) for outcome in ('created', 'reused', 'discarded', 'timeout')],
+                         [1, 1, 1, 1])
@@ -1,7 +1,19 @@
 # tests/integration/test_middleware.py
-from django.test import TestCase, RequestFactory
+import pstats
+import tempfile
+
+from django.conf import settings
+from django.core import checks
+from django.test import TestCase, RequestFactory, override_settings
 from django.http import HttpResponse
-from myapp.middleware import CustomHeadersMiddleware, DatabaseCheckMiddleware
+from django.db import OperationalError
+from myapp.db_health import DatabaseHealthProbe, report_query_errors
+from myapp.hashing import make_password
+from myapp.middleware import (
+    ApiExemptAuthenticationMiddleware, ApiExemptMessageMiddleware, ApiExemptSessionMiddleware,
+    CustomHeadersMiddleware, DatabaseCheckMiddleware, ProfilingMiddleware,
+)
+from myapp.models import User
 import mock
 
 class CustomHeadersMiddlewareTest(TestCase):
@@ -18,17 +30,24 @@ class CustomHeadersMiddlewareTest(TestCase):
         self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
 
 class DatabaseCheckMiddlewareTest(TestCase):
-    @mock.patch('myapp.middleware.connection.cursor')
+    def setUp(self):
+        # Fresh probe per test; interval 0 keeps the background thread out of the way
+        self.probe = DatabaseHealthProbe(interval=0, failure_interval=0)
+        patcher = mock.patch('myapp.middleware.db_probe', self.probe)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch('myapp.db_health.connection.cursor')
     def test_database_check_middleware(self, mock_cursor):
         # Test DatabaseCheckMiddleware
-        mock_execute = mock_cursor.return_value.execute
+        mock_execute = mock_cursor.return_value.__enter__.return_value.execute
         mock_execute.return_value = None
         middleware = DatabaseCheckMiddleware(lambda req: HttpResponse())
         request = RequestFactory().get('/')
         response = middleware(request)
         self.assertEqual(response.status_code, 200)
 
-    @mock.patch('myapp.middleware.connection.cursor')
+    @mock.patch('myapp.db_health.connection.cursor')
     def test_database_unavailable(self, mock_cursor):
         # Test DatabaseCheckMiddleware when database is unavailable
         mock_cursor.side_effect = Exception('Database connection error')
@@ -37,3 +56,103 @@ class DatabaseCheckMiddlewareTest(TestCase):
         request.request_id = 'test_request_id'
         response = middleware(request)
         self.assertEqual(response.status_code, 503)
+
+    @mock.patch('myapp.db_health.connection.cursor')
+    def test_cached_state_skips_query(self, mock_cursor):
+        # With a background interval the cached state is served without touching the database.
+        # The middleware is built first so it does not start the probe thread.
+        middleware = DatabaseCheckMiddleware(lambda req: HttpResponse())
+        self.probe.interval = 60
+        self.probe.healthy = True
+        for _ in range(3):
+            self.assertEqual(middleware(RequestFactory().get('/')).status_code, 200)
+        mock_cursor.assert_not_called()
+
+    def test_cached_failure_returns_503(self):
+        middleware = DatabaseCheckMiddleware(lambda req: HttpResponse())
+        self.probe.interval = 60
+        self.probe.healthy = False
+        request = RequestFactory().get('/')
+        request.request_id = 'test_request_id'
+        self.assertEqual(middleware(request).status_code, 503)
+
+    def test_query_error_triggers_recheck(self):
+        self.probe.healthy = True
+        with mock.patch('myapp.db_health.db_probe', self.probe):
+            with self.assertRaises(OperationalError):
+                report_query_errors(mock.Mock(side_effect=OperationalError('gone away')), 'SELECT 1', None, False, {})
+        # Without a background thread the next request re-checks inline
+        self.assertIsNone(self.probe.healthy)
+        self.assertEqual(self.probe.last_error, 'gone away')
+
+
+class ProfilingMiddlewareTest(TestCase):
+    def get_response(self, request):
+        User.objects.count()
+        make_password('password123')
+        return HttpResponse()
+
+    def run_request(self, **headers):
+        request = RequestFactory().get('/', **headers)
+        request.request_id = 'test_request_id'
+        with mock.patch('builtins.logger') as mock_logger:
+            ProfilingMiddleware(self.get_response)(request)
+        return request, mock_logger
+
+    @override_settings(PROFILING_SAMPLE_RATE=0, PROFILING_TOKEN='')
+    def test_disabled_by_default(self):
+        request, mock_logger = self.run_request()
+        self.assertFalse(hasattr(request, 'profile'))
+        mock_logger.info.assert_not_called()
+
+    @override_settings(PROFILING_SAMPLE_RATE=0, PROFILING_TOKEN='secret', PROFILING_DUMP_DIR='')
+    def test_header_trigger_accounts_db_and_bcrypt(self):
+        request, mock_logger = self.run_request(HTTP_X_PROFILE_TOKEN='secret')
+        self.assertEqual(request.profile.db_queries, 1)
+        self.assertGreater(request.profile.bcrypt_seconds, 0)
+        logged = mock_logger.info.call_args.kwargs
+        self.assertEqual(logged['event'], 'request_profile')
+        self.assertEqual(logged['request_id'], 'test_request_id')
+        self.assertEqual(logged['db_queries'], 1)
+        self.assertTrue(logged['triggered'])
+
+    @override_settings(PROFILING_SAMPLE_RATE=0, PROFILING_TOKEN='secret')
+    def test_wrong_token_is_not_profiled(self):
+        request, _ = self.run_request(HTTP_X_PROFILE_TOKEN='guess')
+        self.assertFalse(hasattr(request, 'profile'))
+
+    def test_sampled_slow_request_dumps_pstats(self):
+        with tempfile.TemporaryDirectory() as dump_dir:
+            with override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_DUMP_DIR=dump_dir, PROFILING_SLOW_MS=0):
+                _, mock_logger = self.run_request()
+            path = mock_logger.info.call_args.kwargs['pstats']
+            self.assertTrue(path.startswith(dump_dir))
+            self.assertIn('make_password', ''.join(str(key) for key in pstats.Stats(path).stats))
+
+
+class ApiExemptMiddlewareTest(TestCase):
+    def run_stack(self, path):
+        seen = {}
+
+        def view(request):
+            seen.update(session=hasattr(request, 'session'), user=hasattr(request, 'user'),
+                        messages=hasattr(request, '_messages'))
+            return HttpResponse()
+
+        stack = ApiExemptSessionMiddleware(ApiExemptAuthenticationMiddleware(ApiExemptMessageMiddleware(view)))
+        response = stack(RequestFactory().get(path))
+        return seen, response
+
+    def test_api_requests_skip_session_auth_and_messages(self):
+        seen, response = self.run_stack('/v1/user/self')
+        self.assertEqual(seen, {'session': False, 'user': False, 'messages': False})
+        self.assertEqual(response.status_code, 200)
+
+    def test_other_requests_keep_full_behaviour(self):
+        seen, _ = self.run_stack('/admin/')
+        self.assertEqual(seen, {'session': True, 'user': True, 'messages': True})
+
+    def test_api_profile_passes_admin_checks(self):
+        api = [settings.API_MIDDLEWARE_REPLACEMENTS.get(name, name) for name in settings.MIDDLEWARE]
+        with override_settings(MIDDLEWARE=api):
+            self.assertEqual([error.id for error in checks.run_checks(tags=[checks.Tags.admin])], [])
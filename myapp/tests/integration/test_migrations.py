@@ -0,0 +1,36 @@
+# tests/integration/test_migrations.py
+import uuid
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class VerificationConstraintsMigrationTest(TransactionTestCase):
+    before = [('myapp', '0002_outboxmessage')]
+    after = [('myapp', '0003_verification_indexes')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_orphans_and_duplicate_codes_are_removed_before_constraints(self):
+        apps = self.migrate(self.before)
+        User = apps.get_model('myapp', 'User')
+        UserVerification = apps.get_model('myapp', 'UserVerification')
+        user = User.objects.create(username='test@example.com', password='!', first_name='T', last_name='U')
+        UserVerification.objects.create(user_id=uuid.uuid4(), verification_code='orphan')
+        older = UserVerification.objects.create(user_id=user.id, verification_code='shared')
+        newer = UserVerification.objects.create(user_id=user.id, verification_code='shared')
+        unique = UserVerification.objects.create(user_id=user.id, verification_code='unique')
+
+        apps = self.migrate(self.after)
+        UserVerification = apps.get_model('myapp', 'UserVerification')
+        self.assertEqual(sorted(UserVerification.objects.values_list('verification_code', 'id')),
+                         [('shared', newer.id), ('unique', unique.id)])
+        self.assertFalse(UserVerification.objects.filter(id=older.id).exists())
@@ -0,0 +1,106 @@
+# tests/integration/test_outbox.py
+import builtins
+import json
+from concurrent.futures import Future
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.utils import timezone
+
+from myapp.models import OutboxMessage, User
+
+
+class FakePublisher:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.sent = []
+
+    def send_message(self, topic_name, message, **attributes):
+        self.sent.append((topic_name, message, attributes))
+        future = Future()
+        if self.fail:
+            future.set_exception(RuntimeError('publish failed'))
+        else:
+            future.set_result(str(len(self.sent)))
+        return future
+
+
+class CreateUserOutboxTest(TestCase):
+    user_data = {
+        'username': 'test@example.com',
+        'password': 'password123',
+        'first_name': 'first',
+        'last_name': 'last'
+    }
+
+    @patch('utils.msg_publisher.PubSubMessagePublisher.send_message')
+    def test_create_user_writes_outbox_instead_of_publishing(self, mock_send_message):
+        response = Client().post(reverse('create_user'), data=json.dumps(self.user_data),
+                                 content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        mock_send_message.assert_not_called()
+
+        user = User.objects.get(username=self.user_data['username'])
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.topic, 'verify_email')
+        self.assertEqual(message.dedup_key, f'verify_email:{user.id}')
+        self.assertEqual(message.payload['username'], user.username)
+        self.assertIsNone(message.dispatched_at)
+
+    def test_resend_for_unverified_user_gets_new_dedup_key(self):
+        client = Client()
+        client.post(reverse('create_user'), data=json.dumps(self.user_data), content_type='application/json')
+        response = client.post(reverse('create_user'), data=json.dumps(self.user_data),
+                               content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(OutboxMessage.objects.count(), 2)
+
+
+class DispatchOutboxCommandTest(TestCase):
+    def setUp(self):
+        self.message = OutboxMessage.objects.enqueue('verify_email', {'username': 'test@example.com'}, 'key-1')
+
+    def dispatch(self, publisher):
+        with patch.object(builtins, 'msg_publisher', publisher, create=True):
+            call_command('dispatch_outbox', '--once')
+        self.message.refresh_from_db()
+
+    def test_dispatch_publishes_with_dedup_key(self):
+        publisher = FakePublisher()
+        self.dispatch(publisher)
+        self.assertEqual(publisher.sent, [('verify_email', {'username': 'test@example.com'}, {'dedup_key': 'key-1'})])
+        self.assertIsNotNone(self.message.dispatched_at)
+
+        # Dispatched messages are not sent again
+        self.dispatch(publisher)
+        self.assertEqual(len(publisher.sent), 1)
+
+    def test_failed_publish_is_retried_later(self):
+        self.dispatch(FakePublisher(fail=True))
+        self.assertIsNone(self.message.dispatched_at)
+        self.assertEqual(self.message.attempts, 1)
+        self.assertGreater(self.message.available_at, timezone.now())
+        self.assertIn('publish failed', self.message.last_error)
+
+        # Not due yet, so nothing is claimed
+        publisher = FakePublisher()
+        self.dispatch(publisher)
+        self.assertEqual(publisher.sent, [])
+
+    def test_publishes_outside_the_claiming_transaction(self):
+        depth = len(connection.atomic_blocks)
+        seen = {}
+
+        class InspectingPublisher(FakePublisher):
+            def send_message(publisher, topic_name, message, **attributes):
+                seen['atomic_blocks'] = len(connection.atomic_blocks)
+                # Leased, so another dispatcher polling now would not claim it
+                seen['pending'] = OutboxMessage.objects.pending(10).exists()
+                return super().send_message(topic_name, message, **attributes)
+
+        self.dispatch(InspectingPublisher())
+        self.assertEqual(seen, {'atomic_blocks': depth, 'pending': False})
+        self.assertIsNotNone(self.message.dispatched_at)
@@ -0,0 +1,59 @@
+# tests/integration/test_sweep_expired.py
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from myapp.models import OutboxMessage, User, UserVerification
+
+
+class SweepExpiredCommandTest(TestCase):
+    def create_user(self, username, is_verified, age_days):
+        user = User.objects.create_user(username=username, encoded_password='!', first_name='Test',
+                                        last_name='User', is_verified=is_verified)
+        User.objects.filter(pk=user.pk).update(account_created=timezone.now() - timezone.timedelta(days=age_days))
+        return user
+
+    def sweep(self):
+        call_command('sweep_expired', '--once', '--batch-size', '2', '--batch-sleep', '0')
+
+    def test_deletes_expired_and_used_verifications(self):
+        user = self.create_user('test@example.com', True, 0)
+        long_ago = timezone.now() - timezone.timedelta(days=1)
+        for i in range(3):
+            UserVerification.objects.create(user=user, verification_code=f'expired{i}', expires_at=long_ago)
+        UserVerification.objects.create(user=user, verification_code='used', expires_at=long_ago, is_used=True)
+        UserVerification.objects.create(user=user, verification_code='live')
+        self.sweep()
+        self.assertEqual(list(UserVerification.objects.values_list('verification_code', flat=True)), ['live'])
+
+    def test_keeps_recently_expired_verifications(self):
+        user = self.create_user('test@example.com', True, 0)
+        UserVerification.objects.create(user=user, verification_code='recent',
+                                        expires_at=timezone.now() - timezone.timedelta(minutes=1))
+        self.sweep()
+        self.assertTrue(UserVerification.objects.filter(verification_code='recent').exists())
+
+    def test_purges_only_old_unverified_users(self):
+        stale = [self.create_user(f'stale{i}@example.com', False, 30) for i in range(3)]
+        UserVerification.objects.create(user=stale[0], verification_code='stale')
+        self.create_user('new@example.com', False, 1)
+        self.create_user('verified@example.com', True, 30)
+        self.sweep()
+        self.assertEqual(sorted(User.objects.values_list('username', flat=True)),
+                         ['new@example.com', 'verified@example.com'])
+        self.assertFalse(UserVerification.objects.filter(verification_code='stale').exists())
+
+    def test_purges_old_dispatched_and_dead_outbox_messages(self):
+        now = timezone.now()
+        old = now - timezone.timedelta(days=8)
+        OutboxMessage.objects.bulk_create([
+            OutboxMessage(topic='verify_email', payload={}, dedup_key='old-dispatched', dispatched_at=old),
+            OutboxMessage(topic='verify_email', payload={}, dedup_key='old-dispatched-2', dispatched_at=old),
+            OutboxMessage(topic='verify_email', payload={}, dedup_key='old-dead', available_at=old, attempts=10),
+            OutboxMessage(topic='verify_email', payload={}, dedup_key='recent-dispatched', dispatched_at=now),
+            OutboxMessage(topic='verify_email', payload={}, dedup_key='recent-dead', available_at=now, attempts=10),
+            OutboxMessage(topic='verify_email', payload={}, dedup_key='old-retrying', available_at=old, attempts=3),
+        ])
+        self.sweep()
+        self.assertEqual(sorted(OutboxMessage.objects.values_list('dedup_key', flat=True)),
+                         ['old-retrying', 'recent-dead', 'recent-dispatched'])
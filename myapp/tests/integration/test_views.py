@@ -2,10 +2,16 @@ import json
 from base64 import b64encode
 from unittest.mock import patch
 
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
-from myapp.models import User
+from myapp.hashing import HashingUnavailable
+from myapp.known_usernames import KnownUsernames
+from myapp.models import OutboxMessage, User, UserVerification
+from myapp.rate_limit import RateLimiter, TokenBucket, rate_limiter
 
 
 class HealthzEndpointTest(TestCase):
@@ -55,6 +61,38 @@ class CreateUserEndpointTest(TestCase):
         self.assertIsNotNone(user)
         self.assertUserAttributes(user, user_data)
 
+    def test_create_user_endpoint_concurrent_duplicate(self):
+        existing = User.objects.create_user(username='test@example.com', first_name='first', last_name='last',
+                                            password='password123', is_verified=True)
+        user_data = {'username': existing.username, 'password': 'password123', 'first_name': 'first',
+                     'last_name': 'last'}
+        # Simulate the other signup committing after this request's lookup: only the insert sees it
+        with patch('myapp.views.known_usernames.might_exist', return_value=False), \
+                CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('create_user'), data=json.dumps(user_data),
+                                        content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        user_queries = [query['sql'] for query in queries.captured_queries if 'myapp_user' in query['sql']]
+        self.assertEqual(len(user_queries), 2)
+        self.assertTrue(user_queries[0].startswith('INSERT'))
+        self.assertTrue(user_queries[1].startswith('SELECT'))
+        self.assertEqual(json.loads(response.content), {'error': 'User with this username already exists.'})
+        self.assertEqual(User.objects.filter(username=existing.username).count(), 1)
+
+    def test_create_user_endpoint_unseen_unverified_duplicate_resends_email(self):
+        existing = User.objects.create_user(username='test@example.com', first_name='first', last_name='last',
+                                            password='password123')
+        user_data = {'username': existing.username, 'password': 'password123', 'first_name': 'first',
+                     'last_name': 'last'}
+        # known_usernames on this worker has not seen the account yet
+        with patch('myapp.views.known_usernames.might_exist', return_value=False):
+            response = self.client.post(reverse('create_user'), data=json.dumps(user_data),
+                                        content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Please verify your email', json.loads(response.content)['error'])
+        self.assertEqual(OutboxMessage.objects.filter(dedup_key__startswith=f'verify_email:{existing.id}:').count(),
+                         1)
+
     def test_create_user_endpoint_invalid_data(self):
         invalid_user_data = {'password': 'password123', 'first_name': 'first', 'last_name': 'last'}
         response = self.client.post(reverse('create_user'), data=invalid_user_data)
@@ -69,6 +107,8 @@ class UserInfoEndpointTest(TestCase):
     @patch('utils.msg_publisher.PubSubMessagePublisher.send_message')
     def setUp(self, mock_send_message):
         self.client = Client()
+        # Limiter state is process-wide; start each test with full buckets
+        rate_limiter.clear()
         user_data = {
             'username': 'test@example.com',
             'password': 'password123',
@@ -89,6 +129,51 @@ class UserInfoEndpointTest(TestCase):
         response = self.get_user_info_response()
         self.assertEqual(response.status_code, 200)
 
+    def test_user_info_endpoint_repeat_get_skips_bcrypt(self):
+        self.assertEqual(self.get_user_info_response().status_code, 200)
+        with patch('myapp.views.check_password') as mock_check_password:
+            response = self.get_user_info_response()
+        self.assertEqual(response.status_code, 200)
+        mock_check_password.assert_not_called()
+
+    def test_user_info_endpoint_hashing_pool_full(self):
+        with patch('myapp.views.check_password', side_effect=HashingUnavailable('full')):
+            response = self.get_user_info_response()
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+
+    def test_user_info_endpoint_rate_limits_failed_attempts_before_bcrypt(self):
+        limiter = RateLimiter(TokenBucket(rate=100, burst=100), TokenBucket(rate=0.01, burst=2))
+        auth_header = 'Basic ' + b64encode(b'test@example.com:wrong').decode('utf-8')
+        with patch('myapp.views.rate_limiter', limiter):
+            for _ in range(2):
+                self.assertEqual(self.client.get(reverse('user_info'), HTTP_AUTHORIZATION=auth_header).status_code, 401)
+            with patch('myapp.views.check_password') as mock_check_password, \
+                    patch('myapp.views.User.objects.get') as mock_get:
+                response = self.get_user_info_response()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '100')
+        mock_check_password.assert_not_called()
+        mock_get.assert_not_called()
+
+    def test_user_info_endpoint_unknown_username_skips_query(self):
+        known = KnownUsernames(capacity=100, error_rate=0.01, refresh_interval=0, negative_size=10, negative_ttl=60)
+        known.load()
+        auth_header = 'Basic ' + b64encode(b'nobody@example.com:password123').decode('utf-8')
+        with patch('myapp.views.known_usernames', known), self.assertNumQueries(0):
+            response = self.client.get(reverse('user_info'), HTTP_AUTHORIZATION=auth_header)
+        self.assertEqual(response.status_code, 401)
+        with patch('myapp.views.known_usernames', known):
+            self.assertEqual(self.get_user_info_response().status_code, 200)
+
+    def test_user_info_endpoint_rate_limits_client(self):
+        limiter = RateLimiter(TokenBucket(rate=0.5, burst=1), TokenBucket(rate=1, burst=10))
+        with patch('myapp.views.rate_limiter', limiter):
+            self.assertEqual(self.get_user_info_response().status_code, 200)
+            response = self.get_user_info_response()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '2')
+
     def test_user_info_endpoint_put_with_valid_credentials_and_valid_data(self):
         response = self.update_user_info_response({'first_name': 'John', 'last_name': 'Doe'})
         self.assertEqual(response.status_code, 204)
@@ -124,3 +209,36 @@ class UserInfoEndpointTest(TestCase):
         auth_header = 'Basic ' + b64encode(f'{username}:{password}'.encode('utf-8')).decode('utf-8')
         return self.client.put(reverse('user_info'), data=json.dumps(data), content_type='application/json',
                                HTTP_AUTHORIZATION=auth_header)
+
+
+class VerifyUserEndpointTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='test@example.com', password='password123',
+                                             first_name='Test', last_name='User')
+
+    def test_verify_user_endpoint_success(self):
+        UserVerification.objects.create(user=self.user, verification_code='code123')
+        response = self.client.get(reverse('verify_user'), {'code': 'x/code123'})
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_verified)
+        self.assertTrue(UserVerification.objects.get(verification_code='code123').is_used)
+
+    def test_verify_user_endpoint_used_code(self):
+        UserVerification.objects.create(user=self.user, verification_code='code123')
+        self.client.get(reverse('verify_user'), {'code': 'x/code123'})
+        response = self.client.get(reverse('verify_user'), {'code': 'x/code123'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_verify_user_endpoint_unknown_code(self):
+        response = self.client.get(reverse('verify_user'), {'code': 'x/missing'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_verify_user_endpoint_expired_code(self):
+        UserVerification.objects.create(user=self.user, verification_code='code123',
+                                        expires_at=timezone.now() - timezone.timedelta(minutes=1))
+        response = self.client.get(reverse('verify_user'), {'code': 'x/code123'})
+        self.assertEqual(response.status_code, 400)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_verified)
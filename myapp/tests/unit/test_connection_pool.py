@@ -0,0 +1,66 @@
+# tests/unit/test_connection_pool.py
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from utils.connection_pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    def make_pool(self, **kwargs):
+        options = {'max_size': 2, 'max_lifetime': 60, 'idle_timeout': 30, 'timeout': 0.01}
+        options.update(kwargs)
+        return ConnectionPool(connect=FakeConnection, **options)
+
+    def test_released_connection_is_reused(self):
+        pool = self.make_pool()
+        conn = pool.acquire()
+        pool.release(conn)
+        self.assertIs(pool.acquire(), conn)
+        self.assertEqual(pool.stats()['created'], 1)
+        self.assertEqual(pool.stats()['reused'], 1)
+
+    def test_pool_is_bounded(self):
+        pool = self.make_pool()
+        first, second = pool.acquire(), pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        self.assertEqual(pool.stats()['timeouts'], 1)
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+        pool.release(second)
+
+    def test_discarded_connection_is_closed(self):
+        pool = self.make_pool()
+        conn = pool.acquire()
+        pool.release(conn, discard=True)
+        self.assertTrue(conn.closed)
+        self.assertIsNot(pool.acquire(), conn)
+
+    @mock.patch('utils.connection_pool.time.monotonic')
+    def test_expired_and_idle_connections_are_retired(self, mock_monotonic):
+        mock_monotonic.return_value = 0
+        pool = self.make_pool()
+        conn = pool.acquire()
+        pool.release(conn)
+        mock_monotonic.return_value = 31  # idle longer than idle_timeout
+        self.assertIsNot(pool.acquire(), conn)
+        self.assertTrue(conn.closed)
+
+    @mock.patch('utils.connection_pool.time.monotonic')
+    def test_failed_validation_opens_new_connection(self, mock_monotonic):
+        mock_monotonic.return_value = 0
+        pool = self.make_pool(ping_after=5, validate=lambda conn: False)
+        conn = pool.acquire()
+        pool.release(conn)
+        mock_monotonic.return_value = 10
+        self.assertIsNot(pool.acquire(), conn)
+        self.assertEqual(pool.stats()['discarded'], 1)
@@ -0,0 +1,48 @@
+# tests/unit/test_credential_cache.py
+from django.test import TestCase
+
+from myapp.credential_cache import VerifiedCredentialCache
+from myapp.models import User
+from myapp.serializers import UpdateUserSerializer
+
+
+class VerifiedCredentialCacheTest(TestCase):
+    def setUp(self):
+        self.cache = VerifiedCredentialCache(maxsize=10, ttl=60)
+        self.user = User.objects.create_user(username='test@example.com', first_name='Test', last_name='User',
+                                             password='password123')
+
+    def test_hit_after_remember(self):
+        self.assertFalse(self.cache.is_verified('test@example.com', 'password123', self.user))
+        self.cache.remember('test@example.com', 'password123', self.user)
+        self.assertTrue(self.cache.is_verified('test@example.com', 'password123', self.user))
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_wrong_password_misses(self):
+        self.cache.remember('test@example.com', 'password123', self.user)
+        self.assertFalse(self.cache.is_verified('test@example.com', 'wrong', self.user))
+
+    def test_plaintext_not_stored(self):
+        self.cache.remember('test@example.com', 'password123', self.user)
+        for key, value in self.cache._cache.items():
+            self.assertNotIn(b'password123', key)
+            self.assertNotIn('password123', value)
+
+    def test_changed_hash_misses(self):
+        self.cache.remember('test@example.com', 'password123', self.user)
+        self.user.set_password('password123')
+        self.assertFalse(self.cache.is_verified('test@example.com', 'password123', self.user))
+
+    def test_invalidate_user(self):
+        self.cache.remember('test@example.com', 'password123', self.user)
+        self.cache.invalidate_user(self.user)
+        self.assertEqual(self.cache.stats()['size'], 0)
+
+    def test_password_update_invalidates(self):
+        from myapp.credential_cache import credential_cache
+        credential_cache.remember('test@example.com', 'password123', self.user)
+        serializer = UpdateUserSerializer(instance=self.user, data={'password': 'newpassword'})
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+        self.assertFalse(credential_cache.is_verified('test@example.com', 'password123', self.user))
@@ -0,0 +1,125 @@
+# tests/unit/test_fast_serializers.py
+import os
+import timeit
+import unittest
+
+from django.http import JsonResponse
+from django.test import TestCase
+from django.utils import timezone
+
+from myapp import fast_serializers, serializers
+from myapp.models import User
+
+VALID = {'username': 'new@example.com', 'password': 'password123', 'first_name': 'first', 'last_name': 'last'}
+
+CREATE_INPUTS = [
+    VALID,
+    {**VALID, 'id': 'ignored', 'account_created': 'ignored', 'is_verified': True},
+    {**VALID, 'first_name': '  padded  ', 'password': ' spaced '},
+    {**VALID, 'first_name': 42, 'last_name': 4.5},
+    {},
+    {**VALID, 'first_name': '', 'last_name': '   '},
+    {**VALID, 'first_name': None, 'password': None},
+    {**VALID, 'first_name': True, 'last_name': ['a'], 'password': {'a': 1}},
+    {**VALID, 'first_name': 'x' * 101, 'last_name': 'x' * 100},
+    {**VALID, 'first_name': 'nul\x00'},
+    {**VALID, 'username': 'not-an-email'},
+    {**VALID, 'username': 'a' * 250 + '@example.com'},
+    {**VALID, 'username': ['a@example.com']},
+    {**VALID, 'username': 'existing@example.com'},
+    {**VALID, 'username': ' existing@example.com '},
+    None,
+    ['not', 'a', 'dict'],
+    'string',
+]
+
+UPDATE_INPUTS = [
+    {},
+    {'first_name': 'John'},
+    {'first_name': 'John', 'last_name': 'Doe', 'password': 'newpassword'},
+    {'first_name': ' John ', 'last_name': 7},
+    {'first_name': '', 'last_name': None},
+    {'password': 'x' * 129},
+    {'password': 'x' * 128},
+    {'first_name': False},
+    None,
+    [],
+]
+
+
+class FastSerializerParityTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='existing@example.com', first_name='Test', last_name='User',
+                                             password='password123')
+
+    def assertSameValidation(self, drf, fast):
+        self.assertEqual(fast.is_valid(), drf.is_valid())
+        # ErrorDetail equality compares the error code as well as the message
+        self.assertEqual(dict(fast.errors), dict(drf.errors))
+        self.assertEqual(dict(fast.validated_data), dict(drf.validated_data))
+
+    def test_create_validation(self):
+        for data in CREATE_INPUTS:
+            with self.subTest(data=data):
+                self.assertSameValidation(serializers.CreateUserSerializer(data=data),
+                                          fast_serializers.CreateUserSerializer(data=data))
+
+    def test_update_validation(self):
+        for data in UPDATE_INPUTS:
+            with self.subTest(data=data):
+                self.assertSameValidation(serializers.UpdateUserSerializer(self.user, data=data),
+                                          fast_serializers.UpdateUserSerializer(self.user, data=data))
+
+    def test_user_json_is_byte_identical(self):
+        self.user.account_updated = timezone.now().replace(microsecond=999999)
+        for user in (self.user, User.objects.get(pk=self.user.pk)):
+            self.assertEqual(JsonResponse(fast_serializers.UserSerializer(user).data).content,
+                             JsonResponse(serializers.UserSerializer(user).data).content)
+
+    def test_create_response_is_byte_identical(self):
+        fast = fast_serializers.CreateUserSerializer(data=VALID)
+        self.assertTrue(fast.is_valid())
+        user = fast.save()
+        self.assertTrue(user.check_password('password123'))
+        self.assertEqual(JsonResponse({'data': fast.data}).content,
+                         JsonResponse({'data': serializers.CreateUserSerializer(user).data}).content)
+
+    def test_update_saves(self):
+        fast = fast_serializers.UpdateUserSerializer(self.user, data={'first_name': 'John', 'password': 'newpass'})
+        self.assertTrue(fast.is_valid())
+        fast.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'John')
+        self.assertTrue(self.user.check_password('newpass'))
+
+
+@unittest.skipUnless(os.getenv('RUN_BENCHMARKS'), "Set RUN_BENCHMARKS=1 to run microbenchmarks.")
+class FastSerializerBenchmark(TestCase):
+    number = 2000
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='existing@example.com', first_name='Test', last_name='User',
+                                             password='password123')
+
+    def compare(self, name, drf, fast):
+        drf_time = min(timeit.repeat(drf, number=self.number, repeat=3)) / self.number
+        fast_time = min(timeit.repeat(fast, number=self.number, repeat=3)) / self.number
+        print(f"\n{name}: drf={drf_time * 1e6:.1f}us fast={fast_time * 1e6:.1f}us "
+              f"speedup={drf_time / fast_time:.1f}x")
+        self.assertLess(fast_time, drf_time)
+
+    def test_user_representation(self):
+        self.compare('UserSerializer.data',
+                     lambda: serializers.UserSerializer(self.user).data,
+                     lambda: fast_serializers.UserSerializer(self.user).data)
+
+    def test_update_validation(self):
+        data = {'first_name': 'John', 'last_name': 'Doe'}
+
+        def drf():
+            serializers.UpdateUserSerializer(self.user, data=data).is_valid()
+
+        def fast():
+            fast_serializers.UpdateUserSerializer(self.user, data=data).is_valid()
+
+        self.compare('UpdateUserSerializer.is_valid', drf, fast)
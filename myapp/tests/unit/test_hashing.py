@@ -0,0 +1,43 @@
+# tests/unit/test_hashing.py
+import threading
+
+from django.contrib.auth.hashers import check_password
+from django.test import SimpleTestCase
+
+from myapp.hashing import HashingExecutor, HashingUnavailable
+
+
+class HashingExecutorTest(SimpleTestCase):
+    def test_run_returns_result_and_records_timings(self):
+        executor = HashingExecutor(max_workers=1, queue_depth=0, timeout=5)
+        self.assertEqual(executor.run(lambda a, b: a + b, 1, 2), 3)
+        stats = executor.stats()
+        self.assertEqual(stats['hash_seconds']['count'], 1)
+        self.assertEqual(stats['queue_wait_seconds']['count'], 1)
+
+    def test_rejects_when_queue_is_full(self):
+        executor = HashingExecutor(max_workers=1, queue_depth=1, timeout=5)
+        release = threading.Event()
+        first = executor.submit(release.wait)
+        second = executor.submit(release.wait)
+        with self.assertRaises(HashingUnavailable):
+            executor.submit(release.wait)
+        release.set()
+        first.result()
+        second.result()
+        self.assertEqual(executor.stats()['rejected'], 1)
+        # Slots are released once the queued work completes
+        self.assertTrue(executor.run(lambda: True))
+
+    def test_timeout_raises_unavailable(self):
+        executor = HashingExecutor(max_workers=1, queue_depth=0, timeout=0.01)
+        release = threading.Event()
+        with self.assertRaises(HashingUnavailable):
+            executor.run(release.wait)
+        release.set()
+
+    def test_make_password_uses_configured_hasher(self):
+        from myapp.hashing import make_password
+        encoded = make_password('password123')
+        self.assertTrue(encoded.startswith('bcrypt_sha256$'))
+        self.assertTrue(check_password('password123', encoded))
@@ -0,0 +1,58 @@
+# tests/unit/test_json_codec.py
+import json
+import unittest
+import uuid
+
+from django.http import JsonResponse as DjangoJsonResponse
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+
+from utils import json_codec
+
+PAYLOAD = {
+    'id': uuid.uuid4(),
+    'name': 'Zoë',
+    'when': timezone.now(),
+    'label': gettext_lazy('Invalid data.'),
+    'nested': [1, 2.5, None, True],
+}
+
+
+class JsonCodecTest(SimpleTestCase):
+    def setUp(self):
+        json_codec.configure('stdlib')
+
+    def tearDown(self):
+        json_codec.configure('stdlib')
+
+    def test_stdlib_response_matches_django(self):
+        json_codec.configure('stdlib')
+        ours = json_codec.JsonResponse(PAYLOAD, status=201)
+        django = DjangoJsonResponse(PAYLOAD, status=201)
+        self.assertEqual(ours.content, django.content)
+        self.assertEqual(ours['Content-Type'], django['Content-Type'])
+        self.assertEqual(ours.status_code, 201)
+
+    def test_non_dict_requires_safe_false(self):
+        with self.assertRaises(TypeError):
+            json_codec.JsonResponse([1, 2])
+        self.assertEqual(json_codec.JsonResponse([1, 2], safe=False).content, b'[1, 2]')
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            json_codec.configure('yaml')
+
+    @unittest.skipIf(json_codec.orjson is None, "orjson is not installed")
+    def test_orjson_matches_stdlib_semantically(self):
+        json_codec.configure('orjson')
+        body = json_codec.dumps(PAYLOAD)
+        self.assertIsInstance(body, bytes)
+        self.assertEqual(json.loads(body), json.loads(DjangoJsonResponse(PAYLOAD).content))
+        self.assertEqual(json_codec.loads(body)['name'], 'Zoë')
+
+    @unittest.skipIf(json_codec.orjson is None, "orjson is not installed")
+    def test_orjson_decode_error_is_json_decode_error(self):
+        json_codec.configure('orjson')
+        with self.assertRaises(json.JSONDecodeError):
+            json_codec.loads(b'{not json')
@@ -0,0 +1,89 @@
+# tests/unit/test_known_usernames.py
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from myapp.known_usernames import BloomFilter, KnownUsernames, known_usernames, username_key
+from myapp.models import User
+
+
+class BloomFilterTest(SimpleTestCase):
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        bloom = BloomFilter(capacity=2000, error_rate=0.01)
+        for i in range(2000):
+            bloom.add(f'user{i}@example.com')
+        self.assertTrue(all(f'user{i}@example.com' in bloom for i in range(2000)))
+        false_positives = sum(f'other{i}@example.com' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_readding_does_not_count(self):
+        bloom = BloomFilter(capacity=10, error_rate=0.01)
+        bloom.add('a@example.com')
+        bloom.add('a@example.com')
+        self.assertEqual(bloom.count, 1)
+
+    def test_username_key_folds_like_the_database_collation(self):
+        self.assertEqual(username_key('José@Example.com '), username_key('jose@example.com'))
+
+
+class KnownUsernamesTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='test@example.com', first_name='Test', last_name='User',
+                                             password='password123')
+        self.known = KnownUsernames(capacity=2, error_rate=0.01, refresh_interval=0, negative_size=10,
+                                    negative_ttl=60)
+
+    def test_everything_may_exist_until_loaded(self):
+        self.assertTrue(self.known.might_exist('nobody@example.com'))
+
+    def test_load(self):
+        self.known.load()
+        self.assertTrue(self.known.might_exist('test@example.com'))
+        self.assertTrue(self.known.might_exist('TEST@example.com'))
+        self.assertFalse(self.known.might_exist('nobody@example.com'))
+        self.assertEqual(self.known.stats()['skipped'], 1)
+
+    def test_filter_is_only_written_under_the_lock(self):
+        held = []
+        original_add = BloomFilter.add
+
+        def add(bloom, item):
+            held.append(self.known._lock.locked())
+            original_add(bloom, item)
+
+        with mock.patch.object(BloomFilter, 'add', add):
+            self.known.load()
+            self.known.add('new@example.com')
+            self.known.refresh()
+        self.assertTrue(held)
+        self.assertTrue(all(held))
+
+    def test_refresh_picks_up_accounts_created_elsewhere(self):
+        self.known.load()
+        User.objects.bulk_create([User(username='other@example.com', first_name='O', last_name='U',
+                                       account_created=timezone.now())])
+        self.assertFalse(self.known.might_exist('other@example.com'))
+        self.known.refresh()
+        self.assertTrue(self.known.might_exist('other@example.com'))
+
+    def test_grows_past_capacity(self):
+        self.known.load()
+        names = ('a@example.com', 'b@example.com', 'c@example.com')
+        User.objects.bulk_create([User(username=name, first_name='N', last_name='U') for name in names])
+        for name in names:
+            self.known.add(name)
+        self.known.refresh()
+        self.assertEqual(self.known.stats()['capacity'], 4)
+        self.assertTrue(all(self.known.might_exist(name) for name in names + ('test@example.com',)))
+
+    def test_negative_cache_until_signup(self):
+        self.known.remember_missing('new@example.com')
+        self.assertFalse(self.known.might_exist('new@example.com'))
+        self.known.add('new@example.com')
+        self.assertTrue(self.known.might_exist('new@example.com'))
+
+    def test_new_users_are_recorded(self):
+        known_usernames.remember_missing('signup@example.com')
+        User.objects.create_user(username='signup@example.com', first_name='S', last_name='U', password='password123')
+        self.assertTrue(known_usernames.might_exist('signup@example.com'))
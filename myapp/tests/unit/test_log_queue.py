@@ -0,0 +1,59 @@
+# tests/unit/test_log_queue.py
+import logging
+import os
+import tempfile
+import threading
+
+from django.test import SimpleTestCase
+
+from utils.log_queue import QueueingFileHandler
+
+
+class QueueingFileHandlerTest(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.filename = os.path.join(self.tmpdir.name, 'app.log')
+
+    def make_logger(self, handler):
+        test_logger = logging.Logger('test_log_queue')
+        test_logger.addHandler(handler)
+        return test_logger
+
+    def read_lines(self):
+        with open(self.filename) as log_file:
+            return log_file.read().splitlines()
+
+    def test_records_are_written_on_close(self):
+        handler = QueueingFileHandler(self.filename, when='D', maxsize=100, batch_size=10)
+        test_logger = self.make_logger(handler)
+        for i in range(25):
+            test_logger.warning('record %d', i)
+        handler.close()
+        self.assertEqual(self.read_lines(), [f'record {i}' for i in range(25)])
+
+    def test_full_queue_drops_and_counts(self):
+        handler = QueueingFileHandler(self.filename, when='D', maxsize=2, batch_size=10)
+        # Hold the listener inside a write so the queue fills up
+        blocked, release = threading.Event(), threading.Event()
+        original_emit = handler.target.emit
+
+        def blocking_emit(record):
+            blocked.set()
+            release.wait()
+            original_emit(record)
+
+        handler.target.emit = blocking_emit
+        test_logger = self.make_logger(handler)
+        test_logger.warning('first')
+        blocked.wait()
+        for i in range(5):
+            test_logger.warning('queued %d', i)
+        self.assertEqual(handler.dropped, 3)
+        release.set()
+        handler.close()
+        lines = self.read_lines()
+        dropped_reports = [line for line in lines if 'log_records_dropped' in line]
+        self.assertEqual(len(dropped_reports), 1)
+        self.assertIn('"dropped": 3', dropped_reports[0])
+        self.assertEqual([line for line in lines if line not in dropped_reports], ['first', 'queued 0', 'queued 1'])
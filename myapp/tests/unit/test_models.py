@@ -1,6 +1,9 @@
 # tests/unit/test_models.py
+from django.db import connection
 from django.test import TestCase
-from myapp.models import User
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from myapp.models import User, UserVerification
 
 class UserModelTest(TestCase):
     def test_create_user(self):
@@ -11,3 +14,37 @@ class UserModelTest(TestCase):
         self.assertEqual(user.first_name, 'Test')
         self.assertEqual(user.last_name, 'User')
         self.assertTrue(user.check_password('password123'))
+
+
+class UserVerificationManagerTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='test@example.com', first_name='Test', last_name='User',
+                                             password='password123')
+
+    def test_consume_verifies_user(self):
+        UserVerification.objects.create(user=self.user, verification_code='code123')
+        updated_before = self.user.account_updated
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(UserVerification.objects.consume('code123'))
+        # Two UPDATEs; the test transaction adds savepoint statements around them
+        statements = [query['sql'] for query in queries if 'SAVEPOINT' not in query['sql']]
+        self.assertEqual(len(statements), 2)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_verified)
+        self.assertGreater(self.user.account_updated, updated_before)
+        self.assertTrue(UserVerification.objects.get(verification_code='code123').is_used)
+
+    def test_consume_only_succeeds_once(self):
+        UserVerification.objects.create(user=self.user, verification_code='code123')
+        self.assertTrue(UserVerification.objects.consume('code123'))
+        self.assertFalse(UserVerification.objects.consume('code123'))
+
+    def test_consume_expired_code(self):
+        UserVerification.objects.create(user=self.user, verification_code='code123',
+                                        expires_at=timezone.now() - timezone.timedelta(seconds=1))
+        self.assertFalse(UserVerification.objects.consume('code123'))
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_verified)
+
+    def test_consume_unknown_code(self):
+        self.assertFalse(UserVerification.objects.consume('missing'))
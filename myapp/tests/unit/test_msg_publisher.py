@@ -0,0 +1,79 @@
+# tests/unit/test_msg_publisher.py
+import json
+from concurrent.futures import Future
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from utils.msg_publisher import PubSubMessagePublisher
+
+
+class FakePublisherClient:
+    def __init__(self):
+        self.published = []
+        self.futures = []
+        self.stopped = False
+
+    def topic_path(self, project_id, topic_name):
+        return f"projects/{project_id}/topics/{topic_name}"
+
+    def publish(self, topic_path, data, **attributes):
+        self.published.append((topic_path, data, attributes))
+        future = Future()
+        self.futures.append(future)
+        return future
+
+    def stop(self):
+        self.stopped = True
+
+
+class PubSubMessagePublisherTest(SimpleTestCase):
+    def setUp(self):
+        self.client = FakePublisherClient()
+        self.publisher = PubSubMessagePublisher('test-project', client=self.client)
+
+    def test_send_message_does_not_block(self):
+        future = self.publisher.send_message('verify_email', {'username': 'test@example.com'}, dedup_key='abc')
+        self.assertFalse(future.done())
+        topic_path, data, attributes = self.client.published[0]
+        self.assertEqual(topic_path, 'projects/test-project/topics/verify_email')
+        self.assertEqual(json.loads(data), {'username': 'test@example.com'})
+        self.assertEqual(attributes, {'dedup_key': 'abc'})
+        future.set_result('message-id')
+        self.assertEqual(future.result(), 'message-id')
+
+    def test_client_is_reused(self):
+        self.publisher.send_message('verify_email', {'username': 'a@example.com'})
+        self.publisher.send_message('verify_email', {'username': 'b@example.com'})
+        self.assertIs(self.publisher.client, self.client)
+        self.assertEqual(len(self.client.published), 2)
+
+    def test_publish_failure_is_handled_in_callback(self):
+        failed = Future()
+        failed.set_exception(RuntimeError('publish failed'))
+        with mock.patch('builtins.logger') as mock_logger:
+            # Returns normally: a raising callback would only be swallowed by the future
+            self.assertIsNone(self.publisher._on_published(failed, 'verify_email', 'test@example.com', 0.0))
+        mock_logger.error.assert_called_once()
+        fields = mock_logger.error.call_args.kwargs
+        self.assertEqual(fields['event'], 'Topic publishing failure')
+        self.assertEqual(fields['username'], 'test@example.com')
+        self.assertEqual(fields['error'], 'publish failed')
+        mock_logger.debug.assert_not_called()
+
+    def test_publish_failure_is_logged_through_send_message(self):
+        with mock.patch('builtins.logger') as mock_logger:
+            future = self.publisher.send_message('verify_email', {'username': 'test@example.com'})
+            future.set_exception(RuntimeError('publish failed'))
+        mock_logger.error.assert_called_once()
+        self.assertIn('verify_email', mock_logger.error.call_args.kwargs['message'])
+
+    def test_batch_settings(self):
+        publisher = PubSubMessagePublisher('test-project', max_messages=10, max_bytes=2048, max_latency=0.5)
+        self.assertEqual(publisher.batch_settings.max_messages, 10)
+        self.assertEqual(publisher.batch_settings.max_bytes, 2048)
+        self.assertEqual(publisher.batch_settings.max_latency, 0.5)
+
+    def test_close_stops_client(self):
+        self.publisher.close()
+        self.assertTrue(self.client.stopped)
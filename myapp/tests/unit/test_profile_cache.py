@@ -0,0 +1,54 @@
+# tests/unit/test_profile_cache.py
+from django.test import TestCase
+from prometheus_client import REGISTRY
+
+from myapp.models import User, UserVerification
+from myapp.profile_cache import UserProfileCache
+from myapp.serializers import UpdateUserSerializer, UserSerializer
+
+
+class UserProfileCacheTest(TestCase):
+    def setUp(self):
+        self.cache = UserProfileCache(maxsize=10)
+        self.user = User.objects.create_user(username='test@example.com', first_name='Test', last_name='User',
+                                             password='password123')
+
+    def test_hit_after_set(self):
+        self.assertIsNone(self.cache.get(self.user))
+        self.cache.set(self.user, UserSerializer(self.user).data)
+        self.assertEqual(self.cache.get(self.user)['first_name'], 'Test')
+        self.assertEqual(self.cache.stats()['hit_ratio'], 0.5)
+
+    def test_lookups_are_counted_in_metrics(self):
+        def sample(result):
+            return REGISTRY.get_sample_value('profile_cache_requests_total', {'result': result}) or 0.0
+
+        hits, misses = sample('hit'), sample('miss')
+        self.cache.get(self.user)
+        self.cache.set(self.user, UserSerializer(self.user).data)
+        self.cache.get(self.user)
+        self.cache.get(self.user)
+        self.assertEqual((sample('hit') - hits, sample('miss') - misses), (2, 1))
+
+    def test_newer_account_updated_misses(self):
+        self.cache.set(self.user, UserSerializer(self.user).data)
+        UserVerification.objects.create(user=self.user, verification_code='code123')
+        UserVerification.objects.consume('code123')
+        self.assertIsNone(self.cache.get(User.objects.get(pk=self.user.pk)))
+
+    def test_shared_backend(self):
+        writer = UserProfileCache(maxsize=10, backend='default')
+        reader = UserProfileCache(maxsize=10, backend='default')
+        writer.set(self.user, UserSerializer(self.user).data)
+        self.assertEqual(reader.get(self.user)['username'], 'test@example.com')
+        writer.invalidate(self.user.pk)
+        reader.clear()
+        self.assertIsNone(reader.get(self.user))
+
+    def test_update_invalidates(self):
+        from myapp.profile_cache import profile_cache
+        profile_cache.set(self.user, UserSerializer(self.user).data)
+        serializer = UpdateUserSerializer(instance=self.user, data={'first_name': 'Changed'})
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+        self.assertNotIn(self.user.pk, profile_cache._cache)
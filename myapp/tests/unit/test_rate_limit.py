@@ -0,0 +1,93 @@
+# tests/unit/test_rate_limit.py
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import RequestFactory, SimpleTestCase
+
+from myapp.rate_limit import CacheTokenBucket, RateLimited, RateLimiter, TokenBucket
+
+
+class TokenBucketTest(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch('myapp.rate_limit.time.monotonic', return_value=1000.0)
+        self.clock = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.bucket = TokenBucket(rate=2, burst=3, max_keys=64, shards=4)
+
+    def test_burst_then_refill(self):
+        self.assertEqual([self.bucket.acquire('10.0.0.1') for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(self.bucket.acquire('10.0.0.1'), 0.5)
+        self.clock.return_value += 0.5
+        self.assertEqual(self.bucket.acquire('10.0.0.1'), 0.0)
+
+    def test_keys_are_independent(self):
+        for _ in range(3):
+            self.bucket.acquire('10.0.0.1')
+        self.assertGreater(self.bucket.acquire('10.0.0.1'), 0)
+        self.assertEqual(self.bucket.acquire('10.0.0.2'), 0.0)
+
+    def test_peek_does_not_consume(self):
+        for _ in range(5):
+            self.assertEqual(self.bucket.peek('user'), 0.0)
+        self.assertEqual(self.bucket.acquire('user'), 0.0)
+
+    def test_idle_keys_are_evicted(self):
+        for i in range(1000):
+            self.bucket.acquire(f'10.0.{i // 256}.{i % 256}')
+        self.assertLessEqual(sum(len(buckets) for _, buckets in self.bucket._shards), 64)
+
+
+class CacheTokenBucketTest(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.bucket = CacheTokenBucket(rate=1, burst=2, backend='default', name='test')
+
+    def test_window_admits_burst(self):
+        with mock.patch('myapp.rate_limit.time.time', return_value=1000.0):
+            self.assertEqual(self.bucket.acquire('10.0.0.1'), 0.0)
+            self.assertEqual(self.bucket.peek('10.0.0.1'), 0.0)
+            self.assertEqual(self.bucket.acquire('10.0.0.1'), 0.0)
+            self.assertEqual(self.bucket.acquire('10.0.0.1'), 2.0)
+        with mock.patch('myapp.rate_limit.time.time', return_value=1002.0):
+            self.assertEqual(self.bucket.acquire('10.0.0.1'), 0.0)
+
+
+class RateLimiterTest(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.limiter = RateLimiter(TokenBucket(rate=1, burst=1), TokenBucket(rate=0.1, burst=1))
+
+    def test_client_limit(self):
+        request = self.factory.get('/v1/user/self')
+        self.limiter.check(request, 'test@example.com')
+        with self.assertRaises(RateLimited) as raised:
+            self.limiter.check(request, 'test@example.com')
+        self.assertEqual(raised.exception.scope, 'client')
+        self.assertEqual(raised.exception.retry_after, 1)
+
+    def test_username_limited_only_after_failures(self):
+        for address in ('10.0.0.1', '10.0.0.2'):
+            self.limiter.check(self.factory.get('/', REMOTE_ADDR=address), 'test@example.com')
+        self.limiter.record_failure('test@example.com')
+        with self.assertRaises(RateLimited) as raised:
+            self.limiter.check(self.factory.get('/', REMOTE_ADDR='10.0.0.3'), 'test@example.com')
+        self.assertEqual(raised.exception.scope, 'username')
+        self.assertEqual(raised.exception.retry_after, 10)
+
+    def test_username_variants_share_a_bucket(self):
+        limiter = RateLimiter(TokenBucket(rate=100, burst=100), TokenBucket(rate=0.1, burst=2))
+        limiter.record_failure('Victim@Example.com')
+        limiter.record_failure('VICTIM@example.com')
+        with self.assertRaises(RateLimited) as raised:
+            limiter.check(self.factory.get('/'), 'victim@exämple.com')
+        self.assertEqual(raised.exception.scope, 'username')
+
+    def test_disabled(self):
+        limiter = RateLimiter(TokenBucket(rate=0, burst=0), TokenBucket(rate=0, burst=0), enabled=False)
+        limiter.check(self.factory.get('/'), 'test@example.com')
+
+    def test_client_address_behind_proxies(self):
+        request = self.factory.get('/', REMOTE_ADDR='10.1.1.1',
+                                   HTTP_X_FORWARDED_FOR='6.6.6.6, 203.0.113.7, 35.191.0.1')
+        self.assertEqual(RateLimiter(None, None).client_address(request), '10.1.1.1')
+        self.assertEqual(RateLimiter(None, None, proxy_count=2).client_address(request), '203.0.113.7')
@@ -1,15 +1,115 @@
 import base64
 import hashlib
+import hmac
 import os
 import secrets
+import uuid
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import HttpResponseNotAllowed, HttpResponseBadRequest, HttpResponse, StreamingHttpResponse
+
+from utils import json_codec
+from utils.json_codec import JsonResponse
+from utils.metrics import render as render_metrics
+
+from .credential_cache import credential_cache
+from .exports import CONTENT_TYPES as EXPORT_CONTENT_TYPES, stream_export
+from .hashing import HashingUnavailable, check_password
+from .known_usernames import known_usernames, username_key
+from .models import OutboxMessage, User, UserVerification
+from .profile_cache import profile_cache
+from .rate_limit import RateLimited, rate_limiter
+from .fast_serializers import UserSerializer, CreateUserSerializer, UpdateUserSerializer, user_representation
+import json
 
-from django.contrib.auth.hashers import check_password
-from django.utils import timezone
-from django.http import HttpResponseNotAllowed, HttpResponseBadRequest, HttpResponse, JsonResponse
 
-from .models import User, UserVerification
-from .serializers import UserSerializer, CreateUserSerializer, UpdateUserSerializer
-import json
+def redact_password(request_data):
+    if isinstance(request_data, dict) and 'password' in request_data:
+        return {**request_data, 'password': '********'}
+    return request_data
+
+
+def hashing_unavailable_response(request, endpoint, error):
+    logger.warn(
+        method=request.method,
+        request_id=request.request_id,
+        endpoint=endpoint,
+        event="hashing_unavailable",
+        message="Password hashing pool is saturated, rejecting request.",
+        error=str(error)
+    )
+    response = HttpResponse(status=503)
+    response['Retry-After'] = str(settings.HASHING_RETRY_AFTER)
+    return response
+
+
+def rate_limited_response(request, endpoint, error):
+    logger.warn(
+        method=request.method,
+        request_id=request.request_id,
+        endpoint=endpoint,
+        event="rate_limited",
+        message=f"Rate limit exceeded for {error.scope}, rejecting request.",
+        client=rate_limiter.client_address(request)
+    )
+    response = HttpResponse(status=429)
+    response['Retry-After'] = str(error.retry_after)
+    return response
+
+
+def unexpected_error_response(request, endpoint, event, action, error):
+    """
+    Logs an unhandled error from a user endpoint and maps it to a response.
+
+    Args:
+        endpoint (str): Endpoint name for the log entries.
+        event (str): Event name of the first log entry.
+        action (str): What the request was doing, e.g. "create user".
+        error (Exception): The unhandled error.
+
+    Returns:
+        JsonResponse | HttpResponseBadRequest: 500 if the user table is missing, otherwise 400.
+    """
+    logger.error(
+        method=request.method,
+        request_id=request.request_id,
+        endpoint=endpoint,
+        event=event,
+        message=f"An error occurred while processing {action} request.",
+        error=str(error)
+    )
+    try:
+        if "Table 'webApp.myapp_user' doesn't exist" in str(error):
+            logger.error(
+                method=request.method,
+                request_id=request.request_id,
+                endpoint=endpoint,
+                event="database_error",
+                message=f"Database error occurred while processing {action} request.",
+                error=str(error)
+            )
+            return JsonResponse({'error': 'An internal server error occurred. Please try again later.'},
+                                status=500)
+    except Exception as err:
+        logger.error(
+            method=request.method,
+            request_id=request.request_id,
+            endpoint=endpoint,
+            event="error_processing_database_error",
+            message=f"Error processing database error in {endpoint}.",
+            error=str(err)
+        )
+    logger.error(
+        method=request.method,
+        request_id=request.request_id,
+        endpoint=endpoint,
+        event="unknown_error",
+        message=f"An error occurred while processing {action} request.",
+        error=str(error)
+    )
+    return HttpResponseBadRequest(status=400)
 
 
 def healthz(request):
@@ -128,6 +228,186 @@ def ping(request):
         )
         return HttpResponseBadRequest(status=400)
 
+
+def service_token_valid(request):
+    """
+    Returns whether the request carries one of ``INTERNAL_SERVICE_TOKENS`` as a Bearer token.
+    """
+    auth_header = request.headers.get('Authorization', '')
+    if not auth_header.startswith('Bearer '):
+        return False
+    token = auth_header[len('Bearer '):].encode('utf-8')
+    # Check every configured token so the timing does not reveal which one matched
+    matches = [hmac.compare_digest(token, candidate.encode('utf-8')) for candidate in settings.INTERNAL_SERVICE_TOKENS]
+    return any(matches)
+
+
+def internal_request_error(request, endpoint, allowed_methods):
+    """
+    Returns the error response for a request an internal endpoint must refuse, or None to serve it.
+
+    The internal endpoints do not exist (404) unless service tokens are configured.
+    """
+    if not settings.INTERNAL_SERVICE_TOKENS:
+        return HttpResponse(status=404)
+    if request.method not in allowed_methods:
+        return HttpResponseNotAllowed(allowed_methods)
+    if not service_token_valid(request):
+        logger.warn(
+            method=request.method,
+            request_id=request.request_id,
+            endpoint=endpoint,
+            event="service_authentication_failed",
+            message="Missing or invalid service token.",
+            user_agent=request.headers.get('User-Agent')
+        )
+        return JsonResponse({'error': 'Invalid service token.'}, status=401)
+    return None
+
+
+def export_format(request):
+    """
+    Returns the requested export format, or None if it is not supported.
+    """
+    requested = request.GET.get('format', 'jsonl')
+    return requested if requested in EXPORT_CONTENT_TYPES else None
+
+
+def export_users(request):
+    """
+    Streams every user as JSON Lines (default) or CSV (``?format=csv``) for internal services.
+    """
+    error = internal_request_error(request, "export_users", ['GET'])
+    if error is not None:
+        return error
+    requested_format = export_format(request)
+    if requested_format is None:
+        return HttpResponseBadRequest(status=400)
+    logger.info(
+        method=request.method,
+        request_id=request.request_id,
+        endpoint="export_users",
+        event="export_started",
+        message="User export started.",
+        format=requested_format
+    )
+    response = StreamingHttpResponse(stream_export(requested_format, settings.EXPORT_CHUNK_SIZE),
+                                     content_type=EXPORT_CONTENT_TYPES[requested_format])
+    response['Content-Disposition'] = f'attachment; filename="users.{requested_format}"'
+    return response
+
+
+def parse_lookup_request(request):
+    """
+    Returns the (ids, usernames) a batch lookup asks for, deduplicated and in request order.
+
+    Raises:
+        ValueError: If the body is not ``{"ids": [...], "usernames": [...]}`` with string
+            items, or asks for more than ``USER_LOOKUP_MAX_ITEMS``.
+    """
+    request_data = json_codec.loads(request.body)
+    if not isinstance(request_data, dict) or set(request_data) - {'ids', 'usernames'}:
+        raise ValueError("Expected an object with 'ids' and/or 'usernames'.")
+    ids = request_data.get('ids', [])
+    usernames = request_data.get('usernames', [])
+    if not isinstance(ids, list) or not isinstance(usernames, list) or \
+            not all(isinstance(item, str) for item in ids + usernames):
+        raise ValueError("'ids' and 'usernames' must be lists of strings.")
+    if len(ids) + len(usernames) > settings.USER_LOOKUP_MAX_ITEMS:
+        raise ValueError(f"At most {settings.USER_LOOKUP_MAX_ITEMS} ids and usernames per request.")
+    return list(dict.fromkeys(ids)), list(dict.fromkeys(usernames))
+
+
+def user_lookup_queryset(ids, usernames):
+    """
+    Returns a single-query queryset over the requested users, or None if nothing valid was requested.
+
+    Every username is queried: ``known_usernames`` can lag accounts created on other
+    instances, and this lookup is authoritative.
+    """
+    valid_ids = []
+    for user_id in ids:
+        try:
+            valid_ids.append(uuid.UUID(user_id))
+        except ValueError:
+            pass
+    if not valid_ids and not usernames:
+        return None
+    return User.objects.filter(Q(id__in=valid_ids) | Q(username__in=usernames)).only(
+        'id', 'first_name', 'last_name', 'username', 'account_created', 'account_updated')
+
+
+def user_lookup_response(users, ids, usernames):
+    """
+    Builds the batch lookup response: one profile per requested id or username that exists, in request order.
+    """
+    by_id = {str(user.id): user for user in users}
+    by_username = {username_key(user.username): user for user in users}
+    found, records, missing_ids, missing_usernames = set(), [], [], []
+    for user_id in ids:
+        try:
+            user = by_id.get(str(uuid.UUID(user_id)))
+        except ValueError:
+            user = None
+        if user is None:
+            missing_ids.append(user_id)
+        elif user.id not in found:
+            found.add(user.id)
+            records.append(user_representation(user))
+    for username in usernames:
+        user = by_username.get(username_key(username))
+        if user is None:
+            missing_usernames.append(username)
+        elif user.id not in found:
+            found.add(user.id)
+            records.append(user_representation(user))
+    return JsonResponse({'users': records, 'not_found': {'ids': missing_ids, 'usernames': missing_usernames}},
+                        status=200)
+
+
+def lookup_users(request):
+    """
+    Resolves up to ``USER_LOOKUP_MAX_ITEMS`` user ids and usernames to profiles in one query, for internal services.
+    """
+    error = internal_request_error(request, "lookup_users", ['POST'])
+    if error is not None:
+        return error
+    try:
+        ids, usernames = parse_lookup_request(request)
+    except ValueError as e:
+        logger.warn(
+            method=request.method,
+            request_id=request.request_id,
+            endpoint="lookup_users",
+            event="bad_request_body",
+            message="Bad request body received for user lookup endpoint.",
+            error=str(e)
+        )
+        return JsonResponse({'error': str(e)}, status=400)
+    queryset = user_lookup_queryset(ids, usernames)
+    users = list(queryset) if queryset is not None else []
+    logger.info(
+        method=request.method,
+        request_id=request.request_id,
+        endpoint="lookup_users",
+        event="users_looked_up",
+        message="Batch user lookup served.",
+        requested=len(ids) + len(usernames),
+        found=len(users)
+    )
+    return user_lookup_response(users, ids, usernames)
+
+
+def metrics(request):
+    """
+    Prometheus exposition endpoint, aggregated across worker processes.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
+
+
 # def generate_unique_verification_code(username):
 #     """
 #     Generates a unique verification code for the given username.
@@ -173,6 +453,48 @@ def ping(request):
 #         print(f'An error occurred while tracking email: {e}')
 
 
+def verification_email_message(user):
+    return {
+        "first_name": user.first_name,
+        "username": user.username,
+        "hostname": os.getenv('DOMAIN_NAME'),
+        "verification_api": "v1/verify"
+    }
+
+
+def enqueue_verification_email(user, dedup_key):
+    """
+    Queues a verify_email message for the outbox dispatcher to publish.
+    """
+    return OutboxMessage.objects.enqueue("verify_email", verification_email_message(user), dedup_key)
+
+
+def user_already_exists_response(request, username):
+    logger.error(
+        method=request.method,
+        request_id=request.request_id,
+        endpoint="create_user",
+        event="user_already_exists",
+        message="User with this username already exists.",
+        username=username
+    )
+    return JsonResponse({'error': 'User with this username already exists.'}, status=400)
+
+
+def existing_user_response(request, user):
+    """
+    Answers a signup for a taken username: a conflict for a verified account,
+    otherwise the verification email is queued again.
+    """
+    if user.is_verified:
+        return user_already_exists_response(request, user.username)
+    # Each resend is a distinct event, so it gets its own dedup key
+    enqueue_verification_email(user, f"verify_email:{user.id}:{uuid.uuid4().hex}")
+    return JsonResponse({
+        'error': 'User with this username already exists. Please verify your email to activate your account.'},
+        status=400)
+
+
 def create_user(request):
     try:
         logger.debug(
@@ -184,7 +506,7 @@ def create_user(request):
         )
         if request.method == 'POST':
             try:
-                request_data = json.loads(request.body)
+                request_data = json_codec.loads(request.body)
             except json.JSONDecodeError as e:
                 logger.error(
                     method=request.method,
@@ -196,46 +518,28 @@ def create_user(request):
                 )
                 return HttpResponseBadRequest(status=400)
 
-            # Check if the user already exists
-            user = User.objects.filter(username=request_data.get('username')).first()
+            # Check if the user already exists; names known_usernames rules out skip the query
+            username = request_data.get('username')
+            user = None
+            if known_usernames.might_exist(username):
+                user = User.objects.filter(username=username).first()
             if user:
-                if user.is_verified:
-                    logger.error(
-                        method=request.method,
-                        request_id=request.request_id,
-                        endpoint="create_user",
-                        event="user_already_exists",
-                        message="User with this username already exists.",
-                        username=request_data.get('username')
-                    )
-                    return JsonResponse({'error': 'User with this username already exists.'}, status=400)
-                else:
-                    hostname = os.getenv('DOMAIN_NAME')
-                    verification_api = "v1/verify"
-
-                    pubsub_topic = "verify_email"
-                    pubsub_msg = {
-                        "first_name": user.first_name,
-                        "username": user.username,
-                        "hostname": hostname,
-                        "verification_api": verification_api
-                    }
-
-                    # verification_code = generate_unique_verification_code(user.username)
-                    # verification_link = f"http://{hostname}:8000/{verification_api}?code={verification_code}"
-                    #
-                    # print(f"verification_link: {verification_link}")
-                    # track_email(verification_code, user.username)
-
-                    msg_publisher.send_message(pubsub_topic, pubsub_msg)
-                    return JsonResponse({
-                        'error': 'User with this username already exists. Please verify your email to activate your '
-                                 'account.'},
-                        status=400)
-
-            serializer = CreateUserSerializer(data=request_data)
+                return existing_user_response(request, user)
+
+            # Uniqueness was checked above; a concurrent signup for the same name fails the insert instead
+            serializer = CreateUserSerializer(data=request_data, validate_unique=False)
             if serializer.is_valid():
-                user = serializer.save()
+                # The outbox row commits (or rolls back) together with the user
+                try:
+                    with transaction.atomic():
+                        user = serializer.save()
+                        enqueue_verification_email(user, f"verify_email:{user.id}")
+                except IntegrityError:
+                    # Taken after the check (or known_usernames had not seen it yet); answer as the check would have
+                    user = User.objects.filter(username=username).first()
+                    if user is None:
+                        return user_already_exists_response(request, username)
+                    return existing_user_response(request, user)
                 logger.info(
                     method=request.method,
                     request_id=request.request_id,
@@ -244,17 +548,6 @@ def create_user(request):
                     message="User created successfully.",
                     username=user.username,
                 )
-                hostname = os.getenv('DOMAIN_NAME')
-                verification_api = "v1/verify"
-
-                pubsub_topic = "verify_email"
-                pubsub_msg = {
-                    "first_name": user.first_name,
-                    "username": user.username,
-                    "hostname": hostname,
-                    "verification_api": verification_api
-                }
-                msg_publisher.send_message(pubsub_topic, pubsub_msg)
 
                 return JsonResponse(
                     {'message': 'User created successfully. Please verify your email to activate your account.',
@@ -268,7 +561,7 @@ def create_user(request):
                     event="serializer_errors",
                     message="Serializer errors in create_user.",
                     errors=serializer.errors,
-                    request_data=request_data
+                    request_data=redact_password(request_data)
                 )
                 return HttpResponseBadRequest(status=400)
         else:
@@ -281,82 +574,31 @@ def create_user(request):
                 user_agent=request.headers.get('User-Agent')
             )
             return HttpResponseNotAllowed(['POST'])
+    except HashingUnavailable as e:
+        return hashing_unavailable_response(request, "create_user", e)
     except Exception as e:
-        logger.error(
-            method=request.method,
-            request_id=request.request_id,
-            endpoint="create_user",
-            event="create_user_error",
-            message="An error occurred while processing create user request.",
-            error=str(e)
-        )
-        try:
-            if "Table 'webApp.myapp_user' doesn't exist" in str(e):
-                logger.error(
-                    method=request.method,
-                    request_id=request.request_id,
-                    endpoint="create_user",
-                    event="database_error",
-                    message="Database error occurred while processing create user request.",
-                    error=str(e)
-                )
-                return JsonResponse({'error': 'An internal server error occurred. Please try again later.'},
-                                    status=500)
-        except Exception as err:
-            logger.error(
-                method=request.method,
-                request_id=request.request_id,
-                endpoint="create_user",
-                event="error_processing_database_error",
-                message="Error processing database error in create_user.",
-                error=str(err)
-            )
-        logger.error(
-            method=request.method,
-            request_id=request.request_id,
-            endpoint="create_user",
-            event="unknown_error",
-            message="An error occurred while processing create user request.",
-            error=str(e)
-        )
-        return HttpResponseBadRequest(status=400)
+        return unexpected_error_response(request, "create_user", "create_user_error", "create user", e)
 
 
-def get_user_from_credentials(request):
+def parse_basic_auth(request):
+    """
+    Returns the (username, password) pair from a Basic Authorization header, or None if there is none.
+    """
     auth_header = request.headers.get('Authorization')
     if not auth_header or not auth_header.startswith('Basic '):
-        return None, "Invalid Request, Need Authorization header", 401
+        return None
 
     encoded_credentials = auth_header[len('Basic '):]
     decoded_credentials = base64.b64decode(encoded_credentials).decode('utf-8')
     username, password = decoded_credentials.split(':', 1)
+    return username, password
 
-    try:
-        user = User.objects.get(username=username)
-        if check_password(password, user.password):
-            if not user.is_verified:
-                msg = f"Email verification required to access this API. for user: {username}"
-                logger.warn(
-                    method=request.method,
-                    request_id=request.request_id,
-                    endpoint="user_info",
-                    event="Fetching user detail failed",
-                    message=msg
-                )
-                return None, msg, 403
-            return user, f"Authorisation successful for user: {username}", 1 # 1 denotes everything is okay
-        else:
-            msg = f"Authorisation failure for user: {username}"
-            logger.warn(
-                method=request.method,
-                request_id=request.request_id,
-                endpoint="user_info",
-                event="Fetching user detail failed",
-                message=msg
-            )
-            return None, msg, 401
 
-    except User.DoesNotExist:
+def authorization_result(request, username, user, password_valid):
+    """
+    Turns the outcome of a credential check into the (user, message, status) triple returned to views.
+    """
+    if user is None:
         msg = f"User: {username} not found."
         logger.warn(
             method=request.method,
@@ -367,6 +609,72 @@ def get_user_from_credentials(request):
         )
         return None, msg, 401
 
+    if not password_valid:
+        msg = f"Authorisation failure for user: {username}"
+        logger.warn(
+            method=request.method,
+            request_id=request.request_id,
+            endpoint="user_info",
+            event="Fetching user detail failed",
+            message=msg
+        )
+        return None, msg, 401
+
+    if not user.is_verified:
+        msg = f"Email verification required to access this API. for user: {username}"
+        logger.warn(
+            method=request.method,
+            request_id=request.request_id,
+            endpoint="user_info",
+            event="Fetching user detail failed",
+            message=msg
+        )
+        return None, msg, 403
+    return user, f"Authorisation successful for user: {username}", 1  # 1 denotes everything is okay
+
+
+def get_user_from_credentials(request):
+    credentials = parse_basic_auth(request)
+    if credentials is None:
+        return None, "Invalid Request, Need Authorization header", 401
+    username, password = credentials
+    rate_limiter.check(request, username)
+    if not known_usernames.might_exist(username):
+        rate_limiter.record_failure(username)
+        return authorization_result(request, username, None, False)
+
+    try:
+        user = User.objects.get(username=username)
+    except User.DoesNotExist:
+        known_usernames.remember_missing(username)
+        rate_limiter.record_failure(username)
+        return authorization_result(request, username, None, False)
+
+    if credential_cache.is_verified(username, password, user):
+        password_valid = True
+    else:
+        password_valid = check_password(password, user.password)
+        if password_valid:
+            credential_cache.remember(username, password, user)
+        else:
+            rate_limiter.record_failure(username)
+    return authorization_result(request, username, user, password_valid)
+
+
+def user_profile(user):
+    """
+    Returns the serialized profile for ``user`` from the profile cache, serializing it on a miss.
+
+    Returns:
+        tuple: (profile dict, whether it came from the cache)
+    """
+    data = profile_cache.get(user)
+    if data is not None:
+        return data, True
+    data = UserSerializer(user).data
+    profile_cache.set(user, data)
+    return data, False
+
 
 def user_info(request):
     try:
@@ -402,16 +710,17 @@ def user_info(request):
                     )
                     return HttpResponseBadRequest(status=400)
                 else:
-                    serializer = UserSerializer(user)
+                    data, cache_hit = user_profile(user)
                     logger.info(
                         method=request.method,
                         request_id=request.request_id,
                         endpoint="user_info",
                         user_name=user.username,
                         event="success event ",
-                        message="user data fetched successfully."
+                        message="user data fetched successfully.",
+                        profile_cache_hit=cache_hit
                     )
-                    return JsonResponse(serializer.data, status=200)
+                    return JsonResponse(data, status=200)
             elif request.method == 'PUT':
                 if request.GET:
                     logger.error(
@@ -422,7 +731,7 @@ def user_info(request):
                         message="Bad query parameter received for update user info endpoint."
                     )
                     return HttpResponseBadRequest(status=400)
-                request_data = json.loads(request.body)
+                request_data = json_codec.loads(request.body)
 
                 # Check if any unexpected keys are present in request_data
                 unexpected_keys = set(request_data.keys()) - {'first_name', 'last_name', 'password'}
@@ -468,45 +777,48 @@ def user_info(request):
                 user_agent=request.headers.get('User-Agent')
             )
             return HttpResponseNotAllowed(['GET', 'PUT'])
+    except HashingUnavailable as e:
+        return hashing_unavailable_response(request, "user_info", e)
+    except RateLimited as e:
+        return rate_limited_response(request, "user_info", e)
     except Exception as e:
+        return unexpected_error_response(request, "user_info", "error_processing_user_info", "user info", e)
+
+
+def verification_failure_response(request, verification):
+    """
+    Builds the error response for a verification code that could not be consumed.
+
+    Args:
+        verification (dict): ``is_used`` and ``expires_at`` of the verification row, or None if there is none.
+    """
+    if verification is None:
         logger.error(
             method=request.method,
             request_id=request.request_id,
-            endpoint="user_info",
-            event="error_processing_user_info",
-            message="An error occurred while processing user info request.",
-            error=str(e)
+            endpoint="verify_user",
+            event="invalid_verification_code",
+            message="Invalid verification code."
         )
-        try:
-            if "Table 'webApp.myapp_user' doesn't exist" in str(e):
-                logger.error(
-                    method=request.method,
-                    request_id=request.request_id,
-                    endpoint="user_info",
-                    event="database_error",
-                    message="Database error occurred while processing user info request.",
-                    error=str(e)
-                )
-                return JsonResponse({'error': 'An internal server error occurred. Please try again later.'},
-                                    status=500)
-        except Exception as err:
-            logger.error(
-                method=request.method,
-                request_id=request.request_id,
-                endpoint="user_info",
-                event="error_processing_database_error",
-                message="Error processing database error in user_info.",
-                error=str(err)
-            )
+        return JsonResponse({'error': 'Invalid verification code'}, status=404)
+
+    if verification['is_used']:
         logger.error(
             method=request.method,
             request_id=request.request_id,
-            endpoint="user_info",
-            event="unknown_error",
-            message="An error occurred while processing user info request.",
-            error=str(e)
+            endpoint="verify_user",
+            event="check validity of verification link",
+            message="Verification link has been used."
         )
-        return HttpResponseBadRequest(status=400)
+    else:
+        logger.error(
+            method=request.method,
+            request_id=request.request_id,
+            endpoint="verify_user",
+            event="expired_verification_link",
+            message="Verification link has expired."
+        )
+    return JsonResponse({'error': 'Verification link has expired'}, status=400)
 
 
 def verify_user(request):
@@ -532,17 +844,7 @@ def verify_user(request):
 
         try:
             verification_code = verification_code.split('/')[1]
-            verification_obj = UserVerification.objects.get(verification_code=verification_code)
-        except UserVerification.DoesNotExist:
-            logger.error(
-                method=request.method,
-                request_id=request.request_id,
-                endpoint="verify_user",
-                event="invalid_verification_code",
-                message="Invalid verification code."
-            )
-            return JsonResponse({'error': 'Invalid verification code'}, status=404)
-        except Exception as e:
+        except IndexError as e:
             logger.error(
                 method=request.method,
                 request_id=request.request_id,
@@ -553,52 +855,19 @@ def verify_user(request):
             )
             return JsonResponse({'error': 'Invalid verification code'}, status=404)
 
-        if verification_obj.expires_at < timezone.now():
-            logger.error(
-                method=request.method,
-                request_id=request.request_id,
-                endpoint="verify_user",
-                event="expired_verification_link",
-                message="Verification link has expired."
-            )
-            return JsonResponse({'error': 'Verification link has expired'}, status=400)
+        if not UserVerification.objects.consume(verification_code):
+            # Only the failure path reads the row, to tell an unknown code from a spent one
+            verification = UserVerification.objects.filter(verification_code=verification_code).values(
+                'is_used', 'expires_at').first()
+            return verification_failure_response(request, verification)
 
-        if verification_obj.is_used:
-            logger.error(
-                method=request.method,
-                request_id=request.request_id,
-                endpoint="verify_user",
-                event="check validity of verification link",
-                message="Verification link has been used."
-            )
-            return JsonResponse({'error': 'Verification link has expired'}, status=400)
-        verification_obj.is_used = True
-        verification_obj.save()
-
-        # verification_obj.delete()  # Optional: Delete verification entry after successful use
-
-        user_id = verification_obj.user_id
-        user = User.objects.filter(id=user_id).first()
-        if user:
-            user.is_verified = True
-            user.save()
-            logger.info(
-                method=request.method,
-                request_id=request.request_id,
-                endpoint="verify_user",
-                user_name=user.username,
-                event="user_verified",
-                message="User verified successfully."
-            )
-        else:
-            logger.error(
-                method=request.method,
-                request_id=request.request_id,
-                endpoint="verify_user",
-                user_name=user.username,
-                event="user not found",
-                message="User verification failed."
-            )
+        logger.info(
+            method=request.method,
+            request_id=request.request_id,
+            endpoint="verify_user",
+            event="user_verified",
+            message="User verified successfully."
+        )
 
         return JsonResponse({'success': 'User verified successfully'})
     except Exception as e:
@@ -42,6 +42,8 @@ main() {
     unzip webapp.zip -d "$PROJECT_LOC" || handle_error "Failed to unzip webapp.zip to $PROJECT_LOC"
     chmod +x "$PROJECT_LOC/setup.sh" || handle_error "Failed to make setup.sh executable"
     sudo mv /tmp/webapp.service /etc/systemd/system/webapp.service || handle_error "Failed to move webapp.service to /etc/systemd/system/"
+    sudo mv /tmp/outbox-dispatcher.service /etc/systemd/system/outbox-dispatcher.service || handle_error "Failed to move outbox-dispatcher.service to /etc/systemd/system/"
+    sudo mv /tmp/expiry-sweeper.service /etc/systemd/system/expiry-sweeper.service || handle_error "Failed to move expiry-sweeper.service to /etc/systemd/system/"
 
     create_log_dir
     remove_unnecessary_files
@@ -54,6 +56,8 @@ main() {
     sudo setenforce 0 || handle_service_status_error "Failed to set SELinux to Permissive mode"
     sudo systemctl daemon-reload || handle_error "Failed to reload systemd."
     sudo systemctl enable webapp.service || handle_error "Failed to enable webapp.service."
+    sudo systemctl enable outbox-dispatcher.service || handle_error "Failed to enable outbox-dispatcher.service."
+    sudo systemctl enable expiry-sweeper.service || handle_error "Failed to enable expiry-sweeper.service."
 }
 
 # Execute the main function
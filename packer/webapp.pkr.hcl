@@ -123,6 +123,16 @@ build {
     destination = "/tmp/webapp.service"
   }
 
+  provisioner "file" {
+    source      = "./outbox-dispatcher.service"
+    destination = "/tmp/outbox-dispatcher.service"
+  }
+
+  provisioner "file" {
+    source      = "./expiry-sweeper.service"
+    destination = "/tmp/expiry-sweeper.service"
+  }
+
   provisioner "file" {
     source      = "scripts/config.yaml"
     destination = "/tmp/config.yaml"
@@ -23,12 +23,8 @@ else
     echo "No pending migrations found."
 fi
 
-# Check for pending migrations
-if python3.9 manage.py makemigrations myapp --check | grep -q "No changes detected"; then
-    echo "No pending migrations found."
-else
-#      python3.9 manage.py flush --no-input
-      python3.9 manage.py makemigrations myapp
-      python3.9 manage.py migrate
-      echo "Migration done for myapp"
+# Migrations are committed with the code; refuse to start on model changes that lack one
+if ! python3.9 manage.py makemigrations myapp --check --dry-run > /dev/null; then
+    echo "Error: myapp models have changes without a committed migration"
+    exit 1
 fi
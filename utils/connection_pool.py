@@ -0,0 +1,150 @@
+import threading
+import time
+
+from utils.metrics import DB_POOL_CONNECTIONS
+
+
+class PoolTimeout(Exception):
+    """
+    Raised when no pooled connection becomes available within the acquire timeout.
+    """
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of DB-API connections shared by all threads of a process.
+
+    Idle connections are reused most-recently-used first. A connection is
+    discarded instead of reused once it is older than ``max_lifetime`` or has
+    been idle longer than ``idle_timeout``; connections idle longer than
+    ``ping_after`` are validated with ``validate`` before being handed out.
+    Each of the events counted below is also exported in ``db_pool_connections_total``.
+
+    Attributes:
+        created (int): Connections opened by the pool.
+        reused (int): Acquisitions served by an idle connection.
+        discarded (int): Connections closed because they expired, failed validation or were returned broken.
+        timeouts (int): Acquisitions that gave up waiting for a free slot.
+    """
+
+    def __init__(self, connect, max_size, max_lifetime, idle_timeout, timeout, ping_after=30, validate=None,
+                 alias='default'):
+        """
+        Args:
+            connect (callable): Opens a new connection.
+            max_size (int): Maximum number of open connections, in use or idle.
+            max_lifetime (float): Seconds after which a connection is retired.
+            idle_timeout (float): Seconds an idle connection may wait before being closed.
+            timeout (float): Seconds ``acquire`` waits for a free slot.
+            ping_after (float): Idle seconds after which a connection is validated before reuse.
+            validate (callable): Returns True if a connection is still usable.
+            alias (str): Database alias the pool's metrics are labelled with.
+        """
+        self.connect = connect
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self.validate = validate
+        self.alias = alias
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle = []
+        self._born = {}
+
+    def acquire(self):
+        """
+        Returns an idle connection or opens a new one.
+
+        Raises:
+            PoolTimeout: If every slot stays in use for ``timeout`` seconds.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self.timeouts += 1
+            self._count('timeout')
+            raise PoolTimeout(f"No database connection available after {self.timeout} seconds.")
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    conn, born, released_at = self._idle.pop()
+                now = time.monotonic()
+                if self._expired(born, now) or now - released_at > self.idle_timeout:
+                    self._close(conn)
+                    continue
+                if self.validate is not None and now - released_at > self.ping_after and not self.validate(conn):
+                    self._close(conn)
+                    continue
+                with self._lock:
+                    self.reused += 1
+                    self._born[id(conn)] = born
+                self._count('reused')
+                return conn
+
+            conn = self.connect()
+            with self._lock:
+                self.created += 1
+                self._born[id(conn)] = time.monotonic()
+            self._count('created')
+            return conn
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn, discard=False):
+        """
+        Returns a connection to the pool, closing it if ``discard`` is set or it has expired.
+        """
+        now = time.monotonic()
+        with self._lock:
+            born = self._born.pop(id(conn), None)
+        try:
+            if discard or born is None or self._expired(born, now):
+                self._close(conn)
+            else:
+                with self._lock:
+                    self._idle.append((conn, born, now))
+        finally:
+            self._slots.release()
+
+    def clear(self):
+        """
+        Closes every idle connection.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _, _ in idle:
+            self._close(conn)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'created': self.created,
+                'reused': self.reused,
+                'discarded': self.discarded,
+                'timeouts': self.timeouts,
+                'in_use': len(self._born),
+                'idle': len(self._idle),
+            }
+
+    def _expired(self, born, now):
+        return now - born > self.max_lifetime
+
+    def _count(self, outcome):
+        DB_POOL_CONNECTIONS.labels(self.alias, outcome).inc()
+
+    def _close(self, conn):
+        with self._lock:
+            self.discarded += 1
+        self._count('discarded')
+        try:
+            conn.close()
+        except Exception:
+            pass
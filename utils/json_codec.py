@@ -0,0 +1,101 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # Optional; only needed for JSON_CODEC=orjson
+    orjson = None
+
+
+class StdlibCodec:
+    """
+    JSON codec on the standard library ``json`` module; output matches ``JsonResponse``.
+    """
+    name = 'stdlib'
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, obj, encoder=DjangoJSONEncoder, **dumps_params):
+        return json.dumps(obj, cls=encoder, **dumps_params).encode('utf-8')
+
+
+class OrjsonCodec:
+    """
+    JSON codec on ``orjson``, which encodes straight to bytes.
+
+    Output is compact and keeps non-ASCII characters as UTF-8 rather than
+    ``\\u`` escapes. Datetimes, and anything else orjson does not handle
+    natively, go through ``encoder`` so they format as they do with the
+    stdlib codec. ``dumps_params`` other than ``default`` are ignored.
+    """
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("JSON_CODEC=orjson requires the orjson package.")
+        self._encoders = {}
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+    def dumps(self, obj, encoder=DjangoJSONEncoder, **dumps_params):
+        default = dumps_params.get('default')
+        if default is None:
+            default = self._encoders.get(encoder)
+            if default is None:
+                default = self._encoders[encoder] = encoder().default
+        return orjson.dumps(obj, default=default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+
+
+CODECS = {codec.name: codec for codec in (StdlibCodec, OrjsonCodec)}
+
+codec = StdlibCodec()
+
+
+def configure(name):
+    """
+    Selects the process-wide codec by name ('stdlib' or 'orjson').
+    """
+    global codec
+    try:
+        codec = CODECS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown JSON codec {name!r}; expected one of {sorted(CODECS)}.")
+    return codec
+
+
+def loads(data):
+    """
+    Parses a JSON document from ``str`` or ``bytes``.
+
+    Raises:
+        json.JSONDecodeError: If ``data`` is not valid JSON (orjson's error subclasses it).
+    """
+    return codec.loads(data)
+
+
+def dumps(obj, encoder=DjangoJSONEncoder, **dumps_params):
+    """
+    Serializes ``obj`` to UTF-8 encoded JSON bytes.
+    """
+    return codec.dumps(obj, encoder=encoder, **dumps_params)
+
+
+class JsonResponse(HttpResponse):
+    """
+    Drop-in replacement for ``django.http.JsonResponse`` that encodes with the configured codec.
+
+    The body is handed to ``HttpResponse`` as bytes, so it is not re-encoded.
+    """
+
+    def __init__(self, data, encoder=DjangoJSONEncoder, safe=True, json_dumps_params=None, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                "In order to allow non-dict objects to be serialized set the "
+                "safe parameter to False."
+            )
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=dumps(data, encoder=encoder, **(json_dumps_params or {})), **kwargs)
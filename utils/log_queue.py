@@ -0,0 +1,152 @@
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, TimedRotatingFileHandler
+
+
+class BatchFlushTimedRotatingFileHandler(TimedRotatingFileHandler):
+    """
+    TimedRotatingFileHandler that leaves flushing to ``flush_batch`` instead of flushing after every record.
+    """
+
+    def flush(self):
+        pass
+
+    def flush_batch(self):
+        super().flush()
+
+
+class BatchingQueueListener:
+    """
+    Single background thread that drains a log queue in batches into a target handler.
+
+    Args:
+        log_queue (queue.Queue): Queue the request threads enqueue records on.
+        handler (logging.Handler): Handler that formats and writes the records.
+        batch_size (int): Maximum records written between flushes.
+        dropped (callable): Returns the number of records dropped so far, reported as a log record.
+    """
+    _sentinel = None
+
+    def __init__(self, log_queue, handler, batch_size, dropped):
+        self.queue = log_queue
+        self.handler = handler
+        self.batch_size = batch_size
+        self.dropped = dropped
+        self._reported_drops = 0
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='log-queue-listener', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Writes everything already queued and stops the thread.
+        """
+        if self._thread is not None:
+            self.queue.put(self._sentinel)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = False
+            for record in batch:
+                if record is self._sentinel:
+                    stopping = True
+                    continue
+                self.handler.handle(record)
+            self._report_drops()
+            getattr(self.handler, 'flush_batch', self.handler.flush)()
+            if stopping:
+                return
+
+    def _report_drops(self):
+        dropped = self.dropped()
+        if dropped > self._reported_drops:
+            record = logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0,
+                f'{{"event": "log_records_dropped", "dropped": {dropped - self._reported_drops}, '
+                f'"total_dropped": {dropped}, "severity": "warning"}}',
+                None, None,
+            )
+            self._reported_drops = dropped
+            self.handler.handle(record)
+
+
+class QueueingFileHandler(QueueHandler):
+    """
+    Logging handler that enqueues records for a background thread to write to a rotating log file.
+
+    The request thread only puts the record on a bounded queue; formatting,
+    file writes and rotation happen on the listener thread. When the queue is
+    full the record is dropped and counted instead of blocking the caller.
+    Accepts the ``TimedRotatingFileHandler`` arguments, so it can replace it in
+    ``LOGGING`` directly.
+
+    Attributes:
+        dropped (int): Records discarded because the queue was full.
+    """
+
+    def __init__(self, filename, when='h', interval=1, backupCount=0, encoding=None, delay=False, utc=False,
+                 maxsize=10000, batch_size=256):
+        """
+        Args:
+            filename, when, interval, backupCount, encoding, delay, utc: Passed to ``TimedRotatingFileHandler``.
+            maxsize (int): Maximum queued records before new ones are dropped.
+            batch_size (int): Maximum records written per flush.
+        """
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.target = BatchFlushTimedRotatingFileHandler(
+            filename, when=when, interval=interval, backupCount=backupCount, encoding=encoding, delay=delay, utc=utc
+        )
+        super().__init__(queue.Queue(maxsize))
+        self._start_listener()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _start_listener(self):
+        self.listener = BatchingQueueListener(self.queue, self.target, self.batch_size, lambda: self.dropped)
+        self.listener.start()
+
+    def _after_fork(self):
+        # The listener thread does not survive a fork; give the child its own queue and thread.
+        self.queue = queue.Queue(self.maxsize)
+        self._start_listener()
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Formatting is left to the listener thread; only resolve arguments that could change later.
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """
+        Flushes queued records to disk and closes the log file.
+        """
+        try:
+            self.listener.stop()
+            self.target.close()
+        finally:
+            super().close()
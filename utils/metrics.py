@@ -0,0 +1,96 @@
+"""
+Prometheus metrics for the web app and its background workers.
+
+With ``PROMETHEUS_MULTIPROC_DIR`` set (``webapp/gunicorn.conf.py`` sets it for the
+gunicorn workers) each process records samples in its own memory-mapped files and
+the exposition view sums them at scrape time, so workers never share or contend on
+metric state. Without it metrics live in the process-local default registry.
+"""
+import os
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HASH_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests by view, method and status code.', ['view', 'method', 'status']
+)
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency by view.', ['view'], buckets=REQUEST_BUCKETS
+)
+PASSWORD_HASH_LATENCY = Histogram(
+    'password_hash_duration_seconds', 'Time spent in bcrypt by operation (make, check).', ['operation'],
+    buckets=HASH_BUCKETS
+)
+PASSWORD_HASH_QUEUE_WAIT = Histogram(
+    'password_hash_queue_wait_seconds', 'Time a password hash waited for a free hashing thread.',
+    buckets=REQUEST_BUCKETS
+)
+PASSWORD_HASH_REJECTED = Counter(
+    'password_hash_rejected_total', 'Password hashes refused because the hashing pool and its queue were full.'
+)
+CREDENTIAL_CACHE_REQUESTS = Counter(
+    'credential_cache_requests_total', 'Verified-credential cache lookups by result (hit, miss).', ['result']
+)
+DB_QUERIES = Counter('db_queries_total', 'Database queries executed.', ['alias'])
+DB_QUERY_LATENCY = Histogram(
+    'db_query_duration_seconds', 'Database query latency.', ['alias'], buckets=QUERY_BUCKETS
+)
+DB_POOL_CONNECTIONS = Counter(
+    'db_pool_connections_total',
+    'Connection pool events by alias and outcome (created, reused, discarded, timeout).', ['alias', 'outcome']
+)
+PUBSUB_PUBLISH_LATENCY = Histogram(
+    'pubsub_publish_duration_seconds', 'Time from publish to broker acknowledgement by topic and outcome.',
+    ['topic', 'outcome'], buckets=REQUEST_BUCKETS
+)
+PROFILE_CACHE_REQUESTS = Counter(
+    'profile_cache_requests_total', 'Profile cache lookups by result (hit, miss).', ['result']
+)
+RATE_LIMITED = Counter('rate_limited_total', 'Requests rejected by a rate limit, by scope.', ['scope'])
+
+
+def registry():
+    """
+    Returns the registry to expose: an aggregate of all worker processes in multiprocess mode.
+    """
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        aggregate = CollectorRegistry()
+        multiprocess.MultiProcessCollector(aggregate)
+        return aggregate
+    return REGISTRY
+
+
+def render():
+    """
+    Returns the current metrics in the Prometheus text format.
+
+    Returns:
+        tuple: (body bytes, content type)
+    """
+    return generate_latest(registry()), CONTENT_TYPE_LATEST
+
+
+def observe_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper recording query count and latency per connection alias.
+    """
+    alias = context['connection'].alias
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        DB_QUERIES.labels(alias).inc()
+        DB_QUERY_LATENCY.labels(alias).observe(time.perf_counter() - started)
+
+
+def install_query_metrics_hook(sender, connection, **kwargs):
+    """
+    ``connection_created`` receiver that installs ``observe_query`` on each new connection.
+    """
+    if observe_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(observe_query)
@@ -1,53 +1,118 @@
+import atexit
+import threading
+import time
+
 from google.cloud import pubsub_v1
-import json
+
+from utils import json_codec, request_profile
+from utils.metrics import PUBSUB_PUBLISH_LATENCY
 
 
 class PubSubMessagePublisher:
     """
     Class for publishing messages to Google Cloud Pub/Sub topics.
 
+    A single ``PublisherClient`` is created on first use and reused for every
+    message, so the gRPC channel is set up once per process. Messages are
+    batched by the client and published asynchronously; the outcome is logged
+    from a completion callback.
+
     Attributes:
         project_id (str): The Google Cloud project ID associated with the Pub/Sub topic.
+        batch_settings (BatchSettings): Batching limits applied by the client.
     """
 
-    def __init__(self, project_id):
+    def __init__(self, project_id, max_messages=100, max_bytes=1024 * 1024, max_latency=0.01, client=None):
         """
-        Initializes the PubSubMessagePublisher with the project ID.
+        Initializes the PubSubMessagePublisher with the project ID and batch settings.
+
+        Set ``PUBSUB_EMULATOR_HOST`` to point the client at a local Pub/Sub emulator.
 
         Args:
             project_id (str): The Google Cloud project ID.
+            max_messages (int): Maximum number of messages in a batch.
+            max_bytes (int): Maximum total size of a batch in bytes.
+            max_latency (float): Maximum seconds a message waits for its batch to fill.
+            client: Optional publisher client to use instead of creating a ``PublisherClient``.
         """
         self.project_id = project_id
+        self.batch_settings = pubsub_v1.types.BatchSettings(
+            max_messages=max_messages,
+            max_bytes=max_bytes,
+            max_latency=max_latency,
+        )
+        self._client = client
+        self._topic_paths = {}
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """
+        The shared publisher client, created on first access.
+        """
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = pubsub_v1.PublisherClient(batch_settings=self.batch_settings)
+                    atexit.register(self.close)
+        return self._client
+
+    def topic_path(self, topic_name):
+        path = self._topic_paths.get(topic_name)
+        if path is None:
+            path = self.client.topic_path(self.project_id, topic_name)
+            self._topic_paths[topic_name] = path
+        return path
 
-    def send_message(self, topic_name: str, message: dict):
+    def send_message(self, topic_name: str, message: dict, **attributes):
         """
-        Publishes a message to a specific Pub/Sub topic.
+        Publishes a message to a specific Pub/Sub topic without waiting for the result.
 
         Args:
             topic_name (str): The name of the Pub/Sub topic to publish to.
             message (dict): The message data to be published.
+            **attributes: Optional string attributes attached to the message.
 
-        Raises:
-            Exception: If an error occurs during message publishing.
+        Returns:
+            Future: Resolves to the message ID once the batch containing it is published.
         """
+        with request_profile.timed('pubsub_seconds'):
+            data = json_codec.dumps(message)
+            published_at = time.monotonic()
+            future = self.client.publish(self.topic_path(topic_name), data=data, **attributes)
+        future.add_done_callback(
+            lambda f: self._on_published(f, topic_name, message.get("username"), published_at)
+        )
+        return future
 
+    def _on_published(self, future, topic_name, username, published_at):
+        latency = time.monotonic() - published_at
         try:
-            publisher = pubsub_v1.PublisherClient()
-            topic_path = publisher.topic_path(self.project_id, topic_name)
-            message_json = json.dumps(message)
-
-            future = publisher.publish(topic_path, data=message_json.encode('utf-8'))
-            future.result()  # Block until the message is published
-            logger.debug(
-                event="Topic publishing",
-                message=f"Message published to topic: {topic_name}",
-                username=message["username"]
-            )
+            message_id = future.result()
         except Exception as e:
+            PUBSUB_PUBLISH_LATENCY.labels(topic_name, 'error').observe(latency)
             logger.error(
                 event="Topic publishing failure",
                 message=f"Failed to publish message to topic: {topic_name}",
-                username=message["username"],
+                username=username,
+                latency=latency,
                 error=str(e)
             )
-            raise
+            return
+        PUBSUB_PUBLISH_LATENCY.labels(topic_name, 'success').observe(latency)
+        logger.debug(
+            event="Topic publishing",
+            message=f"Message published to topic: {topic_name}",
+            username=username,
+            message_id=message_id,
+            latency=latency
+        )
+
+    def close(self):
+        """
+        Flushes pending batches and stops the client.
+        """
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None and hasattr(client, 'stop'):
+            client.stop()
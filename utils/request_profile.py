@@ -0,0 +1,95 @@
+"""
+Per-request resource accounting for the profiling middleware.
+
+The middleware binds a ``RequestProfile`` to the current context for sampled
+requests; database, bcrypt and Pub/Sub call sites add their time to it through
+``timed`` and ``account_query``. Outside a sampled request the current profile is
+None and those hooks cost a single context variable lookup.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+
+
+class RequestProfile:
+    """
+    Accumulates where a request spent its time.
+
+    Attributes:
+        db_queries (int): Queries executed.
+        db_seconds (float): Time spent in query execution.
+        bcrypt_seconds (float): Time spent waiting for password hashing, including pool queueing.
+        pubsub_seconds (float): Time spent handing messages to the Pub/Sub client.
+    """
+    __slots__ = ('db_queries', 'db_seconds', 'bcrypt_seconds', 'pubsub_seconds')
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.bcrypt_seconds = 0.0
+        self.pubsub_seconds = 0.0
+
+    def as_dict(self):
+        return {
+            'db_queries': self.db_queries,
+            'db_ms': round(self.db_seconds * 1000, 3),
+            'bcrypt_ms': round(self.bcrypt_seconds * 1000, 3),
+            'pubsub_ms': round(self.pubsub_seconds * 1000, 3),
+        }
+
+
+_current = contextvars.ContextVar('request_profile', default=None)
+
+
+def begin():
+    """
+    Binds a fresh profile to the current context.
+
+    Returns:
+        tuple: (RequestProfile, token to pass to ``end``)
+    """
+    profile = RequestProfile()
+    return profile, _current.set(profile)
+
+
+def end(token):
+    _current.reset(token)
+
+
+@contextmanager
+def timed(attribute):
+    """
+    Adds the duration of the block to ``attribute`` of the current profile, if there is one.
+    """
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(profile, attribute, getattr(profile, attribute) + time.perf_counter() - started)
+
+
+def account_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper counting queries and query time against the current profile.
+    """
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.db_queries += 1
+        profile.db_seconds += time.perf_counter() - started
+
+
+def install_query_accounting_hook(sender, connection, **kwargs):
+    """
+    ``connection_created`` receiver that installs ``account_query`` on each new connection.
+    """
+    if account_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(account_query)
@@ -1,3 +1,5 @@
+import logging
+
 import structlog
 
 # Custom processor to rename the 'level' field to 'severity'
@@ -7,7 +9,10 @@ def rename_level_to_severity(logger, method_name, event_dict):
     return event_dict
 
 # Configure structlog
-def configure_structlog():
+def configure_structlog(log_level='INFO'):
+    # The filtering bound logger turns calls below log_level into no-ops, so disabled
+    # events never reach the processors below (timestamping, JSON rendering).
+    min_level = logging.getLevelName(log_level.upper()) if isinstance(log_level, str) else log_level
     structlog.configure(
         processors=[
             structlog.stdlib.add_log_level,
@@ -18,6 +23,6 @@ def configure_structlog():
         ],
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
-        wrapper_class=structlog.stdlib.BoundLogger,
+        wrapper_class=structlog.make_filtering_bound_logger(min_level),
         cache_logger_on_first_use=True,
     )
@@ -0,0 +1,21 @@
+"""
+ASGI config for backend project.
+
+It exposes the ASGI callable as a module-level variable named ``application``
+and routes the user endpoints to the async views in ``myapp.async_views``.
+
+    gunicorn -c webapp/gunicorn.conf.py -k uvicorn.workers.UvicornWorker webapp.asgi:application
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+from webapp import bootstrap
+
+bootstrap.initialize()
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'webapp.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+
+application = get_asgi_application()
@@ -0,0 +1,37 @@
+"""
+Process-level setup shared by every entry point (manage.py, WSGI, ASGI).
+
+Loads ``config/.env`` and installs the ``logger`` and ``msg_publisher``
+builtins the application code relies on. Entry points call ``initialize()``
+before Django is set up; under gunicorn that happens in each worker process.
+"""
+import builtins
+import os
+
+import structlog
+from dotenv import load_dotenv
+
+from utils.msg_publisher import PubSubMessagePublisher
+
+dot_env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', '.env')
+
+
+def initialize():
+    """
+    Loads the environment and installs the ``logger`` and ``msg_publisher`` builtins. Safe to call repeatedly.
+    """
+    load_dotenv(dot_env_path)
+
+    if not hasattr(builtins, 'logger'):
+        builtins.logger = structlog.get_logger(__name__)
+
+    if not hasattr(builtins, 'msg_publisher'):
+        if os.getenv('PROJECT_ID'):
+            builtins.msg_publisher = PubSubMessagePublisher(
+                os.getenv('PROJECT_ID'),
+                max_messages=int(os.getenv('PUBSUB_BATCH_MAX_MESSAGES', 100)),
+                max_bytes=int(os.getenv('PUBSUB_BATCH_MAX_BYTES', 1024 * 1024)),
+                max_latency=float(os.getenv('PUBSUB_BATCH_MAX_LATENCY', 0.01)),
+            )
+        else:
+            logger.error("Failed to create publisher as project id is missing.")
@@ -0,0 +1,81 @@
+"""
+MySQL backend that borrows connections from a process-wide ConnectionPool.
+
+Django opens and closes connections per thread as usual, but "closing" a
+connection returns it to the pool, so the TCP/auth handshake is only paid when
+the pool has to grow or retire a connection. Pool limits come from the
+``POOL`` entry of the database settings.
+"""
+import os
+import threading
+
+from django.db.backends.mysql import base
+
+from utils.connection_pool import ConnectionPool, PoolTimeout
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _forget_pools():
+    # Sockets inherited from the parent must not be shared; the child builds its own pools.
+    global _pools_lock
+    _pools.clear()
+    _pools_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_pools)
+
+
+def get_pool(alias):
+    """
+    Returns the pool for a database alias, or None if no connection has been opened yet.
+    """
+    return _pools.get(alias)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def _get_pool(self, conn_params):
+        pool = _pools.get(self.alias)
+        if pool is None:
+            with _pools_lock:
+                pool = _pools.get(self.alias)
+                if pool is None:
+                    options = self.settings_dict.get('POOL', {})
+                    pool = ConnectionPool(
+                        connect=lambda: base.DatabaseWrapper.get_new_connection(self, conn_params),
+                        max_size=options.get('MAX_SIZE', 10),
+                        max_lifetime=options.get('MAX_LIFETIME', 3600),
+                        idle_timeout=options.get('IDLE_TIMEOUT', 300),
+                        timeout=options.get('TIMEOUT', 5),
+                        ping_after=options.get('PING_AFTER', 30),
+                        validate=self._ping,
+                        alias=self.alias,
+                    )
+                    _pools[self.alias] = pool
+        return pool
+
+    @staticmethod
+    def _ping(conn):
+        try:
+            conn.ping()
+        except base.Database.Error:
+            return False
+        return True
+
+    def get_new_connection(self, conn_params):
+        try:
+            return self._get_pool(conn_params).acquire()
+        except PoolTimeout as e:
+            raise base.Database.OperationalError(str(e))
+
+    def _close(self):
+        if self.connection is not None:
+            # Connections left mid-transaction or after errors are not trusted for reuse.
+            discard = self.in_atomic_block or not self.autocommit or self.errors_occurred
+            pool = _pools.get(self.alias)
+            with self.wrap_database_errors:
+                if pool is None:
+                    return self.connection.close()
+                pool.release(self.connection, discard=discard)
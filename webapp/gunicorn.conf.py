@@ -0,0 +1,59 @@
+"""
+Gunicorn configuration for serving ``webapp.wsgi:application`` in production.
+
+    gunicorn -c webapp/gunicorn.conf.py webapp.wsgi:application
+
+Every value can be overridden from the environment. Send SIGHUP to the master
+process for a graceful reload (new workers start before old ones finish).
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.getenv('APP_PORT', 8000)}"
+
+# Pre-forked workers sized to the core count; threads let a worker overlap DB and bcrypt waits.
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# For the ASGI app use GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker with webapp.asgi:application.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# The bcrypt pool and its admission queue are per worker; split the host's cores and a
+# host-wide queue of about 32 hashes between the workers so admission control returns 503
+# before the CPU is oversubscribed. Setting either variable explicitly overrides this.
+os.environ.setdefault('HASHING_POOL_SIZE', str(max(1, multiprocessing.cpu_count() // workers)))
+os.environ.setdefault('HASHING_QUEUE_DEPTH', str(max(2, 32 // workers)))
+
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# Recycle workers periodically so slow leaks cannot accumulate.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+# The app is imported in each worker after fork, so per-process state (the Pub/Sub
+# client, hashing pool, DB pool and health probe) is never shared across workers.
+preload_app = False
+
+accesslog = None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+proc_name = 'webapp'
+
+# prometheus_client multiprocess mode: each worker writes its own metric files here and
+# the /metrics view aggregates them. Set before any worker imports prometheus_client.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'webapp-metrics'))
+
+
+def on_starting(server):
+    # Files left by a previous master would be summed into the new counters
+    metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -22,18 +22,86 @@ PASSWORD_HASHERS = [
     'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
 ]
 
+# Verified-credential cache used to skip bcrypt on repeated Basic auth requests
+CREDENTIAL_CACHE_SIZE = int(os.getenv('CREDENTIAL_CACHE_SIZE', 10000))
+CREDENTIAL_CACHE_TTL = int(os.getenv('CREDENTIAL_CACHE_TTL', 300))
+
+# Dedicated bcrypt worker pool per process; requests beyond pool size + queue depth get a 503.
+# The defaults suit a single process; webapp/gunicorn.conf.py divides them between its workers.
+HASHING_POOL_SIZE = int(os.getenv('HASHING_POOL_SIZE', os.cpu_count() or 1))
+HASHING_QUEUE_DEPTH = int(os.getenv('HASHING_QUEUE_DEPTH', 32))
+HASHING_TIMEOUT = float(os.getenv('HASHING_TIMEOUT', 10))
+HASHING_RETRY_AFTER = int(os.getenv('HASHING_RETRY_AFTER', 1))
+
+# JSON codec for request/response bodies and Pub/Sub payloads: 'stdlib' or 'orjson' (needs the orjson package)
+JSON_CODEC = os.getenv('JSON_CODEC', 'stdlib')
+
+# Django cache; point CACHE_BACKEND/CACHE_LOCATION at e.g. RedisCache to share entries between instances
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Serialized GET /v1/user/self responses; PROFILE_CACHE_BACKEND names a CACHES alias to share them through
+PROFILE_CACHE_SIZE = int(os.getenv('PROFILE_CACHE_SIZE', 10000))
+PROFILE_CACHE_BACKEND = os.getenv('PROFILE_CACHE_BACKEND') or None
+PROFILE_CACHE_TIMEOUT = int(os.getenv('PROFILE_CACHE_TIMEOUT', 300))
+
+# Bloom filter of existing usernames, refreshed in the background, plus a short-TTL cache of names the
+# database just confirmed missing; lookups for names that certainly do not exist skip the query.
+# Accounts created on other instances are unknown here for up to the refresh interval; 0 disables the filter.
+KNOWN_USERNAMES_CAPACITY = int(os.getenv('KNOWN_USERNAMES_CAPACITY', 1000000))
+KNOWN_USERNAMES_ERROR_RATE = float(os.getenv('KNOWN_USERNAMES_ERROR_RATE', 0.01))
+KNOWN_USERNAMES_REFRESH_INTERVAL = float(os.getenv('KNOWN_USERNAMES_REFRESH_INTERVAL', 5))
+KNOWN_USERNAMES_NEGATIVE_SIZE = int(os.getenv('KNOWN_USERNAMES_NEGATIVE_SIZE', 10000))
+KNOWN_USERNAMES_NEGATIVE_TTL = float(os.getenv('KNOWN_USERNAMES_NEGATIVE_TTL', 5))
+
+# Bearer tokens accepted by the /v1/internal/ endpoints (comma-separated); with none set they answer 404
+INTERNAL_SERVICE_TOKENS = [token for token in os.getenv('INTERNAL_SERVICE_TOKENS', '').split(',') if token]
+# Users fetched per keyset page by the user export
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 2000))
+# Most ids plus usernames one internal batch lookup may ask for
+USER_LOOKUP_MAX_ITEMS = int(os.getenv('USER_LOOKUP_MAX_ITEMS', 500))
+
+# Basic auth rate limits (429 before any DB or bcrypt work): every attempt per client address,
+# failed attempts per username. RATE_LIMIT_BACKEND names a CACHES alias to share counters between workers.
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'True') == 'True'
+RATE_LIMIT_CLIENT_RATE = float(os.getenv('RATE_LIMIT_CLIENT_RATE', 20))
+RATE_LIMIT_CLIENT_BURST = int(os.getenv('RATE_LIMIT_CLIENT_BURST', 40))
+RATE_LIMIT_USERNAME_RATE = float(os.getenv('RATE_LIMIT_USERNAME_RATE', 0.1))
+RATE_LIMIT_USERNAME_BURST = int(os.getenv('RATE_LIMIT_USERNAME_BURST', 10))
+RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND') or None
+RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', 100000))
+# Trusted proxies in front of the app (e.g. 2 behind a GCP load balancer); 0 keys on REMOTE_ADDR
+RATE_LIMIT_PROXY_COUNT = int(os.getenv('RATE_LIMIT_PROXY_COUNT', 0))
+
 MIDDLEWARE = [
+    'myapp.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'myapp.middleware.RequestIDMiddleware',
+    'myapp.middleware.ProfilingMiddleware',
     'myapp.middleware.CustomHeadersMiddleware',
     'myapp.middleware.DatabaseCheckMiddleware',
 ]
 
-ROOT_URLCONF = 'webapp.urls'
+# 'api' swaps the session, auth and messages middleware for variants that skip /v1/ requests
+MIDDLEWARE_PROFILE = os.getenv('MIDDLEWARE_PROFILE', 'full')
+API_MIDDLEWARE_REPLACEMENTS = {
+    'django.contrib.sessions.middleware.SessionMiddleware': 'myapp.middleware.ApiExemptSessionMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware': 'myapp.middleware.ApiExemptAuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware': 'myapp.middleware.ApiExemptMessageMiddleware',
+}
+if MIDDLEWARE_PROFILE == 'api':
+    MIDDLEWARE = [API_MIDDLEWARE_REPLACEMENTS.get(name, name) for name in MIDDLEWARE]
+
+# The ASGI entry point routes user endpoints to the async views
+ROOT_URLCONF = 'webapp.urls_async' if os.getenv('ASYNC_VIEWS') == 'True' else 'webapp.urls'
 
 TEMPLATES = [
     {
@@ -52,19 +120,46 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'webapp.wsgi.application'
+ASGI_APPLICATION = 'webapp.asgi.application'
 
 # MySQL Database Configuration
+# Connections come from a process-wide pool (webapp.db_backends.mysql), so releasing one at the
+# end of a request (CONN_MAX_AGE=0) returns it to the pool instead of closing the socket.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        'ENGINE': ('webapp.db_backends.mysql' if os.getenv('DB_POOL_ENABLED', 'True') == 'True'
+                   else 'django.db.backends.mysql'),
         'NAME': os.getenv('DATABASE_NAME'),
         'USER': os.getenv('DATABASE_USER'),
         'PASSWORD': os.getenv('DATABASE_PASSWORD'),
         'HOST': os.getenv('DATABASE_HOST'),
         'PORT': os.getenv('DATABASE_PORT'),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': True,
+        'POOL': {
+            'MAX_SIZE': int(os.getenv('DB_POOL_SIZE', 10)),
+            'MAX_LIFETIME': float(os.getenv('DB_POOL_MAX_LIFETIME', 3600)),
+            'IDLE_TIMEOUT': float(os.getenv('DB_POOL_IDLE_TIMEOUT', 300)),
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', 5)),
+            'PING_AFTER': float(os.getenv('DB_POOL_PING_AFTER', 30)),
+        },
     }
 }
 
+# DatabaseCheckMiddleware reads a cached liveness state refreshed in the background;
+# an interval of 0 falls back to checking on every request.
+DB_HEALTH_CHECK_INTERVAL = float(os.getenv('DB_HEALTH_CHECK_INTERVAL', 5))
+DB_HEALTH_CHECK_FAILURE_INTERVAL = float(os.getenv('DB_HEALTH_CHECK_FAILURE_INTERVAL', 1))
+
+# Sampled request profiling (myapp.middleware.ProfilingMiddleware); off unless a rate or token is set.
+# A request carrying PROFILING_HEADER: <PROFILING_TOKEN> is always profiled.
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0))
+PROFILING_HEADER = os.getenv('PROFILING_HEADER', 'X-Profile-Token')
+PROFILING_TOKEN = os.getenv('PROFILING_TOKEN', '')
+# Directory for cProfile .pstats dumps of sampled requests slower than PROFILING_SLOW_MS; empty disables cProfile
+PROFILING_DUMP_DIR = os.getenv('PROFILING_DUMP_DIR', '')
+PROFILING_SLOW_MS = float(os.getenv('PROFILING_SLOW_MS', 500))
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.BasicAuthentication',
@@ -77,7 +172,7 @@ REST_FRAMEWORK = {
 LOG_BASE_DIR = os.getenv('LOG_DIR', '/var/log')
 LOG_DIR = os.path.join(LOG_BASE_DIR, os.getenv('APP_NAME', 'myapp'))
 
-configure_structlog()
+configure_structlog(os.getenv('LOG_LEVEL', 'INFO'))
 
 LOGGING = {
     'version': 1,
@@ -85,11 +180,14 @@ LOGGING = {
     'handlers': {
         'file': {
             'level': os.getenv('LOG_LEVEL', 'INFO'),
-            'class': 'logging.handlers.TimedRotatingFileHandler',
+            # Request threads only enqueue; a listener thread writes and rotates the file
+            'class': 'utils.log_queue.QueueingFileHandler',
             'filename': os.path.join(LOG_DIR, os.getenv('LOG_FILE_NAME', 'app.log')),
             'when': 'D',  # Rotate daily
             'interval': 1,  # Rotate every day
             'backupCount': 10,  # Keep up to 10 log files
+            'maxsize': int(os.getenv('LOG_QUEUE_SIZE', 10000)),  # Records beyond this are dropped and counted
+            'batch_size': int(os.getenv('LOG_QUEUE_BATCH_SIZE', 256)),
         },
     },
     'loggers': {
@@ -9,6 +9,9 @@ urlpatterns = [
     path('v1/user/self', myapp_view.user_info, name='user_info'),
     path('v1/user', myapp_view.create_user, name='create_user'),
     path('v1/verify', myapp_view.verify_user, name='verify_user'),
+    path('v1/internal/users/export', myapp_view.export_users, name='export_users'),
+    path('v1/internal/users/lookup', myapp_view.lookup_users, name='lookup_users'),
+    path('metrics', myapp_view.metrics, name='metrics'),
 
     # Add a catch-all path for undefined APIs
     re_path(r'^.*$', lambda request: HttpResponse(status=404)),
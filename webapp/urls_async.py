@@ -0,0 +1,20 @@
+from django.urls import path, re_path
+from django.http import HttpResponse
+
+from myapp import async_views as myapp_async_view
+from myapp import views as myapp_view
+
+# URL configuration used under ASGI (see webapp.asgi): the user endpoints are served by async views.
+urlpatterns = [
+    path('healthz', myapp_view.healthz, name='healthz'),
+    path('ping', myapp_view.ping, name='ping'),
+    path('v1/user/self', myapp_async_view.user_info, name='user_info'),
+    path('v1/user', myapp_async_view.create_user, name='create_user'),
+    path('v1/verify', myapp_async_view.verify_user, name='verify_user'),
+    path('v1/internal/users/export', myapp_async_view.export_users, name='export_users'),
+    path('v1/internal/users/lookup', myapp_async_view.lookup_users, name='lookup_users'),
+    path('metrics', myapp_view.metrics, name='metrics'),
+
+    # Add a catch-all path for undefined APIs
+    re_path(r'^.*$', lambda request: HttpResponse(status=404)),
+]